@@ -1,37 +1,256 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
+import sys
+import time
+import uuid
 
-# 폰트 설정
-import platform
-if platform.system() == 'Darwin':
-    plt.rc('font', family='AppleGothic')
-else:
-    plt.rc('font', family='Malgun Gothic')
-plt.rc('axes', unicode_minus=False)
+# src/ 모듈 사용 (가격 저장소 등)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+import jobs
+import perf
+from panel import get_panel
+from covariance import get_covariance
+from correlation import ANNOTATE_LIMIT, cluster_order, correlation_matrix, explore, plot_correlation_map
+from decimate import PIXEL_BUDGET, decimate_long
+from optimizer import optimize_portfolio
+from pairwise import pairwise_corr
+from plotting import pyplot, seaborn
+from portfolio_optimization import RISK_FREE_RATE, simulate_portfolios
+from price_store import STORE_DIR, is_store
+from result_cache import cached, figure_png, make_key
+from risk import risk_table
 
 st.set_page_config(page_title="AlphaSeeker Dashboard", page_icon="📈", layout="wide")
 
 st.title("AlphaSeeker (알파 시커) 분석 대시보드")
 st.markdown("금융 데이터 분석 및 포트폴리오 최적화 시뮬레이터")
 
-@st.cache_data
+@perf.timed("app.load_data")
 def load_data():
-    filepath = "data/stock_market_data.csv"
-    if not os.path.exists(filepath):
-        return None
-    df = pd.read_csv(filepath)
-    df['Date'] = pd.to_datetime(df['Date'])
-    if 'Ticker' in df.columns:
-        df = df.pivot(index='Date', columns='Ticker', values='Close')
-    return df.ffill().dropna()
-
-df = load_data()
-
-if df is not None:
+    # 공통 패널 로더: 가격 + 일별 수익률을 한 번만 계산해서 모든 탭이 같은 배열을 공유
+    # (패널 캐시가 데이터 해시로 무효화되므로 st.cache_data는 쓰지 않음)
+    if is_store(STORE_DIR):
+        return get_panel(STORE_DIR)
+    return get_panel("data/stock_market_data.csv")
+
+@perf.timed("app.correlation_heatmap")
+def correlation_heatmap(daily_returns, version):
+    """
+    상관관계 히트맵 PNG (선택 종목 + 데이터 버전으로 캐시 -> 위젯을 조작해도 다시 그리지 않음)
+    종목이 많으면 숫자 없이 군집 순서로 정렬한 히트맵
+    """
+    def compute():
+        # matplotlib / seaborn은 그림이 실제로 필요할 때 처음 불러옴 (대시보드 시작 시간 단축)
+        plt = pyplot()
+        fig, ax = plt.subplots(figsize=(6, 5))
+        if daily_returns.shape[1] > ANNOTATE_LIMIT:
+            corr, names = correlation_matrix(daily_returns)
+            plot_correlation_map(corr, names, cluster_order(corr), ax=ax, title="")
+        else:
+            seaborn().heatmap(pairwise_corr(daily_returns), annot=True, cmap='coolwarm', fmt=".2f", ax=ax)
+        return figure_png(fig)
+    return cached("corr_heatmap", compute, tickers=daily_returns.columns, version=version)
+
+@perf.timed("app.correlation_index")
+def correlation_index(daily_returns, version):
+    """전체 종목 상관계수 + 부분 정렬 인덱스 (데이터 버전별로 한 번만 계산, 메모리 캐시)"""
+    return cached("corr_index", lambda: explore(daily_returns, cluster=False)["index"],
+                  tickers=daily_returns.columns, version=version, disk=False)
+
+@perf.timed("app.price_chart_data", record=("num_points",))
+def price_chart_data(prices, version, start, end, num_points):
+    """
+    기간을 자른 가격을 종목마다 num_points개로 줄인 Long Format (LTTB - 고점/저점 모양 보존)
+    기간 / 종목 / 점 수가 바뀔 때만 다시 계산 (다른 위젯을 조작하면 캐시에서 바로 가져옴)
+    """
+    def compute():
+        return decimate_long(prices.loc[start:end], num_points, method="lttb", value_name="Price")
+    return cached("price_chart", compute, tickers=prices.columns,
+                  params={"start": str(start), "end": str(end), "num_points": num_points},
+                  version=version, disk=False)
+
+def optimization_params(method, num_simulations, max_weight, confidence, num_paths, cov_method):
+    """캐시 키 / 중복 작업 판별에 쓰는 최적화 파라미터 (선택한 방식에 해당하는 값만)"""
+    params = {"method": method, "confidence": confidence, "num_paths": num_paths, "cov_method": cov_method}
+    if method == "몬테카를로 시뮬레이션":
+        params["num_simulations"] = num_simulations
+    else:
+        params["max_weight"] = max_weight
+    return params
+
+@perf.timed("app.run_optimization", data="daily_returns", record=("method", "num_simulations", "num_paths", "cov_method"))
+def run_optimization(job, daily_returns, version, method, num_simulations, max_weight, confidence, num_paths, seed,
+                     cov_method="sample"):
+    """
+    (백그라운드 작업) 최적화 + 효율적 투자선 그림 + 리스크 표를 한 번에 계산해서 캐시합니다.
+    진행률과 부분 결과(지금까지의 점들)를 job.report로 알리고, 취소되면 다음 조각에서 멈춥니다.
+    (종목, 파라미터, 시드, 데이터 버전이 같으면 버튼을 다시 눌러도 바로 결과를 보여줌)
+    반환: {"figure": PNG, "weights": Max Sharpe 비중, "risk": 리스크 표, "tickers": 종목}
+    """
+    # 캐시 키는 선택한 종목 그대로 (실행 버튼의 작업 키와 같은 종목 목록) - 캐시에 있으면 공분산도 계산하지 않음
+    tickers = list(daily_returns.columns)
+    params = optimization_params(method, num_simulations, max_weight, confidence, num_paths, cov_method)
+
+    def compute():
+        # 공분산은 추정기 캐시에서 (같은 종목 / 방법이면 새로 추가된 날짜만 반영) - 시뮬레이션, 최적화, 리스크 표가 공유
+        # (관측일이 부족해 공분산에서 빠진 종목은 제외)
+        cov_matrix = get_covariance(daily_returns, cov_method)
+        kept_returns = daily_returns[list(cov_matrix.columns)]
+        selected_tickers = list(kept_returns.columns)
+        num_assets = len(selected_tickers)
+        mean_returns = kept_returns.mean()
+
+        plt = pyplot()
+        fig2, ax2 = plt.subplots(figsize=(10, 6))
+        
+        if method == "몬테카를로 시뮬레이션":
+            # 행렬 연산으로 시뮬레이션 (src/portfolio_optimization.py와 같은 함수)
+            # 10조각으로 나눠 조각마다 진행률/부분 결과 보고 (같은 Generator라 한 번에 돌린 것과 같은 결과)
+            rng = np.random.default_rng(seed)
+            step = -(-num_simulations // 10)
+            results_parts, weights_parts = [], []
+            for start in range(0, num_simulations, step):
+                results, weights_record = simulate_portfolios(mean_returns, cov_matrix, min(step, num_simulations - start),
+                                                              risk_free_rate=RISK_FREE_RATE, seed=rng)
+                results_parts.append(results)
+                weights_parts.append(weights_record)
+                done = np.concatenate(results_parts, axis=1)
+                job.report(0.8 * done.shape[1] / num_simulations,
+                           pd.DataFrame({"Volatility": done[1], "Return": done[0]}))
+            results = np.concatenate(results_parts, axis=1)
+            weights_record = np.concatenate(weights_parts)
+            
+            results_df = pd.DataFrame(results.T, columns=['Return', 'Volatility', 'Sharpe'])
+            max_sharpe_idx = results_df['Sharpe'].idxmax()
+            max_sharpe_weights = weights_record[max_sharpe_idx]
+            min_vol_weights = weights_record[results_df['Volatility'].idxmin()]
+            
+            # 결과 시각화
+            scatter = ax2.scatter(results_df['Volatility'], results_df['Return'], c=results_df['Sharpe'], cmap='viridis', alpha=0.5, s=10)
+            plt.colorbar(scatter, label='Sharpe Ratio')
+            
+            # 빨간 별 (최고의 포트폴리오)
+            ax2.scatter(results_df.iloc[max_sharpe_idx]['Volatility'], results_df.iloc[max_sharpe_idx]['Return'], marker='*', color='red', s=300, label='Max Sharpe')
+        else:
+            # 이차계획법으로 Max Sharpe / Min Volatility / 효율적 투자선을 정확히 계산
+            # 투자선 점을 하나 구할 때마다 지금까지의 투자선을 부분 결과로 보고
+            def progress(done, total, weights):
+                job.report(0.8 * done / total, pd.DataFrame({
+                    "Volatility": np.sqrt(np.einsum('ij,jk,ik->i', weights, cov_matrix.to_numpy(), weights) * 252),
+                    "Return": weights @ mean_returns.to_numpy() * 252}))
+            
+            exact = optimize_portfolio(kept_returns, risk_free_rate=RISK_FREE_RATE,
+                                       max_weights=[max_weight / 100] * num_assets, progress=progress,
+                                       cov_method=cov_method)
+            max_sharpe_weights = exact['max_sharpe']['weights'].to_numpy()
+            min_vol_weights = exact['min_volatility']['weights'].to_numpy()
+            
+            frontier = exact['frontier']
+            ax2.plot(frontier['Volatility'], frontier['Return'], color='black', linewidth=2, label='Efficient Frontier')
+            ax2.scatter(exact['max_sharpe']['Volatility'], exact['max_sharpe']['Return'], marker='*', color='red', s=300, label='Max Sharpe')
+            ax2.scatter(exact['min_volatility']['Volatility'], exact['min_volatility']['Return'], marker='*', color='blue', s=300, label='Min Volatility')
+        
+        ax2.set_title('Efficient Frontier (효율적 투자선)')
+        ax2.set_xlabel('Risk (Volatility)')
+        ax2.set_ylabel('Expected Return')
+        ax2.legend()
+        
+        # 리스크 분석: 과거/정규분포 VaR·CVaR(1일), 최대 낙폭, 상관 경로 시뮬레이션(1년)
+        job.report(0.9)
+        equal_weights = np.full(num_assets, 1.0 / num_assets)
+        table = risk_table(np.vstack([max_sharpe_weights, min_vol_weights, equal_weights]), kept_returns,
+                           confidence=confidence, names=["Max Sharpe", "Min Volatility", "동일 비중"],
+                           num_paths=num_paths, seed=seed, cov_matrix=cov_matrix)
+        return {"figure": figure_png(fig2), "weights": np.asarray(max_sharpe_weights), "risk": table,
+                "tickers": selected_tickers, "confidence": confidence}
+
+    return cached("optimization", compute, tickers=tickers, params=params, seed=seed, version=version)
+
+@st.fragment(run_every=0.5)
+def job_progress(job_id, session_id):
+    """실행 중인 작업의 진행률 / 부분 결과 / 취소 버튼 (이 부분만 0.5초마다 다시 그림)"""
+    job = jobs.get(job_id)
+    if job is None or job.done:
+        # 끝났으면 전체 화면을 다시 그려서 결과 표시
+        st.rerun()
+    st.progress(job.progress, text=f"{job.label} - {'대기 중' if job.status == 'queued' else '계산 중'} ({job.progress * 100:.0f}%)")
+    if job.partial is not None:
+        st.scatter_chart(job.partial, x='Volatility', y='Return', height=300)
+    if st.button("작업 취소", key=f"cancel_{job_id}"):
+        jobs.cancel(job_id, session_id)
+        st.rerun()
+
+def show_optimization_result(result):
+    """완료된 최적화 결과 표시 (그림 + Max Sharpe 비중 + 리스크 표)"""
+    st.image(result["figure"])
+    max_sharpe_weights = result["weights"]
+    
+    # 🌟 최종 최적 비중 출력 (시각적으로 예쁘게)
+    st.success("최적화가 완료되었습니다! (빨간 별 위치의 비중입니다)")
+    st.subheader("최적의 투자 비중 (Max Sharpe Ratio)")
+    
+    # 스트림릿의 컬럼 기능을 활용해 결과를 예쁘게 나열
+    cols = st.columns(len(result["tickers"]))
+    for idx, col in enumerate(cols):
+        ticker_name = result["tickers"][idx]
+        weight_percent = max_sharpe_weights[idx] * 100
+        col.metric(label=ticker_name, value=f"{weight_percent:.1f} %")
+    
+    st.subheader("리스크 분석 (VaR / CVaR / 최대 낙폭)")
+    st.dataframe((result["risk"] * 100).round(2).astype(str) + " %", use_container_width=True)
+    st.caption(f"VaR/CVaR는 {int(result['confidence'] * 100)}% 신뢰수준의 손실률입니다. Hist/Param은 1일, Sim은 1년 시뮬레이션 기준입니다.")
+
+def show_performance(box, since, report, elapsed):
+    """
+    사이드바 성능 패널: 이번 실행의 단계별 시간 / 메모리, 최근 기록(백그라운드 작업 포함),
+    상세 측정 결과(cProfile 상위 함수 / tracemalloc 할당 위치)
+    """
+    if not perf.is_enabled() and report is None:
+        box.caption("측정이 꺼져 있습니다.")
+        return
+    box.caption(f"이번 실행: {elapsed:.2f}초")
+    box.dataframe(perf.summary(since).round(4), hide_index=True, use_container_width=True)
+    recent = perf.records()[-30:]
+    if recent:
+        box.caption("최근 기록 (백그라운드 작업 포함)")
+        columns = ["stage", "wall_s", "cpu_s", "peak_mb", "rows", "assets", "thread"]
+        frame = pd.DataFrame(recent[::-1])
+        box.dataframe(frame[[c for c in columns if c in frame.columns]], hide_index=True, use_container_width=True)
+    if report is not None:
+        box.caption(f"상세 측정 (메인 스레드 cProfile) - {report['profile_path']}")
+        box.code(report["profile"], language=None)
+        if report["memory"]:
+            box.caption("메모리 할당 상위 위치 (tracemalloc)")
+            box.dataframe(pd.DataFrame(report["memory"], columns=["위치", "MB", "횟수"]),
+                          hide_index=True, use_container_width=True)
+
+# 세션 구분용 ID (작업 수 제한 / 취소에 사용)
+session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+
+# 성능 패널 (사이드바): 단계별 시간 / 메모리 기록 켜기, 이번 실행 상세 측정
+perf_box = st.sidebar.expander("성능 (Performance)")
+perf_box.toggle("단계별 시간 / 메모리 기록", value=perf.is_enabled(), key="perf_enabled",
+                on_change=lambda: perf.enable(st.session_state["perf_enabled"]))
+if st.session_state.pop("perf_capture", False):
+    # 이전 실행이 중간에 끊겨(st.rerun 등) 끝내지 못한 상세 측정 정리
+    perf.stop_capture()
+profile_run = perf_box.button("이번 실행 상세 측정 (cProfile + tracemalloc)")
+if profile_run:
+    profile_run = perf.start_capture("dashboard")
+    if profile_run:
+        st.session_state["perf_capture"] = True
+    else:
+        perf_box.warning("다른 상세 측정이 진행 중입니다.")
+run_mark, run_start = perf.mark(), time.perf_counter()
+
+panel = load_data()
+
+if panel is not None:
+    df = panel['prices']
+    returns = panel['returns']
+    version = panel['version']
     st.sidebar.header("분석 설정")
     tickers = df.columns.tolist()
     
@@ -50,85 +269,104 @@ if df is not None:
         # ---------------------------------------------------------
         with tab1:
             st.subheader("주가 흐름 비교")
-            st.line_chart(df[selected_tickers])
+            # 기간 선택 + 종목당 점 수 제한 (긴 기간 / 많은 종목도 브라우저로 보내는 점 수는 일정)
+            first_day, last_day = df.index[0].date(), df.index[-1].date()
+            range_col, points_col = st.columns([3, 1])
+            start_day, end_day = range_col.slider("기간", min_value=first_day, max_value=last_day,
+                                                  value=(first_day, last_day), format="YYYY-MM-DD")
+            num_points = points_col.select_slider("종목당 최대 점 수", options=[250, 500, 1000, 2000], value=PIXEL_BUDGET)
+            chart_data = price_chart_data(df[selected_tickers], version, pd.Timestamp(start_day), pd.Timestamp(end_day), num_points)
+            st.line_chart(chart_data, x="Date", y="Price", color="Ticker")
 
             col1, col2 = st.columns(2)
             with col1:
                 st.subheader("종목 간 상관관계")
-                daily_returns = df[selected_tickers].pct_change().dropna()
-                fig, ax = plt.subplots(figsize=(6, 5))
-                sns.heatmap(daily_returns.corr(), annot=True, cmap='coolwarm', fmt=".2f", ax=ax)
-                st.pyplot(fig)
+                st.image(correlation_heatmap(returns[selected_tickers], version))
                 
             with col2:
                 st.subheader("최근 10일 데이터")
                 st.dataframe(df[selected_tickers].tail(10), use_container_width=True)
 
+            # 전체 종목 대상 상관관계 질의 (N x N 표 대신 부분 정렬 인덱스에서 상위 k개만)
+            # 접힌 expander 안의 코드도 페이지를 그릴 때마다 실행되므로, 켰을 때만 전체 상관계수를 계산
+            with st.expander(f"상관관계 탐색 (전체 {len(tickers)}개 종목)"):
+                if not st.toggle("전체 종목 상관계수 계산", key="corr_index_enabled"):
+                    st.caption("켜면 전체 종목의 상관계수 인덱스를 계산합니다. (데이터 버전별로 한 번만)")
+                else:
+                    corr_index = correlation_index(returns, version)
+                    query_col, k_col = st.columns([3, 1])
+                    query_ticker = query_col.selectbox("기준 종목", tickers, index=tickers.index(selected_tickers[0]))
+                    top_k = int(k_col.number_input("k", min_value=1, max_value=100, value=10, step=1))
+                    pair_col, neighbour_col = st.columns(2)
+                    with pair_col:
+                        st.caption("상관이 가장 높은 / 낮은 종목 쌍")
+                        st.dataframe(corr_index.top_pairs(top_k), use_container_width=True, hide_index=True)
+                        st.dataframe(corr_index.top_pairs(top_k, largest=False), use_container_width=True, hide_index=True)
+                    with neighbour_col:
+                        st.caption(f"{query_ticker}와 가장 비슷한 / 반대로 움직이는 종목")
+                        st.dataframe(corr_index.neighbours(query_ticker, top_k).rename("Correlation"), use_container_width=True)
+                        st.dataframe(corr_index.neighbours(query_ticker, top_k, largest=False).rename("Correlation"),
+                                     use_container_width=True)
+
         # ---------------------------------------------------------
         # 탭 2: 포트폴리오 최적화 (Day 5 내용 이식)
         # ---------------------------------------------------------
         with tab2:
-            st.subheader("몬테카를로 시뮬레이션 기반 자산 배분")
+            st.subheader("자산 배분 최적화")
             st.write("선택한 종목들로 최적의 투자 비중(Efficient Frontier)을 계산합니다.")
             
-            # 사용자가 시뮬레이션 횟수를 직접 고를 수 있게 바(Slider) 추가
-            num_simulations = st.slider("시뮬레이션 횟수 (많을수록 정교함)", min_value=1000, max_value=20000, value=5000, step=1000)
+            # 최적화 방식 선택: 랜덤 샘플링(몬테카를로) / 정확한 해(이차계획법)
+            method = st.radio("최적화 방식", ["몬테카를로 시뮬레이션", "정확한 최적화 (이차계획법)"], horizontal=True)
+            # 공분산 추정: 종목이 많고 기간이 짧으면 Ledoit-Wolf 축소 추정이 안정적, EWMA는 최근 변동성 반영
+            cov_labels = {"sample": "표본 공분산", "ledoit_wolf": "Ledoit-Wolf 축소", "ewma": "EWMA (λ=0.94)"}
+            cov_method = st.selectbox("공분산 추정", list(cov_labels), format_func=cov_labels.get)
+            num_assets = len(selected_tickers)
+            num_simulations, max_weight = None, None
+            
+            if method == "몬테카를로 시뮬레이션":
+                # 사용자가 시뮬레이션 횟수를 직접 고를 수 있게 바(Slider) 추가
+                num_simulations = st.slider("시뮬레이션 횟수 (많을수록 정교함)", min_value=1000, max_value=20000, value=5000, step=1000)
+            else:
+                # 종목당 최대 비중 (롱온리 + 상한 제약)
+                # 최솟값도 5% 단위로 맞춤 (가능한 최소 상한 100/종목 수를 올림)
+                max_weight = st.slider("종목당 최대 비중 (%)", min_value=int(np.ceil(100 / num_assets / 5)) * 5,
+                                       max_value=100, value=100, step=5)
             
-            # 실행 버튼 추가
+            # 리스크 지표 설정 (VaR / CVaR 신뢰수준, 시뮬레이션 경로 수) + 재현용 시드
+            risk_col1, risk_col2, risk_col3 = st.columns(3)
+            confidence = risk_col1.select_slider("VaR 신뢰수준", options=[0.90, 0.95, 0.99], value=0.95)
+            num_paths = risk_col2.slider("리스크 시뮬레이션 경로 수 (1년)", min_value=0, max_value=5000, value=1000, step=500)
+            seed = int(risk_col3.number_input("랜덤 시드", min_value=0, value=42, step=1))
+            
+            # 실행 버튼: 계산은 백그라운드 작업 풀에서 (같은 조건의 진행 중인 작업이 있으면 공유)
             if st.button("최적화 실행하기"):
-                # 로딩 스피너 표시
-                with st.spinner('수만 번의 포트폴리오를 계산 중입니다... 잠시만 기다려주세요!'):
-                    daily_returns = df[selected_tickers].pct_change().dropna()
-                    mean_returns = daily_returns.mean()
-                    cov_matrix = daily_returns.cov()
-                    num_assets = len(selected_tickers)
-                    risk_free_rate = 0.035
-                    
-                    results = np.zeros((3, num_simulations))
-                    weights_record = []
-                    
-                    for i in range(num_simulations):
-                        weights = np.random.random(num_assets)
-                        weights /= np.sum(weights)
-                        weights_record.append(weights)
-                        
-                        portfolio_return = np.sum(weights * mean_returns) * 252
-                        portfolio_std_dev = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights))) * np.sqrt(252)
-                        
-                        results[0,i] = portfolio_return
-                        results[1,i] = portfolio_std_dev
-                        results[2,i] = (portfolio_return - risk_free_rate) / portfolio_std_dev
-                    
-                    results_df = pd.DataFrame(results.T, columns=['Return', 'Volatility', 'Sharpe'])
-                    max_sharpe_idx = results_df['Sharpe'].idxmax()
-                    max_sharpe_weights = weights_record[max_sharpe_idx]
-                    
-                    # 결과 시각화
-                    fig2, ax2 = plt.subplots(figsize=(10, 6))
-                    scatter = ax2.scatter(results_df['Volatility'], results_df['Return'], c=results_df['Sharpe'], cmap='viridis', alpha=0.5, s=10)
-                    plt.colorbar(scatter, label='Sharpe Ratio')
-                    
-                    # 빨간 별 (최고의 포트폴리오)
-                    ax2.scatter(results_df.iloc[max_sharpe_idx]['Volatility'], results_df.iloc[max_sharpe_idx]['Return'], marker='*', color='red', s=300, label='Max Sharpe')
-                    
-                    ax2.set_title('Efficient Frontier (효율적 투자선)')
-                    ax2.set_xlabel('Risk (Volatility)')
-                    ax2.set_ylabel('Expected Return')
-                    ax2.legend()
-                    st.pyplot(fig2)
-                    
-                    # 🌟 최종 최적 비중 출력 (시각적으로 예쁘게)
-                    st.success("최적화가 완료되었습니다! (빨간 별 위치의 비중입니다)")
-                    st.subheader("최적의 투자 비중 (Max Sharpe Ratio)")
-                    
-                    # 스트림릿의 컬럼 기능을 활용해 결과를 예쁘게 나열
-                    cols = st.columns(num_assets)
-                    for idx, col in enumerate(cols):
-                        ticker_name = selected_tickers[idx]
-                        weight_percent = max_sharpe_weights[idx] * 100
-                        col.metric(label=ticker_name, value=f"{weight_percent:.1f} %")
+                params = optimization_params(method, num_simulations, max_weight, confidence, num_paths, cov_method)
+                key = make_key("optimization", selected_tickers, params, seed, version)
+                try:
+                    job = jobs.submit(run_optimization, returns[selected_tickers], version, method, num_simulations,
+                                      max_weight, confidence, num_paths, seed, cov_method,
+                                      key=key, session_id=session_id, label=f"{method} ({num_assets}개 종목)")
+                    st.session_state["optimization_job"] = job.id
+                except RuntimeError as e:
+                    st.warning(str(e))
+            
+            job = jobs.get(st.session_state.get("optimization_job"))
+            if job is not None:
+                if not job.done:
+                    job_progress(job.id, session_id)
+                elif job.status == "done":
+                    show_optimization_result(job.result)
+                elif job.status == "cancelled":
+                    st.info("최적화 작업이 취소되었습니다.")
+                else:
+                    st.error(f"최적화 중 오류가 발생했습니다: {job.error}")
 
     else:
         st.warning("포트폴리오 최적화를 위해 사이드바에서 **최소 2개 이상의 종목**을 선택해주세요.")
 else:
-    st.error("데이터 파일이 없습니다. `src/data_loader.py`를 먼저 실행해주세요.")
\ No newline at end of file
+    st.error("데이터 파일이 없습니다. `src/data_loader.py`를 먼저 실행해주세요.")
+
+# 성능 패널 내용 (화면을 다 그린 뒤 이번 실행 기록으로 채움)
+perf_report = perf.stop_capture() if profile_run else None
+st.session_state.pop("perf_capture", None)
+show_performance(perf_box, run_mark, perf_report, time.perf_counter() - run_start)
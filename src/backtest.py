@@ -0,0 +1,225 @@
+import numpy as np
+import pandas as pd
+
+from compact_panel import as_frame
+from covariance import CovarianceEstimator
+from optimizer import max_sharpe, min_variance
+from panel import get_panel
+from plotting import pyplot, show_or_save
+from portfolio_optimization import RISK_FREE_RATE, simulate_portfolios
+
+# 기본 설정: 1년 룩백, 매월 첫 거래일 리밸런싱, 거래비용 0.1% (회전율 1당)
+LOOKBACK = 252
+REBALANCE = "M"
+TRANSACTION_COST = 0.001
+
+# 창 공분산 추정기를 증분 갱신하다가 이 횟수마다 새로 만듦 (누적 오차 제거)
+RESYNC_EVERY = 12
+
+METHODS = ("equal", "inverse_volatility", "min_variance", "max_sharpe", "monte_carlo")
+
+
+def rebalance_positions(index, lookback=LOOKBACK, rebalance=REBALANCE):
+    """
+    리밸런싱하는 날짜의 위치(정수) 목록
+    rebalance: "W" / "M" / "Q" / "Y" (각 기간의 첫 거래일) 또는 정수 (n거래일마다)
+    룩백 창이 다 찬 뒤(lookback 위치부터)만 포함합니다.
+    """
+    num_days = len(index)
+    if isinstance(rebalance, (int, np.integer)):
+        return np.arange(lookback, num_days, rebalance)
+
+    periods = pd.DatetimeIndex(index).to_period(rebalance)
+    first = np.r_[True, periods[1:] != periods[:-1]]
+    positions = np.flatnonzero(first)
+    positions = positions[positions > lookback]
+    # 첫 리밸런싱은 창이 다 찬 바로 다음 날
+    return np.r_[lookback, positions] if lookback < num_days else positions
+
+
+def _window_estimates(values, positions, lookback, cov_method="sample"):
+    """
+    리밸런싱 시점마다 직전 lookback일 창의 (종목 위치, 일별 평균, 일별 공분산)을 차례로 반환하는 제너레이터
+    창 안에 결측이 없는 종목만 씁니다. 종목 구성이 그대로이고 창이 겹치면 CovarianceEstimator(window=lookback)에
+    새로 들어온 날짜만 넣어 갱신합니다. (빠지는 날짜는 추정기가 빼므로 창 전체를 다시 곱하지 않음)
+    종목 구성이 바뀌거나 RESYNC_EVERY번마다 (ewma는 창 밖 날짜를 빼지 못하므로 매번) 창 전체로 새로 만듭니다.
+    """
+    missing_csum = np.r_[np.zeros((1, values.shape[1])), np.cumsum(np.isnan(values), axis=0)]
+    estimator, assets, stop, updates = None, None, None, 0
+    for pos in positions:
+        start = pos - lookback
+        window_assets = np.flatnonzero(missing_csum[pos] - missing_csum[start] == 0)
+        if not len(window_assets):
+            estimator = None
+            yield window_assets, None, None
+            continue
+        if (estimator is None or cov_method == "ewma" or updates >= RESYNC_EVERY or start >= stop
+                or not np.array_equal(window_assets, assets)):
+            assets = window_assets
+            estimator = CovarianceEstimator(len(assets), cov_method, window=lookback)
+            estimator.update(values[start:pos, assets])
+            updates = 0
+        else:
+            estimator.update(values[stop:pos, assets])
+            updates += 1
+        stop = pos
+        yield assets, values[start:pos, assets].mean(axis=0), estimator.covariance()
+
+
+def _target_weights(method, mu, cov, prev, risk_free_rate, bounds, max_weights, rng, num_simulations):
+    """한 리밸런싱 시점의 목표 비중 (prev: 같은 종목 구성의 이전 목표 비중, 없으면 None)"""
+    num_assets = len(mu)
+    if callable(method):
+        w = np.asarray(method(mu, cov), dtype=np.float64)
+        return w / w.sum()
+    if method == "equal":
+        return np.full(num_assets, 1.0 / num_assets)
+    if method == "inverse_volatility":
+        inv = 1.0 / np.sqrt(np.maximum(np.diag(cov), 1e-18))
+        return inv / inv.sum()
+    if method == "min_variance":
+        return min_variance(mu, cov, bounds, max_weights, x0=prev)
+    if method == "max_sharpe":
+        return max_sharpe(mu, cov, risk_free_rate, bounds, max_weights, x0=prev)
+    if method == "monte_carlo":
+        # run_monte_carlo_simulation과 같은 방식: 랜덤 비중 중 샤프 지수 최대
+        results, weights = simulate_portfolios(mu, cov, num_simulations, risk_free_rate, seed=rng)
+        return weights[np.argmax(results[2])].astype(np.float64)
+    raise ValueError(f"알 수 없는 방법: {method} (가능: {', '.join(METHODS)} 또는 함수)")
+
+
+def run_backtest(daily_returns, method="max_sharpe", lookback=LOOKBACK, rebalance=REBALANCE,
+                 transaction_cost=TRANSACTION_COST, max_turnover=None, risk_free_rate=RISK_FREE_RATE,
+                 bounds=(0.0, 1.0), max_weights=None, num_simulations=10000, seed=None, cov_method="sample"):
+    """
+    Walk-forward 백테스트: 리밸런싱 시점마다 직전 lookback일 수익률만으로 비중을 다시 정하고,
+    다음 리밸런싱까지 그 비중으로 보유했을 때의 표본 외(out-of-sample) 성과를 계산합니다.
+
+    - daily_returns: 공통 패널의 수익률 행렬 (날짜 x 종목)
+    - method: "equal" / "inverse_volatility" / "min_variance" / "max_sharpe" / "monte_carlo"
+      또는 weight_fn(평균 일간 수익률, 일간 공분산) -> 비중 함수
+    - transaction_cost: 회전율(sum |비중 변화|) 1당 비용
+    - max_turnover: 한 번에 허용하는 최대 회전율 (넘으면 목표 비중 쪽으로 그만큼만 이동)
+    - cov_method: 창 공분산 추정 방법 (sample / ledoit_wolf / ewma, covariance.get_covariance와 같은 추정기)
+
+    보유 기간 안의 날짜들은 누적수익률 행렬 하나로 한 번에 계산하고 (날짜 루프 없음),
+    창 공분산은 겹치는 창끼리 증분 갱신합니다. 창 안에 결측이 있는 종목은 그 시점에 제외합니다.
+
+    반환: {"returns": 일별 순수익률, "weights": 리밸런싱 직후 비중 (회전율 제한 반영), "turnover", "costs", "stats"}
+    """
+    daily_returns = as_frame(daily_returns)
+    tickers = list(daily_returns.columns)
+    values = daily_returns.to_numpy(dtype=np.float64)
+    num_days, num_assets = values.shape
+    positions = rebalance_positions(daily_returns.index, lookback, rebalance)
+    if len(positions) == 0:
+        raise ValueError(f"데이터가 룩백 기간({lookback}일)보다 짧습니다.")
+
+    # 1. 보유 기간 수익률 (결측은 0 = 그 날 가격 변화 없음)
+    period_returns = np.where(np.isnan(values), 0.0, values)
+
+    rng = np.random.default_rng(seed)
+    name = method if isinstance(method, str) else getattr(method, "__name__", "custom")
+    print(f"백테스트 중... ({name}, 리밸런싱 {len(positions)}회, 종목 {num_assets}개)")
+
+    daily = np.full(num_days, np.nan)
+    target_record = np.zeros((len(positions), num_assets))
+    turnover = np.empty(len(positions))
+    costs = np.empty(len(positions))
+    current = np.zeros(num_assets)          # 처음에는 전부 현금
+    prev_target, prev_assets = None, None
+    ends = np.r_[positions[1:], num_days]
+    estimates = _window_estimates(values, positions, lookback, cov_method)
+
+    for k, (pos, (assets, mean, cov)) in enumerate(zip(positions, estimates)):
+        # 2. 창 안에 결측이 없는 종목만으로 구한 평균 / 공분산으로 목표 비중
+        target = np.zeros(num_assets)
+        if len(assets):
+            x0 = prev_target if prev_assets is not None and np.array_equal(assets, prev_assets) else None
+            w = _target_weights(method, mean, cov, x0, risk_free_rate,
+                                bounds, max_weights, rng, num_simulations)
+            target[assets] = w
+            prev_target, prev_assets = w, assets
+
+        # 3. 회전율 제한: 목표 쪽으로 max_turnover만큼만 이동
+        trade = target - current
+        traded = np.abs(trade).sum()
+        if max_turnover is not None and traded > max_turnover:
+            trade *= max_turnover / traded
+            traded = max_turnover
+        weights = current + trade
+        target_record[k] = weights
+        turnover[k] = traded
+        costs[k] = transaction_cost * traded
+
+        # 4. 다음 리밸런싱까지 보유: 누적수익률 행렬로 기간 전체를 한 번에 계산
+        growth = np.cumprod(1.0 + period_returns[pos:ends[k]], axis=0)
+        value = (growth @ weights + (1.0 - weights.sum())) * (1.0 - costs[k])
+        daily[pos:ends[k]] = value / np.r_[1.0, value[:-1]] - 1.0
+
+        # 5. 기간 말 비중 (가격 변화로 흘러간 비중)
+        end_value = growth[-1] @ weights + (1.0 - weights.sum())
+        current = weights * growth[-1] / end_value
+
+    dates = daily_returns.index[positions]
+    returns = pd.Series(daily[positions[0]:], index=daily_returns.index[positions[0]:], name=name)
+    result = {
+        "returns": returns,
+        "weights": pd.DataFrame(target_record, index=dates, columns=tickers),
+        "turnover": pd.Series(turnover, index=dates, name="Turnover"),
+        "costs": pd.Series(costs, index=dates, name="Cost"),
+    }
+    result["stats"] = performance_stats(returns, risk_free_rate, result["turnover"])
+    return result
+
+
+def performance_stats(returns, risk_free_rate=RISK_FREE_RATE, turnover=None):
+    """일별 수익률로 성과 요약 (연 수익률, 변동성, 샤프 지수, 최대 낙폭, 평균 회전율)"""
+    r = returns.to_numpy(dtype=np.float64)
+    wealth = np.cumprod(1.0 + r)
+    years = len(r) / 252
+    volatility = r.std(ddof=1) * np.sqrt(252) if len(r) > 1 else np.nan
+    cagr = wealth[-1] ** (1.0 / years) - 1.0 if len(r) else np.nan
+    drawdown = wealth / np.maximum.accumulate(np.r_[1.0, wealth])[1:] - 1.0
+    stats = {
+        "CAGR": cagr,
+        "Volatility": volatility,
+        "Sharpe": (r.mean() * 252 - risk_free_rate) / volatility if volatility else np.nan,
+        "Max Drawdown": drawdown.min() if len(r) else np.nan,
+    }
+    if turnover is not None:
+        stats["Avg Turnover"] = turnover.mean()
+    return stats
+
+
+def compare_methods(daily_returns, methods=METHODS, **params):
+    """여러 방법을 같은 조건으로 백테스트해서 {방법: 결과}, 성과 비교표를 반환"""
+    results = {m if isinstance(m, str) else m.__name__: run_backtest(daily_returns, m, **params)
+               for m in methods}
+    table = pd.DataFrame({name: r["stats"] for name, r in results.items()}).T
+    return results, table
+
+
+def plot_backtest(results, save_path=None):
+    """방법별 누적 자산 곡선 비교 (시작 = 1, save_path: 지정하면 화면 대신 이미지 파일로)"""
+    plt = pyplot()
+    fig = plt.figure(figsize=(12, 6))
+    for name, result in results.items():
+        plt.plot((1.0 + result["returns"]).cumprod(), label=name)
+    plt.title('Walk-forward 백테스트 누적 수익 (거래비용 반영)')
+    plt.xlabel('날짜')
+    plt.ylabel('누적 자산 (시작 = 1)')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    show_or_save(fig, save_path)
+
+
+if __name__ == "__main__":
+    file_path = "data/price_store"
+    panel = get_panel(file_path)
+
+    if panel is not None:
+        results, table = compare_methods(panel['returns'], seed=42)
+        print("\n[Walk-forward 백테스트 성과 비교]")
+        print(table.round(4))
+        plot_backtest(results)
@@ -0,0 +1,249 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from price_store import save_prices
+
+# 합성 데이터로 주요 함수(로드 / 지표 / 베타 / 시뮬레이션)의 시간과 메모리를 규모별로 측정합니다.
+# 결과는 JSON으로 저장해서 이전 실행과 비교합니다. (실제 데이터 / 네트워크 없이 재현 가능)
+TICKER_GRID = [10, 100, 1000, 5000]
+SIMULATION_GRID = [1000, 10000, 100000]
+# 몬테카를로는 시뮬레이션 수 x 종목 수 크기의 비중 배열을 만들므로 종목 수를 작게
+SIMULATION_TICKERS = [10, 100]
+NUM_DAYS = 1000
+REPEAT = 3
+SEED = 42
+
+MARKET_TICKER = "^GSPC"
+STAGES = ["load_data", "load_compact", "load_data_csv", "add_technical_indicators", "compute_indicators",
+          "calculate_beta", "calculate_beta_batch", "bootstrap_beta", "pairwise_corr",
+          "run_monte_carlo_simulation"]
+# 기본으로 돌리지 않는 단계 (CSV 쓰기 / 파싱이 커서 오래 걸림)
+OPTIONAL_STAGES = ["load_data_csv"]
+
+RESULT_DIR = "data/benchmarks"
+
+# 이전 결과보다 이 비율 이상 느려지고, 차이가 MIN_DIFF초 이상이면 성능 저하로 판단
+REGRESSION_RATIO = 1.2
+MIN_DIFF = 0.01
+
+
+def synthetic_ohlcv(num_tickers, num_days=NUM_DAYS, seed=SEED, start="2000-01-03", market_ticker=MARKET_TICKER):
+    """
+    재현 가능한 합성 OHLCV (data_loader가 받는 것과 같은 Long Format: Date 인덱스 + Ticker 컬럼)
+    시장 지수(market_ticker) 1개 + 종목 num_tickers개 (SYN00000, ...)
+    종목 수익률 = 종목별 드리프트 + 베타 x 시장 수익률 + 개별 잡음 (베타 회귀 결과가 의미 있도록)
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=num_days, name="Date")
+    tickers = [market_ticker] + [f"SYN{i:05d}" for i in range(num_tickers)]
+
+    market = rng.normal(0.0003, 0.01, num_days)
+    betas = np.r_[1.0, rng.uniform(0.3, 1.8, num_tickers)]
+    vols = np.r_[0.0, rng.uniform(0.005, 0.03, num_tickers)]
+    drift = np.r_[0.0, rng.normal(0.0001, 0.0003, num_tickers)]
+    log_returns = drift + market[:, None] * betas + rng.standard_normal((num_days, len(tickers))) * vols
+
+    close = 100.0 * np.exp(np.cumsum(log_returns, axis=0))
+    open_ = np.vstack([close[:1], close[:-1]]) * (1 + rng.normal(0, 0.002, close.shape))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.005, close.shape)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.005, close.shape)))
+    volume = np.round(rng.lognormal(13, 1, close.shape))
+
+    # yfinance 결과를 stack한 순서 (날짜별로 종목이 이어짐, 컬럼은 이름순)
+    df = pd.DataFrame({"Close": close.ravel(), "High": high.ravel(), "Low": low.ravel(),
+                       "Open": open_.ravel(), "Volume": volume.ravel(),
+                       "Ticker": np.tile(np.array(tickers, dtype=object), num_days)},
+                      index=pd.DatetimeIndex(np.repeat(dates.values, len(tickers)), name="Date"))
+    return df
+
+
+def data_hash(df):
+    """합성 데이터 내용 해시 (비교하는 두 결과가 같은 입력을 썼는지 확인용)"""
+    values = df[["Close", "High", "Low", "Open", "Volume"]].to_numpy()
+    return hashlib.sha1(values.tobytes()).hexdigest()[:12]
+
+
+def measure(fn, repeat=REPEAT, memory=True):
+    """
+    fn()을 repeat번 실행한 시간(최소 / 중앙값)과, 한 번 더 실행해서 잰 최대 메모리 할당량(tracemalloc)
+    시간 측정 중에는 tracemalloc을 끄고 출력(print)은 버립니다.
+    """
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+
+        peak = None
+        if memory:
+            tracemalloc.start()
+            try:
+                fn()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    return {"seconds": min(times), "median": float(np.median(times)), "repeat": repeat,
+            "peak_mb": None if peak is None else round(peak / 1024 ** 2, 2)}
+
+
+def _universe_stages(df, stages, workdir):
+    """종목 수 하나에 대한 단계별 측정 함수 {단계: fn}"""
+    from bootstrap import bootstrap_beta
+    from compact_panel import load_compact
+    from eda import load_data
+    from indicators import compute_indicators
+    from pairwise import pairwise_corr
+    from statistical_analysis import calculate_beta, calculate_beta_batch
+    from technical_analysis import add_technical_indicators
+
+    store_dir = os.path.join(workdir, "price_store")
+    save_prices(df, store_dir)
+    close = df.pivot(columns="Ticker", values="Close")
+    returns = close.ffill().dropna().pct_change().dropna()
+    tickers = [t for t in close.columns if t != MARKET_TICKER]
+    frames = {t: close[[t]].rename(columns={t: "Close"}) for t in tickers}
+
+    fns = {
+        "load_data": lambda: load_data(store_dir),
+        "load_compact": lambda: load_compact(store_dir),
+        "add_technical_indicators": lambda: [add_technical_indicators(f.copy()) for f in frames.values()],
+        "compute_indicators": lambda: compute_indicators(close[tickers]),
+        "calculate_beta": lambda: [calculate_beta(returns, MARKET_TICKER, t) for t in tickers],
+        "calculate_beta_batch": lambda: calculate_beta_batch(returns, MARKET_TICKER, tickers),
+        "bootstrap_beta": lambda: bootstrap_beta(returns, MARKET_TICKER, tickers, seed=SEED, num_workers=1),
+        "pairwise_corr": lambda: pairwise_corr(close.pct_change()),
+    }
+    if "load_data_csv" in stages:
+        csv_path = os.path.join(workdir, "stock_market_data.csv")
+        df.to_csv(csv_path)
+        fns["load_data_csv"] = lambda: load_data(csv_path)
+    return {name: fns[name] for name in stages if name in fns}
+
+
+def run_benchmarks(ticker_grid=TICKER_GRID, simulation_grid=SIMULATION_GRID, simulation_tickers=SIMULATION_TICKERS,
+                   num_days=NUM_DAYS, stages=None, repeat=REPEAT, memory=True, seed=SEED):
+    """
+    규모별(종목 수 / 시뮬레이션 수) 단계 측정
+    반환: {"meta": 실행 환경, "results": [{"stage", "tickers", "days", "simulations", "seconds", ...}]}
+    """
+    stages = [s for s in STAGES if s not in OPTIONAL_STAGES] if stages is None else list(stages)
+    results = []
+
+    def add(stage, num_tickers, simulations, df, fn):
+        result = measure(fn, repeat, memory)
+        results.append(dict(stage=stage, tickers=num_tickers, days=num_days, simulations=simulations,
+                            data_hash=data_hash(df), **result))
+        label = f"{stage} (종목 {num_tickers}" + (f", 시뮬레이션 {simulations:,}" if simulations else "") + ")"
+        memory_text = f", 메모리 {result['peak_mb']:.1f}MB" if result["peak_mb"] is not None else ""
+        print(f"  {label}: {result['seconds']:.4f}초{memory_text}")
+
+    # 1. 종목 수별 (로드 / 지표 / 베타)
+    universe_stages = [s for s in stages if s != "run_monte_carlo_simulation"]
+    if universe_stages:
+        for num_tickers in ticker_grid:
+            print(f"\n[종목 {num_tickers}개 x {num_days}일]")
+            df = synthetic_ohlcv(num_tickers, num_days, seed)
+            with tempfile.TemporaryDirectory() as workdir:
+                for stage, fn in _universe_stages(df, universe_stages, workdir).items():
+                    add(stage, num_tickers, None, df, fn)
+
+    # 2. 시뮬레이션 수별 (몬테카를로)
+    if "run_monte_carlo_simulation" in stages:
+        from portfolio_optimization import run_monte_carlo_simulation
+
+        for num_tickers in simulation_tickers:
+            print(f"\n[몬테카를로: 종목 {num_tickers}개]")
+            df = synthetic_ohlcv(num_tickers, num_days, seed)
+            close = df.pivot(columns="Ticker", values="Close").drop(columns=MARKET_TICKER)
+            returns = close.pct_change().dropna()
+            for simulations in simulation_grid:
+                add("run_monte_carlo_simulation", num_tickers, simulations, df,
+                    lambda n=simulations: run_monte_carlo_simulation(close, n, daily_returns=returns, seed=seed))
+
+    meta = {"time": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0],
+            "numpy": np.__version__, "pandas": pd.__version__, "platform": platform.platform(),
+            "cpu_count": os.cpu_count(), "seed": seed, "days": num_days, "repeat": repeat}
+    return {"meta": meta, "results": results}
+
+
+def save_results(report, result_dir=RESULT_DIR):
+    """결과를 result_dir/benchmark_YYYYmmdd-HHMMSS.json 으로 저장하고 경로를 반환"""
+    os.makedirs(result_dir, exist_ok=True)
+    stamp = datetime.fromisoformat(report["meta"]["time"]).strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(result_dir, f"benchmark_{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    return path
+
+
+def compare_results(baseline, current, ratio=REGRESSION_RATIO, min_diff=MIN_DIFF):
+    """
+    두 결과에서 같은 (단계, 종목 수, 일수, 시뮬레이션 수) 항목끼리 시간 비교
+    반환: 비교표 DataFrame (regression 열이 True면 성능 저하)
+    """
+    key = ["stage", "tickers", "days", "simulations"]
+    old = pd.DataFrame(baseline["results"])
+    new = pd.DataFrame(current["results"])
+    if old.empty or new.empty:
+        return pd.DataFrame(columns=key + ["before", "after", "ratio", "regression"])
+    merged = new.merge(old, on=key, suffixes=("", "_before")).fillna({"simulations": 0})
+    table = merged[key].copy()
+    table["before"] = merged["seconds_before"]
+    table["after"] = merged["seconds"]
+    table["ratio"] = table["after"] / table["before"]
+    table["regression"] = (table["ratio"] > ratio) & (table["after"] - table["before"] > min_diff)
+    # 입력 데이터가 다르면 (생성기 변경 등) 비교 의미가 없으므로 표시
+    table["same_data"] = merged["data_hash"] == merged["data_hash_before"]
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AlphaSeeker 합성 데이터 벤치마크 (시간 / 메모리)")
+    parser.add_argument("--tickers", type=int, nargs="+", default=TICKER_GRID, help="종목 수 목록")
+    parser.add_argument("--days", type=int, default=NUM_DAYS, help="거래일 수")
+    parser.add_argument("--simulations", type=int, nargs="+", default=SIMULATION_GRID, help="시뮬레이션 수 목록")
+    parser.add_argument("--simulation-tickers", type=int, nargs="+", default=SIMULATION_TICKERS,
+                        help="몬테카를로 종목 수 목록")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, help="측정할 단계 (기본: CSV 로드 제외 전체)")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="반복 횟수 (최솟값 사용)")
+    parser.add_argument("--no-memory", action="store_true", help="메모리 측정 생략")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--output", default=RESULT_DIR, help="결과 폴더")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON (느려진 항목이 있으면 종료 코드 1)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.tickers, args.simulations, args.simulation_tickers, args.days, args.stages,
+                            args.repeat, not args.no_memory, args.seed)
+    path = save_results(report, args.output)
+    print(f"\n결과 저장: {path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        table = compare_results(baseline, report)
+        print(f"\n[비교: {args.compare}]")
+        print(table.round(4).to_string(index=False))
+        regressions = table[table["regression"]]
+        if not regressions.empty:
+            print(f"\n성능 저하 {len(regressions)}건 ({REGRESSION_RATIO}배 이상 느려짐)")
+            return 1
+        print("\n성능 저하 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
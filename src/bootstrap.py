@@ -0,0 +1,182 @@
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import perf
+from compact_panel import as_frame
+from pairwise import MIN_OVERLAP
+from panel import get_aligned_returns
+from statistical_analysis import calculate_beta_batch
+
+# 베타 / 알파의 부트스트랩 신뢰구간
+# 재표본마다 날짜를 한 번만 뽑고 ('날짜별 뽑힌 횟수' 행렬), 모든 종목의 회귀를
+# (재표본 x 날짜) @ (날짜 x 종목) 행렬 곱으로 한 번에 계산합니다. (종목 / 재표본 루프 없음)
+NUM_RESAMPLES = 1000
+# 프로세스 하나가 한 번에 맡는 재표본 수 (시드도 이 단위로 나눔)
+BATCH_SIZE = 100
+CONFIDENCE = 0.95
+
+_DATA = None
+
+
+def resample_counts(num_days, num_resamples, block_size=None, rng=None):
+    """
+    (재표본 수 x 날짜 수) 각 날짜가 뽑힌 횟수
+    block_size=None: 날짜를 하나씩 복원 추출 (iid)
+    block_size=정수: 연속된 block_size일 묶음을 뽑음 (순환 블록 부트스트랩 - 자기상관 / 변동성 군집 보존)
+    """
+    rng = np.random.default_rng(rng)
+    if not block_size or block_size <= 1:
+        idx = rng.integers(0, num_days, size=(num_resamples, num_days))
+    else:
+        num_blocks = -(-num_days // block_size)
+        starts = rng.integers(0, num_days, size=(num_resamples, num_blocks))
+        idx = ((starts[:, :, None] + np.arange(block_size)) % num_days).reshape(num_resamples, -1)[:, :num_days]
+    offsets = np.arange(num_resamples)[:, None] * num_days
+    counts = np.bincount((idx + offsets).ravel(), minlength=num_resamples * num_days)
+    return counts.reshape(num_resamples, num_days).astype(np.float64)
+
+
+def _prepare(x, y):
+    """
+    회귀에 쓰는 배열을 한 번만 준비 (결측은 0 + 마스크, 평균을 빼서 합계 오차 줄이기)
+    결측이 없으면 시장 수익률은 벡터 하나로 (행렬 곱 2번), 있으면 종목별로 마스크를 씌운 행렬로 (5번)
+    """
+    mask = ~np.isnan(y) & ~np.isnan(x)[:, None]
+    cx = np.nanmean(x) if len(x) else 0.0
+    count = mask.sum(axis=0)
+    cy = np.where(count > 0, np.where(mask, y, 0.0).sum(axis=0) / np.maximum(count, 1), 0.0)
+    xc = np.where(np.isnan(x), 0.0, x - cx)
+    yc = np.where(mask, y - cy, 0.0)
+    data = {"cx": cx, "cy": cy, "y": yc, "xy": xc[:, None] * yc, "complete": bool(mask.all())}
+    if data["complete"]:
+        data.update(x=xc, xx=xc * xc)
+    else:
+        xm = np.where(mask, xc[:, None], 0.0)
+        data.update(mask=mask.astype(np.float64), x=xm, xx=xm * xm)
+    return data
+
+
+def _regress(counts, data, min_periods):
+    """뽑힌 횟수 행렬 (재표본 x 날짜) -> 재표본별 모든 종목의 (beta, alpha) (재표본 x 종목)"""
+    if data["complete"]:
+        n = counts.sum(axis=1)[:, None]
+        sx = (counts @ data["x"])[:, None]
+        sxx = (counts @ data["xx"])[:, None]
+    else:
+        n = counts @ data["mask"]
+        sx = counts @ data["x"]
+        sxx = counts @ data["xx"]
+    sy = counts @ data["y"]
+    sxy = counts @ data["xy"]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = (sxy - sx * sy / n) / (sxx - sx * sx / n)
+        alpha = data["cy"] + sy / n - beta * (data["cx"] + sx / n)
+    short = np.broadcast_to(n < max(min_periods, 3), beta.shape)
+    beta[short] = np.nan
+    alpha[short] = np.nan
+    return beta, alpha
+
+
+def _init_worker(data):
+    # 프로세스마다 한 번만 데이터를 받아 둠 (배치마다 다시 보내지 않음)
+    global _DATA
+    _DATA = data
+
+
+def bootstrap_batch(num_resamples, seed, num_days, block_size=None, min_periods=MIN_OVERLAP, data=None):
+    """
+    재표본 num_resamples개의 (beta, alpha) (재표본 x 종목)
+    seed: SeedSequence (배치마다 독립적인 난수 흐름), data: 없으면 프로세스에 받아 둔 데이터
+    """
+    counts = resample_counts(num_days, num_resamples, block_size, np.random.default_rng(seed))
+    return _regress(counts, _DATA if data is None else data, min_periods)
+
+
+@perf.timed("bootstrap.bootstrap_beta", data="returns_df", record=("num_resamples", "block_size"))
+def bootstrap_beta(returns_df, market_ticker, stock_tickers=None, num_resamples=NUM_RESAMPLES, block_size=None,
+                   confidence=CONFIDENCE, seed=None, num_workers=None, batch_size=BATCH_SIZE,
+                   min_periods=MIN_OVERLAP):
+    """
+    모든 종목의 베타 / 알파 부트스트랩 신뢰구간 (백분위 구간)
+    - 재표본마다 날짜를 한 번 뽑아 모든 종목에 같이 사용 (종목끼리 같은 날짜 조합)
+    - block_size를 주면 연속된 날짜 묶음을 뽑는 블록 부트스트랩
+    - 배치마다 SeedSequence.spawn으로 만든 독립 시드 -> 프로세스 수와 무관하게 같은 seed면 같은 결과
+    - 종목과 시장이 둘 다 값이 있는 날만 사용 (calculate_beta_batch와 같은 기준)
+
+    num_workers=1이면 현재 프로세스에서 실행합니다. (None이면 CPU 수)
+    반환: {"table": 종목별 [beta, beta_lo, beta_hi, beta_se, alpha, alpha_lo, alpha_hi, alpha_se, n_obs],
+           "beta", "alpha": (재표본 수 x 종목 수) 부트스트랩 표본, "tickers": 리스트}
+    """
+    returns_df = as_frame(returns_df)
+    if market_ticker not in returns_df.columns:
+        print(f"데이터 부족: {market_ticker}")
+        return None
+    if stock_tickers is None:
+        stock_tickers = [t for t in returns_df.columns if t != market_ticker]
+    else:
+        stock_tickers = [t for t in stock_tickers if t in returns_df.columns and t != market_ticker]
+    if not stock_tickers:
+        print("데이터 부족: 종목이 없습니다.")
+        return None
+
+    # 1. 점 추정 (전체 표본) + 시장 값이 있는 날짜만 남긴 배열
+    point = calculate_beta_batch(returns_df, market_ticker, stock_tickers, min_periods)
+    market = returns_df[market_ticker].to_numpy(dtype=np.float64)
+    keep = ~np.isnan(market)
+    x = market[keep]
+    y = returns_df[stock_tickers].to_numpy(dtype=np.float64)[keep]
+    data = _prepare(x, y)
+
+    # 2. 재표본을 배치로 나눠 계산 (배치 순서대로 결과 자리에 기록 -> 끝나는 순서와 무관)
+    sizes = [min(batch_size, num_resamples - s) for s in range(0, num_resamples, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    offsets = np.r_[0, np.cumsum(sizes)]
+    num_workers = min(num_workers or os.cpu_count() or 1, len(sizes))
+    betas = np.empty((num_resamples, len(stock_tickers)))
+    alphas = np.empty_like(betas)
+    print(f"부트스트랩 {num_resamples}회 x 종목 {len(stock_tickers)}개 "
+          f"({'블록 ' + str(block_size) + '일' if block_size else 'iid'}, {num_workers}개 프로세스)...")
+
+    if num_workers == 1:
+        for k, (size, batch_seed) in enumerate(zip(sizes, seeds)):
+            betas[offsets[k]:offsets[k + 1]], alphas[offsets[k]:offsets[k + 1]] = \
+                bootstrap_batch(size, batch_seed, len(x), block_size, min_periods, data)
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker, initargs=(data,)) as pool:
+            futures = [pool.submit(bootstrap_batch, size, batch_seed, len(x), block_size, min_periods)
+                       for size, batch_seed in zip(sizes, seeds)]
+            for k, future in enumerate(futures):
+                betas[offsets[k]:offsets[k + 1]], alphas[offsets[k]:offsets[k + 1]] = future.result()
+
+    # 3. 백분위 신뢰구간 + 표준오차 (재표본이 전부 NaN인 종목은 NaN)
+    tail = (1 - confidence) / 2
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        beta_lo, beta_hi = np.nanquantile(betas, [tail, 1 - tail], axis=0)
+        alpha_lo, alpha_hi = np.nanquantile(alphas, [tail, 1 - tail], axis=0)
+        beta_se = np.nanstd(betas, axis=0, ddof=1)
+        alpha_se = np.nanstd(alphas, axis=0, ddof=1)
+
+    table = pd.DataFrame({
+        "beta": point["beta"][0], "beta_lo": beta_lo, "beta_hi": beta_hi, "beta_se": beta_se,
+        "alpha": point["alpha"][0], "alpha_lo": alpha_lo, "alpha_hi": alpha_hi, "alpha_se": alpha_se,
+        "n_obs": point["n_obs"][0],
+    }, index=pd.Index(stock_tickers, name="Ticker"))
+    return {"table": table, "beta": betas, "alpha": alphas, "tickers": stock_tickers}
+
+
+if __name__ == "__main__":
+    market_ticker = "^GSPC"
+    returns_df = get_aligned_returns("data/price_store")
+
+    if returns_df is not None:
+        # 일별 수익률의 변동성 군집을 고려해 20일 블록 부트스트랩
+        result = bootstrap_beta(returns_df, market_ticker, num_resamples=NUM_RESAMPLES, block_size=20, seed=42)
+        if result is not None:
+            print(f"\n베타 / 알파 {CONFIDENCE:.0%} 신뢰구간 (vs {market_ticker}):")
+            print(result["table"].round(4))
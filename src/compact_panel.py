@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+
+from price_store import STORE_DIR, load_arrays
+
+# 종목이 많을 때(수천 개) 메모리를 줄인 가격 패널
+# - 종목 / 날짜 축은 정수 코드 (종목 이름은 목록 하나, 날짜는 1970-01-01 기준 일수 int32)
+# - 값은 (종목 x 날짜) 연속 배열 하나 (float32 선택 가능, 결측은 NaN)
+# - 종목 하나의 시계열 / Wide Format 표는 복사 없는 뷰
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+class CompactPanel:
+    """
+    (종목 x 날짜) 연속 배열 + 정수 코드 축으로 된 가격(또는 수익률) 패널
+
+    - data: (종목 수 x 날짜 수) 배열 - 종목 하나가 연속된 한 행
+    - values: (날짜 x 종목) 전치 뷰 (기존 Wide Format과 같은 방향, 복사 없음)
+    - tickers: 종목 이름 목록 (위치 = 종목 코드), days: 날짜 (일수, int32)
+
+    분석 함수들은 DataFrame 대신 그대로 받습니다. (as_frame으로 복사 없이 DataFrame 뷰로 변환)
+    """
+
+    def __init__(self, data, days, tickers, field="Close"):
+        # 종목 하나(행)는 항상 연속 메모리 (기간을 자른 뷰도 행 단위로는 연속)
+        self.data = np.asarray(data)
+        self.days = np.asarray(days, dtype=np.int32)
+        self.tickers = list(tickers)
+        self.codes = {t: i for i, t in enumerate(self.tickers)}
+        self.field = field
+        if self.data.shape != (len(self.tickers), len(self.days)):
+            raise ValueError(f"배열 모양 {self.data.shape}이 (종목 {len(self.tickers)} x 날짜 {len(self.days)})와 다릅니다.")
+
+    # ------------------------------------------------------------------
+    # 기본 정보
+    # ------------------------------------------------------------------
+    @property
+    def values(self):
+        """(날짜 x 종목) 뷰"""
+        return self.data.T
+
+    @property
+    def shape(self):
+        """(날짜 수, 종목 수) - DataFrame과 같은 방향"""
+        return len(self.days), len(self.tickers)
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + self.days.nbytes
+
+    @property
+    def index(self):
+        """날짜 축 (DatetimeIndex, 필요할 때 만듦)"""
+        return pd.DatetimeIndex(_EPOCH + self.days.astype(np.int64), name="Date")
+
+    @property
+    def columns(self):
+        return pd.Index(self.tickers, name="Ticker")
+
+    def __len__(self):
+        return len(self.days)
+
+    def __repr__(self):
+        start, end = (str(self.index[i].date()) for i in (0, -1)) if len(self.days) else ("-", "-")
+        return (f"CompactPanel({self.field}, 종목 {len(self.tickers)}개 x 날짜 {len(self.days)}개, "
+                f"{start} ~ {end}, {self.dtype}, {self.nbytes / 1024 ** 2:.1f}MB)")
+
+    def __array__(self, dtype=None, copy=None):
+        # np.asarray(panel) -> (날짜 x 종목) 배열 (dtype이 같으면 복사 없음)
+        return self.values if dtype is None else self.values.astype(dtype, copy=False)
+
+    # ------------------------------------------------------------------
+    # 뷰 / 변환
+    # ------------------------------------------------------------------
+    def column(self, ticker):
+        """종목 하나의 값 (연속된 1차원 뷰, 복사 없음)"""
+        return self.data[self.codes[ticker]]
+
+    def series(self, ticker):
+        """종목 하나의 Series (값은 복사 없는 뷰)"""
+        return pd.Series(self.column(ticker), index=self.index, name=ticker, copy=False)
+
+    def to_frame(self, tickers=None):
+        """
+        Wide Format DataFrame (날짜 x 종목)
+        전체 종목이면 복사 없는 뷰 (dtype 유지), tickers를 주면 그 종목만 복사
+        """
+        panel = self if tickers is None else self.select(tickers)
+        return pd.DataFrame(panel.values, index=panel.index, columns=panel.columns, copy=False)
+
+    def select(self, tickers):
+        """일부 종목만 (새 연속 배열)"""
+        codes = [self.codes[t] for t in tickers]
+        return CompactPanel(self.data[codes], self.days, [self.tickers[i] for i in codes], self.field)
+
+    def between(self, start=None, end=None):
+        """[start, end] 기간만 (복사 없는 뷰)"""
+        lo = 0 if start is None else int(np.searchsorted(self.days, _to_days(start), side="left"))
+        hi = len(self.days) if end is None else int(np.searchsorted(self.days, _to_days(end), side="right"))
+        return CompactPanel(self.data[:, lo:hi], self.days[lo:hi], self.tickers, self.field)
+
+    def astype(self, dtype):
+        return CompactPanel(self.data.astype(dtype), self.days, self.tickers, self.field)
+
+    def ffill(self):
+        """
+        결측을 직전 값으로 채운 새 패널 (상장 전 앞부분 결측은 그대로)
+        종목마다 '마지막으로 값이 있던 위치'를 누적 최대값으로 구해서 한 번에 채움 (루프 없음)
+        """
+        filled = self.data.copy()
+        # 결측이 있는 종목만 처리 (보통 일부 종목뿐이라 임시 배열이 작음)
+        rows = np.flatnonzero(np.isnan(self.data).any(axis=1))
+        if len(rows):
+            part = filled[rows]
+            valid = ~np.isnan(part)
+            last = np.where(valid, np.arange(len(self.days), dtype=np.int32), np.int32(0))
+            np.maximum.accumulate(last, axis=1, out=last)
+            part = np.take_along_axis(part, last, axis=1)
+            # 첫 값이 나오기 전은 NaN 유지
+            part[~np.logical_or.accumulate(valid, axis=1)] = np.nan
+            filled[rows] = part
+        return CompactPanel(filled, self.days, self.tickers, self.field)
+
+    def returns(self, log=False, fill=True):
+        """
+        일별 수익률 패널 (첫날 제외). fill=True면 결측 가격을 직전 값으로 채운 뒤 계산합니다.
+        상장 전 / 데이터가 없는 구간은 NaN으로 남아서 종목마다 가능한 구간을 그대로 씁니다.
+        (모든 종목이 있는 날만 남기는 ffill().dropna()와 달리 짧은 종목 때문에 기간이 줄지 않음)
+        """
+        prices = self.ffill().data if fill and np.isnan(self.data).any() else self.data
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = prices[:, 1:] / prices[:, :-1]
+            values = np.log(ratio) if log else np.subtract(ratio, 1, out=ratio)
+        return CompactPanel(values, self.days[1:], self.tickers, "log_returns" if log else "returns")
+
+    def complete(self):
+        """모든 종목 값이 있는 날만 남긴 패널 (dropna와 같음, 복사)"""
+        keep = ~np.isnan(self.data).any(axis=0)
+        return CompactPanel(self.data[:, keep], self.days[keep], self.tickers, self.field)
+
+
+def _to_days(date):
+    return int((np.datetime64(pd.Timestamp(date).date(), "D") - _EPOCH).astype(np.int64))
+
+
+def load_compact(store_dir=STORE_DIR, field="Close", tickers=None, start=None, end=None, dtype=np.float32):
+    """가격 저장소에서 바로 CompactPanel로 읽기 (중간 float64 표 / pivot 없음)"""
+    values, days, tickers = load_arrays(store_dir, field, tickers, start, end, dtype=dtype)
+    return CompactPanel(values, days, tickers, field)
+
+
+def from_long(df, field="Close", dtype=np.float32):
+    """
+    Long Format (Date 인덱스 또는 컬럼 + Ticker 컬럼, data_loader 결과)을 pivot 없이 CompactPanel로
+    종목 / 날짜를 정수 코드로 바꾼 뒤 (종목 코드, 날짜 코드) 위치에 값을 바로 씁니다.
+    """
+    dates = df["Date"] if "Date" in df.columns else df.index
+    days = (pd.DatetimeIndex(dates).values.astype("datetime64[D]") - _EPOCH).astype(np.int64)
+    date_codes, unique_days = pd.factorize(days, sort=True)
+    ticker_codes, tickers = pd.factorize(df["Ticker"], sort=True)
+
+    values = np.full((len(tickers), len(unique_days)), np.nan, dtype=dtype)
+    values[ticker_codes, date_codes] = df[field].to_numpy()
+    return CompactPanel(values, unique_days, list(tickers), field)
+
+
+def from_frame(df, dtype=np.float32, field="Close"):
+    """Wide Format DataFrame (날짜 x 종목) -> CompactPanel"""
+    days = (pd.DatetimeIndex(df.index).values.astype("datetime64[D]") - _EPOCH).astype(np.int64)
+    return CompactPanel(np.ascontiguousarray(df.to_numpy(dtype=dtype).T), days, list(df.columns), field)
+
+
+def as_frame(data):
+    """CompactPanel이면 복사 없는 DataFrame 뷰로, 아니면 그대로 (분석 함수 입력 공통 처리)"""
+    return data.to_frame() if isinstance(data, CompactPanel) else data
+
+
+def as_values(data):
+    """
+    (날짜 x 종목) 값 배열 - dtype 그대로 (CompactPanel은 DataFrame을 거치지 않은 values 뷰)
+    float32 패널을 통째로 float64로 복사하지 않고, 계산하는 쪽에서 필요한 부분만 올려서 씀
+    """
+    return data.values if isinstance(data, CompactPanel) else np.asarray(data)
@@ -0,0 +1,231 @@
+import numpy as np
+import pandas as pd
+
+import perf
+from compact_panel import as_frame
+from pairwise import CHUNK_SIZE, MIN_OVERLAP, pairwise_corr
+from plotting import pyplot, show_or_save
+
+# 종목이 많을 때(수백~수천 개)의 상관관계 분석
+# - 상관계수 행렬은 ndarray 하나 (pandas N x N 표를 만들지 않음)
+# - 히트맵: 계층적 군집 순서로 정렬 + 숫자 표시 없이 (필요하면 블록 평균으로 줄여서) 그림
+# - "상관이 가장 높은 / 낮은 쌍", "X와 가장 비슷한 종목" 질의는 부분 정렬 인덱스에서
+
+# 이 종목 수까지는 기존처럼 숫자를 표시한 히트맵
+ANNOTATE_LIMIT = 15
+# 이 종목 수까지는 축에 종목 이름 표시
+LABEL_LIMIT = 60
+# 히트맵 최대 크기 (한 변의 칸 수, 넘으면 블록 평균으로 줄임)
+HEATMAP_CELLS = 400
+# 종목마다 미리 정렬해 두는 이웃 수 (top-k 질의에서 k가 이보다 크면 행렬에서 다시 계산)
+INDEX_DEPTH = 20
+
+
+@perf.timed("correlation.correlation_matrix", data="returns")
+def correlation_matrix(returns, min_periods=MIN_OVERLAP, dtype=np.float64):
+    """
+    상관계수 행렬 (종목 x 종목 ndarray)
+    결측이 없으면 표준화 수익률 Z로 행렬 곱 한 번 (Z.T @ Z / (n - 1)),
+    결측이 있으면 쌍별 공통 관측일 기준 (pairwise_corr)
+    반환: (corr, tickers)
+    """
+    frame = as_frame(returns)
+    tickers = list(frame.columns)
+    values = frame.to_numpy(dtype=dtype)
+    # 모든 종목이 결측인 날 (pct_change 첫 행 등)은 제외
+    values = values[~np.isnan(values).all(axis=1)]
+    if np.isnan(values).any():
+        return pairwise_corr(frame, min_periods=min_periods).to_numpy(dtype=dtype), tickers
+
+    n = len(values)
+    if n < max(min_periods, 2):
+        return np.full((len(tickers), len(tickers)), np.nan, dtype=dtype), tickers
+    # 표준화 (평균 0, 표준편차 1) 후 행렬 곱 한 번
+    values -= values.mean(axis=0)
+    std = values.std(axis=0, ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values /= std
+    corr = values.T @ values
+    corr /= n - 1
+    np.clip(corr, -1.0, 1.0, out=corr)
+    corr[:, std == 0] = np.nan
+    corr[std == 0] = np.nan
+    np.fill_diagonal(corr, np.where(std == 0, np.nan, 1.0))
+    return corr, tickers
+
+
+def cluster_order(corr, method="average"):
+    """
+    계층적 군집 순서 (비슷하게 움직이는 종목끼리 붙도록 행 / 열을 재정렬할 위치)
+    거리 = sqrt((1 - 상관계수) / 2), 계산할 수 없는 쌍(NaN)은 상관 0으로 봄
+    """
+    from scipy.cluster.hierarchy import leaves_list, linkage
+    from scipy.spatial.distance import squareform
+
+    if len(corr) < 3:
+        return np.arange(len(corr))
+    dist = np.sqrt(np.clip(0.5 * (1.0 - np.nan_to_num(corr, nan=0.0)), 0.0, None))
+    np.fill_diagonal(dist, 0.0)
+    return leaves_list(linkage(squareform(dist, checks=False), method=method))
+
+
+def downsample(matrix, max_cells=HEATMAP_CELLS):
+    """
+    정사각 행렬을 한 변 max_cells칸 이하로 블록 평균 (결측 제외)
+    종목이 수천 개여도 그림에 그리는 칸 수는 일정 (군집 순서로 정렬한 뒤 쓰면 블록 = 비슷한 종목 묶음)
+    """
+    size = len(matrix)
+    if size <= max_cells:
+        return matrix
+    edges = np.linspace(0, size, max_cells + 1).astype(np.int64)[:-1]
+    valid = ~np.isnan(matrix)
+    sums = np.add.reduceat(np.add.reduceat(np.where(valid, matrix, 0.0), edges, axis=0), edges, axis=1)
+    counts = np.add.reduceat(np.add.reduceat(valid.astype(np.float64), edges, axis=0), edges, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return sums / counts
+
+
+@perf.timed("correlation.plot_correlation_map")
+def plot_correlation_map(corr, tickers, order=None, max_cells=HEATMAP_CELLS, ax=None, save_path=None,
+                         title='Stock Correlation Matrix (Daily Returns)'):
+    """
+    숫자 표시 없는 상관계수 히트맵 (order: 행 / 열 순서, 보통 cluster_order 결과)
+    종목이 max_cells보다 많으면 블록 평균으로 줄여서 그림
+    ax를 주면 그 축에만 그리고, 없으면 새 그림을 만들어 화면에 띄우거나 save_path에 저장
+    """
+    if order is not None:
+        corr = corr[np.ix_(order, order)]
+        tickers = [tickers[i] for i in order]
+    image = downsample(corr, max_cells)
+
+    plt = pyplot()
+    fig = None
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(10, 8))
+    mappable = ax.imshow(image, cmap='coolwarm', vmin=-1.0, vmax=1.0, interpolation='nearest')
+    ax.figure.colorbar(mappable, ax=ax, fraction=0.046, pad=0.04)
+    if len(tickers) <= LABEL_LIMIT:
+        ax.set_xticks(range(len(tickers)), tickers, rotation=90, fontsize=7)
+        ax.set_yticks(range(len(tickers)), tickers, fontsize=7)
+    else:
+        ax.set_xticks([])
+        ax.set_yticks([])
+        ax.set_xlabel(f'{len(tickers)} tickers (clustered, {len(image)} x {len(image)} cells)')
+    ax.set_title(title)
+    if fig is not None:
+        show_or_save(fig, save_path)
+    return ax
+
+
+class CorrelationIndex:
+    """
+    상관계수 행렬의 부분 정렬 인덱스
+    종목마다 상관이 가장 높은 / 낮은 depth개 이웃을 np.argpartition으로 미리 골라 둡니다.
+    (전체 정렬 없이 행마다 O(N)) -> top-k 쌍 / 이웃 질의는 인덱스에서 바로 답함
+    """
+
+    def __init__(self, corr, tickers, depth=INDEX_DEPTH, chunk_size=CHUNK_SIZE):
+        self.corr = corr
+        self.tickers = list(tickers)
+        self.codes = {t: i for i, t in enumerate(self.tickers)}
+        self.chunk_size = chunk_size
+        self.depth = max(0, min(depth, len(self.tickers) - 1))
+        self.high = self._row_top(self.depth, largest=True)
+        self.low = self._row_top(self.depth, largest=False)
+
+    @classmethod
+    def from_returns(cls, returns, min_periods=MIN_OVERLAP, depth=INDEX_DEPTH):
+        corr, tickers = correlation_matrix(returns, min_periods)
+        return cls(corr, tickers, depth)
+
+    def _row_top(self, k, largest, rows=None):
+        """행마다 자기 자신 / 결측을 뺀 상위 k개 열 위치 (값 순서대로, (행 수 x k))"""
+        rows = np.arange(len(self.tickers)) if rows is None else np.asarray(rows)
+        result = np.empty((len(rows), k), dtype=np.int64)
+        if k == 0:
+            return result
+        for start in range(0, len(rows), self.chunk_size):
+            chunk = rows[start:start + self.chunk_size]
+            key = self.corr[chunk].astype(np.float64) * (1.0 if largest else -1.0)
+            key[np.arange(len(chunk)), chunk] = np.nan
+            key[np.isnan(key)] = -np.inf
+            # 1. 상위 k개만 골라내기 (부분 정렬)  2. 그 k개만 정렬
+            part = np.argpartition(-key, k - 1, axis=1)[:, :k]
+            order = np.argsort(-np.take_along_axis(key, part, axis=1), axis=1, kind="stable")
+            result[start:start + len(chunk)] = np.take_along_axis(part, order, axis=1)
+        return result
+
+    def neighbours(self, ticker, k=10, largest=True):
+        """ticker와 상관이 가장 높은(largest=False면 낮은) k개 종목 (Series, 값 순서대로)"""
+        i = self.codes[ticker]
+        k = min(k, len(self.tickers) - 1)
+        if k <= self.depth:
+            cols = (self.high if largest else self.low)[i, :k]
+        else:
+            cols = self._row_top(k, largest, rows=[i])[0]
+        values = self.corr[i, cols].astype(np.float64)
+        # 값이 있는 이웃이 k개보다 적으면 자기 자신 / 결측이 섞여 있음
+        keep = ~np.isnan(values) & (cols != i)
+        return pd.Series(values[keep], index=[self.tickers[j] for j in cols[keep]], name=ticker)
+
+    def top_pairs(self, k=10, largest=True):
+        """
+        상관이 가장 높은(largest=False면 낮은) 종목 쌍 k개 [Ticker 1, Ticker 2, Correlation]
+        전체 상위 k개 쌍은 반드시 각 행의 상위 k개 안에 있으므로 후보(N x k)만 비교합니다.
+        """
+        num_assets = len(self.tickers)
+        if num_assets < 2 or k <= 0:
+            return pd.DataFrame(columns=["Ticker 1", "Ticker 2", "Correlation"])
+        width = min(k, num_assets - 1)
+        cols = (self.high if largest else self.low)[:, :width] if width <= self.depth \
+            else self._row_top(width, largest)
+
+        # 후보 쌍 (행, 열) -> (작은 위치, 큰 위치)로 중복 제거
+        rows = np.repeat(np.arange(num_assets), width)
+        cols = cols.ravel()
+        lo, hi = np.minimum(rows, cols), np.maximum(rows, cols)
+        codes = np.unique(lo * num_assets + hi)
+        lo, hi = codes // num_assets, codes % num_assets
+        values = self.corr[lo, hi].astype(np.float64)
+        keep = ~np.isnan(values) & (lo != hi)
+        lo, hi, values = lo[keep], hi[keep], values[keep]
+
+        k = min(k, len(values))
+        if k == 0:
+            return pd.DataFrame(columns=["Ticker 1", "Ticker 2", "Correlation"])
+        key = values if largest else -values
+        top = np.argpartition(-key, k - 1)[:k] if k < len(values) else np.arange(len(values))
+        top = top[np.argsort(-key[top], kind="stable")]
+        return pd.DataFrame({"Ticker 1": [self.tickers[i] for i in lo[top]],
+                             "Ticker 2": [self.tickers[j] for j in hi[top]],
+                             "Correlation": values[top]})
+
+
+def explore(returns, min_periods=MIN_OVERLAP, cluster=True, depth=INDEX_DEPTH):
+    """
+    상관관계 분석 한 번에: 행렬 + 군집 순서 + 부분 정렬 인덱스
+    반환: {"corr": ndarray, "tickers": 리스트, "order": 군집 순서 (cluster=False면 None), "index": CorrelationIndex}
+    """
+    corr, tickers = correlation_matrix(returns, min_periods)
+    with perf.stage("correlation.cluster_order", assets=len(tickers)):
+        order = cluster_order(corr) if cluster else None
+    with perf.stage("correlation.index", assets=len(tickers)):
+        index = CorrelationIndex(corr, tickers, depth)
+    return {"corr": corr, "tickers": tickers, "order": order, "index": index}
+
+
+if __name__ == "__main__":
+    from statistical_analysis import load_and_prep_data
+
+    returns_df = load_and_prep_data("data/price_store")
+    if returns_df is not None:
+        result = explore(returns_df)
+        index = result["index"]
+        print("상관이 가장 높은 종목 쌍:")
+        print(index.top_pairs(10).round(3).to_string(index=False))
+        print("\n상관이 가장 낮은 종목 쌍:")
+        print(index.top_pairs(10, largest=False).round(3).to_string(index=False))
+        if "^GSPC" in index.codes:
+            print("\n^GSPC와 가장 비슷하게 움직이는 종목:")
+            print(index.neighbours("^GSPC", 10).round(3).to_string())
+        plot_correlation_map(result["corr"], result["tickers"], result["order"])
@@ -0,0 +1,268 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import perf
+from compact_panel import as_frame, as_values
+from pairwise import MIN_OVERLAP, _prepare, pairwise_cov, psd_frame
+
+# 공분산 추정 (최적화 / 대시보드 / 리스크 계산 공통)
+# - sample: 표본 공분산 (DataFrame.cov()와 같은 값)
+# - ledoit_wolf: 표본 공분산을 '평균 분산 x 단위 행렬' 쪽으로 최적 비율만큼 줄임
+#   (종목이 많고 기간이 짧아 표본 공분산이 불안정할 때, sklearn.covariance.ledoit_wolf와 같은 공식)
+# - ewma: 지수 가중 (RiskMetrics, 최근 날짜일수록 큰 가중치)
+# 새 날짜가 추가되면 그 날짜만 합계에 더하고 (window가 있으면 창에서 빠지는 날짜만 빼고) 전체를 다시 계산하지 않습니다.
+METHODS = ("sample", "ledoit_wolf", "ewma")
+EWMA_DECAY = 0.94
+# 캐시에 보관하는 추정기 수 ((종목, 기간, 방법) 조합별)
+MAX_ESTIMATORS = 32
+# 반영한 구간을 확인하는 해시를 이 날짜 수씩 나눠서 계산
+HASH_ROWS = 256
+
+# (종목, 기간, 방법) -> {"lock": 항목별 잠금, "estimator", 반영한 구간 정보}
+# _cache_lock은 캐시 사전 조회 / 추가 / 제거에만, 추정기 갱신은 항목별 잠금으로 (다른 조합은 동시에 계산)
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class CovarianceEstimator:
+    """
+    증분 공분산 추정기
+    update(새 날짜의 수익률)로 합계만 갱신하고 covariance()에서 행렬을 만듭니다.
+    window: 최근 window일만 사용 (sample / ledoit_wolf, None이면 전체), decay: ewma 감쇠 계수
+    결측이 있는 날은 제외합니다.
+    """
+
+    def __init__(self, num_assets, method="sample", window=None, decay=EWMA_DECAY):
+        if method not in METHODS:
+            raise ValueError(f"알 수 없는 방법: {method} (가능: {', '.join(METHODS)})")
+        self.num_assets = num_assets
+        self.method = method
+        self.window = window if method != "ewma" else None
+        self.decay = decay
+        self.n = 0
+        self.shrinkage = 0.0
+        self._shift = None
+        self._rows = np.empty((0, num_assets))
+        self._reset()
+
+    def _reset(self):
+        size = self.num_assets
+        self._count = 0
+        self._s1 = np.zeros(size)            # 합계
+        self._s2 = np.zeros((size, size))    # 곱의 합계
+        self._weight = 0.0                   # ewma 가중치 합
+        # ledoit_wolf 축소 비율 계산용 (날짜별 제곱합 q의 합계)
+        self._sq, self._sqq, self._sqy = 0.0, 0.0, np.zeros(size)
+
+    def _add(self, y, sign):
+        self._count += sign * len(y)
+        self._s1 += sign * y.sum(axis=0)
+        self._s2 += sign * (y.T @ y)
+        if self.method == "ledoit_wolf":
+            q = np.einsum('ij,ij->i', y, y)
+            self._sq += sign * q.sum()
+            self._sqq += sign * (q @ q)
+            self._sqy += sign * (q @ y)
+
+    @perf.timed("covariance.update", data="returns")
+    def update(self, returns):
+        """새 날짜의 수익률 (날짜 x 종목, 오래된 순) 반영"""
+        values = np.asarray(returns, dtype=np.float64).reshape(-1, self.num_assets)
+        values = values[~np.isnan(values).any(axis=1)]
+        if not len(values):
+            return self
+        # 합계 오차를 줄이는 고정 이동값 (처음 들어온 날짜들의 평균)
+        if self._shift is None:
+            self._shift = values.mean(axis=0)
+        y = values - self._shift
+
+        if self.method == "ewma":
+            # 기존 합계는 decay^k로 줄이고 새 날짜는 최근일수록 큰 가중치로 더함 (행렬 곱 한 번)
+            weights = self.decay ** np.arange(len(y) - 1, -1, -1)
+            fade = self.decay ** len(y)
+            self._s1 = fade * self._s1 + weights @ y
+            self._s2 = fade * self._s2 + (y * weights[:, None]).T @ y
+            self._weight = fade * self._weight + weights.sum()
+            self._count += len(y)
+        else:
+            if self.window:
+                if len(y) >= self.window:
+                    # 새 날짜만으로 창이 다 차면 처음부터 (빼기 대신)
+                    self._reset()
+                    y, self._rows = y[-self.window:], self._rows[:0]
+                drop = len(self._rows) + len(y) - self.window
+                if drop > 0:
+                    self._add(self._rows[:drop], -1)
+                    self._rows = self._rows[drop:]
+                self._rows = np.concatenate([self._rows, y])
+            self._add(y, 1)
+        self.n = self._count
+        return self
+
+    def mean(self):
+        """일별 평균 수익률 (ewma는 지수 가중 평균)"""
+        if self.n == 0:
+            return np.full(self.num_assets, np.nan)
+        scale = self._weight if self.method == "ewma" else self.n
+        return self._shift + self._s1 / scale
+
+    def covariance(self):
+        """일별 공분산 행렬 (종목 x 종목 ndarray)"""
+        if self.n < 2:
+            return np.full((self.num_assets, self.num_assets), np.nan)
+        if self.method == "ewma":
+            d = self._s1 / self._weight
+            return self._s2 / self._weight - np.outer(d, d)
+
+        n = self.n
+        d = self._s1 / n
+        scatter = self._s2 - n * np.outer(d, d)
+        if self.method == "sample":
+            return scatter / (n - 1)
+
+        # Ledoit-Wolf: 표본 공분산(1/n)과 mu * I를 shrinkage 비율로 섞음
+        emp = scatter / n
+        p = self.num_assets
+        trace = np.trace(emp)
+        mu = trace / p
+        delta_ = np.sum(emp ** 2)
+        # sum_t (|x_t - 평균|^2)^2 를 합계들로 (평균이 바뀌어도 다시 훑지 않음)
+        dd = d @ d
+        beta_ = (self._sqq + n * dd ** 2 + 4 * d @ self._s2 @ d + 2 * dd * self._sq
+                 - 4 * d @ self._sqy - 4 * dd * (d @ self._s1))
+        beta = (beta_ / n - delta_) / (p * n)
+        delta = (delta_ - 2 * mu * trace + p * mu ** 2) / p
+        beta = min(beta, delta)
+        self.shrinkage = 0.0 if beta <= 0 else beta / delta
+        shrunk = (1 - self.shrinkage) * emp
+        shrunk.flat[::p + 1] += self.shrinkage * mu
+        return shrunk
+
+
+def _hash_rows(hashers, index, values, start, stop):
+    """
+    [start, stop) 날짜의 날짜 / 값을 해시에 이어 붙임 (행 묶음 단위, 패널 전체를 복사하지 않음)
+    이어 붙이는 방식이라 앞부분 해시에 새 날짜만 더하면 전체 해시와 같음
+    """
+    dates, data = hashers
+    dates.update(pd.util.hash_pandas_object(index[start:stop], index=False).to_numpy())
+    for lo in range(start, stop, HASH_ROWS):
+        data.update(np.ascontiguousarray(values[lo:min(lo + HASH_ROWS, stop)]))
+    return hashers
+
+
+def _digest(hashers):
+    return tuple(h.hexdigest() for h in hashers)
+
+
+def _has_gaps(values):
+    """일부 종목만 결측인 날이 있는지 (모든 종목이 결측인 날은 제외)"""
+    missing = np.isnan(values)
+    return bool((missing.any(axis=1) & ~missing.all(axis=1)).any())
+
+
+def pairwise_estimate(returns, method="ledoit_wolf", decay=EWMA_DECAY, min_periods=MIN_OVERLAP):
+    """
+    결측이 섞인 수익률의 ledoit_wolf / ewma 공분산 (종목 x 종목 DataFrame, 양의 준정부호)
+    결측 없는 날만 쓰면 상장일이 다른 종목이 섞였을 때 남는 날이 거의 없으므로, 쌍마다 둘 다 값이 있는 날로 계산
+    - ewma: 날짜 가중치(최근일수록 큼)를 쌍별 공통 관측일에만 적용한 가중 공분산
+    - ledoit_wolf: 쌍별 표본 공분산(1/n)과 축소 비율 공식의 4차 모멘트 항도 쌍별 관측 수로 계산
+      (결측이 없으면 CovarianceEstimator / sklearn과 같은 값)
+    공통 관측일이 min_periods보다 적은 쌍은 0 (pairwise.psd_frame)
+    """
+    values = as_values(returns)
+    values = values[~np.isnan(values).all(axis=1)]
+    # 결측 없는 날 수는 perf 기록으로 (호출마다 출력하지 않음)
+    with perf.stage("covariance.pairwise_estimate", method=method, rows=len(values),
+                    assets=values.shape[1]) as timer:
+        mask, x0, x2, _ = _prepare(values)
+        weights = decay ** np.arange(len(values) - 1, -1, -1) if method == "ewma" else np.ones(len(values))
+
+        # 쌍별 (가중) 관측 수 / 합계 / 곱의 합 (마스크 행렬 곱)
+        weighted = x0 * weights[:, None]
+        n = (mask * weights[:, None]).T @ mask
+        sx = weighted.T @ mask
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = weighted.T @ x0 / n - (sx / n) * (sx.T / n)
+            count = mask.T @ mask
+            short = count < max(min_periods, 2)
+            if method == "ledoit_wolf":
+                # 축소 비율: sum_ij Var(x_i x_j) 추정 / 목표(mu * I)와의 거리 (sklearn ledoit_wolf_shrinkage와 같은 식)
+                pi = (x2.T @ x2) / count ** 2 - cov ** 2 / count
+                valid = np.diagonal(count) >= 2
+                p = int(valid.sum())
+                emp = np.where(short, 0.0, cov)[np.ix_(valid, valid)]
+                mu = np.trace(emp) / p
+                delta = np.sum((emp - mu * np.eye(p)) ** 2) / p
+                beta = min(np.nansum(np.where(short, 0.0, pi)[np.ix_(valid, valid)]) / p, delta)
+                shrinkage = 0.0 if beta <= 0 else beta / delta
+                cov = (1 - shrinkage) * cov
+                cov.flat[::len(cov) + 1] += shrinkage * mu
+        # 공통 구간이 부족한 쌍 / 관측일이 2일 미만인 종목은 NaN -> psd_frame에서 0 / 제외
+        cov[short & ~np.eye(len(cov), dtype=bool)] = np.nan
+        thin = np.diagonal(count) < 2
+        cov[thin] = np.nan
+        cov[:, thin] = np.nan
+        timer.set(complete_rows=int((mask.min(axis=1) > 0).sum()))
+    return psd_frame(cov, returns.columns, np.full(len(cov), np.nan))
+
+
+@perf.timed("covariance.get_covariance", data="returns", record=("method", "window"))
+def get_covariance(returns, method="sample", window=None, decay=EWMA_DECAY):
+    """
+    수익률(날짜 x 종목)의 일별 공분산 행렬 (DataFrame)
+    (종목, window, method) 조합마다 추정기를 캐시해 두고, 같은 데이터에 날짜가 추가됐으면 새 날짜만 반영합니다.
+    (이전에 반영한 구간의 날짜 / 값 해시가 그대로이고 그 뒤로만 늘어난 경우, 아니면 새로 계산)
+    일부 종목만 결측인 날이 있으면 (window가 있으면 최근 window일 안에서) 쌍별 공통 관측일 기준으로 계산합니다.
+    (sample: pairwise_cov, ledoit_wolf / ewma: pairwise_estimate, 음의 고윳값 제거 - 캐시하지 않음)
+    """
+    # 값은 dtype 그대로 (float32 패널도 복사하지 않음, 추정기가 새로 반영하는 날짜만 float64로)
+    values = as_values(returns)
+    tickers = list(returns.columns)
+    index = returns.index
+    if method not in METHODS:
+        raise ValueError(f"알 수 없는 방법: {method} (가능: {', '.join(METHODS)})")
+    if _has_gaps(values[-window:] if window else values):
+        frame = as_frame(returns)
+        recent = frame.iloc[-window:] if window else frame
+        if method == "sample":
+            return pairwise_cov(recent, psd=True)
+        return pairwise_estimate(recent, method, decay)
+
+    key = (tuple(tickers), window, method, decay if method == "ewma" else None)
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            entry = _cache[key] = {"lock": threading.Lock(), "rows": 0}
+            while len(_cache) > MAX_ESTIMATORS:
+                _cache.popitem(last=False)
+        else:
+            _cache.move_to_end(key)
+
+    with entry["lock"]:
+        # 이어서 계산할 수 있는지 확인 (반영한 구간의 날짜 / 값 해시가 그대로이고 뒤로만 늘어남)
+        # 마지막 값만 비교하면 중간 값이 바뀐 데이터도 이어 붙이므로 앞부분 전체를 해시로 확인
+        rows = entry["rows"]
+        hashers = (hashlib.sha1(), hashlib.sha1(str(values.dtype).encode()))
+        start = 0
+        if 0 < rows <= len(index) and index[rows - 1] == entry["last"] \
+                and _digest(_hash_rows(hashers, index, values, 0, rows)) == entry["digest"]:
+            start = rows
+        if start == 0:
+            hashers = (hashlib.sha1(), hashlib.sha1(str(values.dtype).encode()))
+            entry["estimator"] = CovarianceEstimator(len(tickers), method, window, decay)
+        estimator = entry["estimator"].update(values[start:])
+        if len(index):
+            _hash_rows(hashers, index, values, start, len(index))
+            entry.update(rows=len(index), last=index[-1], digest=_digest(hashers))
+        cov = estimator.covariance()
+    return pd.DataFrame(cov, index=returns.columns, columns=returns.columns)
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
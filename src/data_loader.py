@@ -1,50 +1,260 @@
-import yfinance as yf
 import pandas as pd
-import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-# 데이터 저장할 폴더 생성
-if not os.path.exists("data"):
-    os.makedirs("data")
+from price_store import (MAX_GAP_DAYS, STORE_DIR, find_internal_gaps, load_panel, read_index, save_prices,
+                         update_coverage, write_index)
 
-def download_stock_data(tickers, start_date, end_date):
+# 청크를 이만큼 기록할 때마다 index.json을 한 번 씀 (청크마다 전체 인덱스를 다시 쓰지 않도록)
+INDEX_FLUSH_CHUNKS = 20
+
+# 다시 시도할 오류: 네트워크 / 입출력 (ConnectionError, TimeoutError 포함)
+# 그 밖의 오류(KeyError, TypeError 등)는 다시 요청해도 같으므로 바로 실패 처리
+RETRY_ON = (OSError,)
+
+def yfinance_source(tickers, start_date, end_date):
     """
-    yfinance를 이용해 주가 데이터를 다운로드하고 저장하는 함수
+    기본 데이터 소스: yfinance로 받아서 Long Format(Date 인덱스 + Ticker 컬럼)으로 반환
+    (다른 소스도 같은 형태(tickers, start_date, end_date) -> DataFrame 이면 교체 가능)
     """
-    print(f"데이터 수집 시작: {tickers}")
-    print(f"기간: {start_date} ~ {end_date}")
+    import yfinance as yf
+    from yfinance.exceptions import YFRateLimitError
+
+    # auto_adjust=True: 수정 종가(Adj Close)를 자동으로 반영해줌
+    try:
+        data = yf.download(tickers, start=start_date, end=end_date, auto_adjust=True, progress=False)
+    except YFRateLimitError as e:
+        # 요청 제한은 기다렸다가 다시 시도하도록 네트워크 오류로 전달
+        raise ConnectionError(str(e)) from e
 
-    # yfinance로 데이터 다운로드
-    # auto_adjust=True: 수정 종가(Adj Close)를 자동으로 반영해줌 
-    data = yf.download(tickers, start=start_date, end=end_date, auto_adjust=True)
-    
-    # 데이터가 잘 받아졌는지 확인 (Multi-index 처리)
-    if len(tickers) > 1:
-        # 여러 종목일 경우 종목 코드가 컬럼 레벨에 생기므로 정리
+    # 종목 코드가 컬럼 레벨에 생기므로 정리 (Multi-index 처리)
+    if isinstance(data.columns, pd.MultiIndex):
         data = data.stack(level=1).rename_axis(['Date', 'Ticker']).reset_index(level=1)
+        data = data.dropna(how='all', subset=[c for c in data.columns if c != 'Ticker'])
+    else:
+        data = data.rename_axis('Date')
+        data['Ticker'] = tickers[0]
 
     return data
 
+def plan_missing_ranges(tickers, start_date, end_date, store_dir=STORE_DIR, fill_gaps=False,
+                        max_gap_days=MAX_GAP_DAYS):
+    """
+    저장소에 이미 있는 구간을 제외하고, 받아야 할 구간을 계산합니다.
+    fill_gaps=True면 저장된 데이터 안에서 max_gap_days일보다 긴 빈 구간도 다시 받습니다.
+    반환: {(시작일, 끝일): [종목, ...]}  (끝일은 yfinance처럼 미포함)
+    같은 구간이 필요한 종목끼리 묶어서 한 번에 요청할 수 있도록 합니다.
+    """
+    index = read_index(store_dir)
+    start = pd.Timestamp(start_date)
+    end = pd.Timestamp(end_date)
+    plan = {}
+
+    def add(range_start, range_end, ticker):
+        if range_start < range_end:
+            key = (str(range_start.date()), str(range_end.date()))
+            plan.setdefault(key, []).append(ticker)
+
+    for ticker in tickers:
+        entry = index["tickers"].get(ticker)
+
+        # 1. 새 종목: 전체 기간
+        if entry is None or entry["rows"] == 0:
+            add(start, end, ticker)
+            continue
+
+        # 2. 앞/뒤 빈 구간 (수집 완료 구간 기준, 없으면 저장된 데이터 기간 기준)
+        covered_start = pd.Timestamp(entry.get("covered_start", entry["start"]))
+        covered_end = pd.Timestamp(entry.get("covered_end", entry["end"])) + pd.Timedelta(
+            days=0 if "covered_end" in entry else 1)
+        add(start, min(end, covered_start), ticker)
+        add(max(start, covered_end), end, ticker)
+
+        # 3. (선택) 중간에 빠진 구간 백필
+        if fill_gaps:
+            for gap_start, gap_end in find_internal_gaps(store_dir, ticker, max_gap_days):
+                add(max(start, gap_start), min(end, gap_end), ticker)
+
+    return plan
+
+class RateLimiter:
+    """
+    여러 스레드가 함께 쓰는 요청 속도 제한기 (초당 rate번)
+    rate가 None이면 제한하지 않습니다.
+    """
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        # 다음 요청 가능 시각을 예약하고, 그때까지 잠시 대기
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_time)
+            self._next_time = slot + self.interval
+        time.sleep(slot - now)
+
+def fetch_with_retry(source, tickers, start_date, end_date, max_retries=3, backoff=1.0, limiter=None,
+                     retry_on=RETRY_ON):
+    """
+    retry_on 오류로 실패하면 backoff * 2^n 초씩 기다렸다가 다시 요청합니다. (지수 백오프)
+    다른 오류는 다시 시도하지 않고 그대로 발생시킵니다.
+    """
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.wait()
+        try:
+            return source(tickers, start_date, end_date)
+        except retry_on as e:
+            error = e
+            if attempt < max_retries:
+                time.sleep(backoff * 2 ** attempt)
+    raise error
+
+def _fetch_chunk(source, chunk, start_date, end_date, max_retries, backoff, limiter, retry_on=RETRY_ON):
+    """
+    한 청크(종목 묶음)를 받습니다.
+    묶음 전체가 네트워크 오류(retry_on)로 계속 실패하면 종목별로 나눠서 다시 받아, 문제 종목만 실패 처리합니다.
+    그 밖의 오류는 다시 요청하지 않고 청크의 모든 종목을 실패 처리합니다.
+    반환: (Long Format DataFrame 또는 None, {실패 종목: 에러 메시지})
+    """
+    try:
+        return fetch_with_retry(source, chunk, start_date, end_date, max_retries, backoff, limiter, retry_on), {}
+    except retry_on as e:
+        if len(chunk) == 1:
+            return None, {chunk[0]: repr(e)}
+    except Exception as e:
+        return None, {ticker: repr(e) for ticker in chunk}
+
+    frames, failed = [], {}
+    for ticker in chunk:
+        try:
+            frames.append(fetch_with_retry(source, [ticker], start_date, end_date, max_retries, backoff, limiter,
+                                           retry_on))
+        except Exception as e:
+            failed[ticker] = repr(e)
+
+    frames = [f for f in frames if f is not None and not f.empty]
+    return (pd.concat(frames) if frames else None), failed
+
+def download_stock_data(tickers, start_date, end_date, store_dir=STORE_DIR,
+                        incremental=False, fill_gaps=False, max_gap_days=MAX_GAP_DAYS, source=yfinance_source,
+                        chunk_size=50, max_workers=4, max_retries=3, backoff=1.0, rate_limit=None,
+                        retry_on=RETRY_ON):
+    """
+    yfinance를 이용해 주가 데이터를 다운로드하고 저장하는 함수
+    store_dir을 주면 바이너리 가격 저장소(price_store)에 바로 기록합니다.
+    incremental=True: 저장소에 없는 구간(새 종목, 앞/뒤 빈 구간)만 받아서 기존 데이터와 합칩니다.
+    source: (tickers, start_date, end_date) -> Long Format DataFrame (테스트용 가짜 소스로 교체 가능)
+
+    종목을 chunk_size개씩 나눠 max_workers개의 스레드로 동시에 받고,
+    청크가 도착하는 대로 저장소에 기록합니다. (전체를 하나의 큰 DataFrame으로 만들지 않음)
+    rate_limit: 초당 최대 요청 수 / max_retries, backoff: 청크별 재시도 설정
+    retry_on: 다시 시도할 오류 종류 (기본: 네트워크 / 입출력 오류)
+
+    반환: {"rows": {종목: 받은 행 수}, "failed": {종목: 에러}, "data": DataFrame (store_dir=None일 때만)}
+    """
+    print(f"데이터 수집 시작: {len(tickers)}개 종목")
+    print(f"기간: {start_date} ~ {end_date}")
+
+    if incremental and store_dir is not None:
+        plan = plan_missing_ranges(tickers, start_date, end_date, store_dir, fill_gaps, max_gap_days)
+    else:
+        plan = {(start_date, end_date): list(tickers)}
+
+    report = {"rows": {}, "failed": {}}
+    if not plan:
+        print("이미 최신 상태입니다. (받을 구간 없음)")
+        return report
+
+    # (구간, 청크) 단위 작업 목록
+    jobs = [(range_start, range_end, group[i:i + chunk_size])
+            for (range_start, range_end), group in plan.items()
+            for i in range(0, len(group), chunk_size)]
+    print(f"  - {len(plan)}개 구간, {len(jobs)}개 청크 (동시 작업 {max_workers}개)")
+
+    limiter = RateLimiter(rate_limit)
+    frames = []
+    done = 0
+    # 인덱스는 한 번 읽어서 메모리에서 갱신하고, INDEX_FLUSH_CHUNKS개마다 + 끝날 때 기록
+    index = read_index(store_dir) if store_dir is not None else None
+    # 저장소에 이미 데이터가 있는 종목 (이 종목들은 구간이 비어도 휴장일 / 상장 전 기간일 수 있음)
+    known = {t for t, entry in index["tickers"].items() if entry["rows"]} if index is not None else set()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(_fetch_chunk, source, chunk, range_start, range_end,
+                                   max_retries, backoff, limiter, retry_on): (range_start, range_end, chunk)
+                       for range_start, range_end, chunk in jobs}
+
+            # 도착하는 순서대로 처리 (저장소 기록은 이 스레드에서만 하므로 인덱스 충돌 없음)
+            for future in as_completed(futures):
+                range_start, range_end, chunk = futures[future]
+                data, failed = future.result()
+                done += 1
+
+                # yfinance는 잘못된 / 상장 폐지 종목에 에러 없이 빈 데이터를 주므로, 돌아온 종목과 비교해서 실패 처리
+                returned = set() if data is None or data.empty else set(data['Ticker'].unique())
+                for ticker in chunk:
+                    if ticker not in returned and ticker not in failed and ticker not in known:
+                        failed[ticker] = "데이터 없음 (잘못된 종목 코드 또는 상장 폐지)"
+                report["failed"].update(failed)
+
+                if data is not None and not data.empty:
+                    counts = data['Ticker'].value_counts()
+                    for ticker, rows in counts.items():
+                        report["rows"][ticker] = report["rows"].get(ticker, 0) + int(rows)
+
+                    # 바이너리 저장소에 기록 (CSV 재파싱 없이 모든 분석 모듈이 바로 열 수 있음)
+                    if store_dir is not None:
+                        save_prices(data, store_dir, merge=incremental, index=index)
+                    else:
+                        frames.append(data)
+                    print(f"  [{done}/{len(jobs)}] {range_start} ~ {range_end}: {len(counts)}개 종목 기록")
+
+                # 에러 없이 받은 종목은 데이터가 없었더라도 이 구간을 수집 완료로 기록
+                # (상장 전 기간, 주말 / 휴장일만 있는 구간 등을 매번 다시 요청하지 않도록)
+                if store_dir is not None:
+                    update_coverage(store_dir, [t for t in chunk if t not in failed], range_start, range_end, index)
+                    if done % INDEX_FLUSH_CHUNKS == 0:
+                        write_index(store_dir, index)
+    finally:
+        # 중간에 예외가 나도 이미 쓴 종목 파일과 인덱스가 어긋나지 않도록 마지막에 한 번 더 기록
+        if index is not None:
+            write_index(store_dir, index)
+
+    if report["failed"]:
+        print(f"실패한 종목 {len(report['failed'])}개: {sorted(report['failed'])}")
+    if store_dir is not None:
+        print(f"저장소 기록 완료: {store_dir}")
+    else:
+        report["data"] = pd.concat(frames) if frames else pd.DataFrame(columns=['Ticker'])
+
+    return report
+
 if __name__ == "__main__":
     # 1. 분석할 종목 리스트 (포트폴리오 구성용)
-    # AAPL(애플), MSFT(마이크로소프트), ^GSPC(S&P500 지수 - 시장 기준), 005930.KS(삼성전자)
-    my_tickers = ["AAPL", "MSFT", "GOOGL", "^GSPC", "005930.KS"]
-    
+    # AAPL(애플), MSFT(마이크로소프트), ^GSPC(S&P500 지수 - 시장 기준), 005930.KS(삼성전자), ^KS11(KOSPI 지수)
+    my_tickers = ["AAPL", "MSFT", "GOOGL", "^GSPC", "005930.KS", "^KS11"]
+
     # 2. 기간 설정 (최근 5년)
     start = "2019-01-01"
     end = datetime.today().strftime('%Y-%m-%d')
 
-    # 3. 데이터 다운로드
-    df = download_stock_data(my_tickers, start, end)
+    # 3. 데이터 다운로드 (저장소에 이미 있는 구간은 건너뜀)
+    report = download_stock_data(my_tickers, start, end, incremental=True)
 
     # 4. 데이터 확인 (EDA 기초)
+    print("\n종목별 수집 행 수:")
+    print(report["rows"])
+
     print("\n데이터 미리보기:")
-    print(df.head())
-    
-    print("\n데이터 정보:")
-    print(df.info())
-
-    # 5. 파일로 저장 (CSV)
-    file_path = "data/stock_market_data.csv"
-    df.to_csv(file_path)
-    print(f"\n데이터 저장 완료: {file_path}")
\ No newline at end of file
+    print(load_panel(STORE_DIR, field='Close', tickers=my_tickers).tail())
+
+    # 5. 저장은 download_stock_data가 price_store(data/price_store)에 이미 완료
+    print(f"\n데이터 저장 완료: {STORE_DIR}")
@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+
+from compact_panel import as_frame
+
+# 시리즈 하나당 차트에 보내는 최대 점 수 (차트 가로 픽셀 수 정도면 눈으로 차이가 없음)
+PIXEL_BUDGET = 1000
+
+
+def _as_2d(values):
+    """1차원이면 (길이 x 1) 2차원 배열로"""
+    values = np.asarray(values, dtype=np.float64)
+    return values[:, None] if values.ndim == 1 else values
+
+
+def minmax_indices(values, num_points=PIXEL_BUDGET):
+    """
+    min/max 버킷 방식: 구간(버킷)마다 최솟값과 최댓값 위치만 남깁니다. (고점 / 저점 보존)
+    values: (길이,) 또는 (길이 x 시리즈 수), 결측(NaN)은 무시
+    반환: (남길 점 수 x 시리즈 수) 위치 배열 (시리즈마다 시간 순서, 처음 / 마지막 점 포함)
+    """
+    y = _as_2d(values)
+    length, num_series = y.shape
+    if length <= num_points:
+        return np.repeat(np.arange(length)[:, None], num_series, axis=1)
+
+    # 버킷 수 = 남길 점 수 / 2 (버킷마다 2개), 앞뒤 끝점은 따로 추가
+    num_buckets = max(1, (num_points - 2) // 2)
+    size = -(-(length - 2) // num_buckets)
+    padded = np.full((num_buckets * size, num_series), np.nan)
+    padded[:length - 2] = y[1:-1]
+    buckets = padded.reshape(num_buckets, size, num_series)
+
+    # 전부 결측인 버킷은 첫 위치로 (np.nanargmin 경고 대신)
+    empty = np.isnan(buckets).all(axis=1)
+    filled_low = np.where(np.isnan(buckets), np.inf, buckets)
+    filled_high = np.where(np.isnan(buckets), -np.inf, buckets)
+    low = np.where(empty, 0, filled_low.argmin(axis=1))
+    high = np.where(empty, 0, filled_high.argmax(axis=1))
+
+    offset = 1 + np.arange(num_buckets)[:, None] * size
+    picks = np.sort(np.stack([low + offset, high + offset], axis=1), axis=1).reshape(-1, num_series)
+    picks = np.minimum(picks, length - 2)
+    first = np.zeros((1, num_series), dtype=picks.dtype)
+    last = np.full((1, num_series), length - 1, dtype=picks.dtype)
+    return np.concatenate([first, picks, last])
+
+
+def lttb_indices(values, num_points=PIXEL_BUDGET, x=None):
+    """
+    LTTB (Largest-Triangle-Three-Buckets): 버킷마다 (앞에서 고른 점, 현재 점, 다음 버킷 평균)이
+    이루는 삼각형 넓이가 가장 큰 점 하나를 고릅니다. 모양(추세 + 급등락)을 잘 보존합니다.
+    여러 시리즈를 한 번에 처리합니다. (버킷 루프만 있고 시리즈 / 버킷 안 점은 벡터 연산)
+
+    values: (길이,) 또는 (길이 x 시리즈 수), x: 가로축 값 (없으면 0, 1, 2, ...)
+    반환: (num_points x 시리즈 수) 위치 배열
+    """
+    y = _as_2d(values)
+    length, num_series = y.shape
+    if length <= num_points or num_points < 3:
+        return np.repeat(np.arange(length)[:, None], num_series, axis=1)
+
+    x = np.arange(length, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+    # 결측은 앞 값으로 채워서 넓이 계산 (고른 위치의 원래 값은 그대로 사용)
+    y = pd.DataFrame(y).ffill().bfill().fillna(0.0).to_numpy()
+
+    # 가운데 num_points - 2개 버킷의 경계 (처음 / 마지막 점은 항상 포함)
+    edges = (1 + np.floor(np.arange(num_points - 1) * (length - 2) / (num_points - 2))).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+
+    # 다음 버킷 평균 (마지막 버킷의 다음은 마지막 점)
+    counts = (ends - starts)[:, None]
+    y_mean = np.add.reduceat(y[:-1], starts, axis=0) / counts
+    x_mean = np.add.reduceat(x[:-1], starts) / counts[:, 0]
+    next_y = np.vstack([y_mean[1:], y[-1:]])
+    next_x = np.r_[x_mean[1:], x[-1]]
+
+    picks = np.empty((num_points, num_series), dtype=np.int64)
+    picks[0] = 0
+    picks[-1] = length - 1
+    cols = np.arange(num_series)
+    prev = np.zeros(num_series, dtype=np.int64)
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        xa, ya = x[prev], y[prev, cols]
+        xb, yb = x[start:end, None], y[start:end]
+        # 삼각형 넓이 x2 (절댓값만 비교하므로 1/2 생략)
+        area = np.abs((xa - next_x[i]) * (yb - ya) - (xa - xb) * (next_y[i] - ya))
+        prev = start + area.argmax(axis=0)
+        picks[i + 1] = prev
+    return picks
+
+
+def _indices(values, num_points, method, x=None):
+    if method == "lttb":
+        return lttb_indices(values, num_points, x)
+    if method == "minmax":
+        return minmax_indices(values, num_points)
+    raise ValueError(f"알 수 없는 방법: {method} (가능: lttb, minmax)")
+
+
+def decimate_series(series, num_points=PIXEL_BUDGET, method="lttb"):
+    """시리즈 하나를 num_points개 이하로 줄입니다. (인덱스 유지)"""
+    picks = _indices(series.to_numpy(dtype=np.float64), num_points, method)[:, 0]
+    return series.iloc[np.unique(picks)]
+
+
+def decimate_frame(df, num_points=PIXEL_BUDGET, method="minmax"):
+    """
+    여러 열을 같은 날짜로 줄입니다. (열마다 고른 위치의 합집합)
+    볼린저 밴드처럼 열끼리 같은 x를 써야 하는 그림용 (열 수가 적을 때)
+    """
+    df = as_frame(df)
+    if len(df) <= num_points:
+        return df
+    per_column = max(3, num_points // max(1, df.shape[1]))
+    picks = _indices(df.to_numpy(dtype=np.float64), per_column, method)
+    return df.iloc[np.unique(picks)]
+
+
+def decimate_long(df, num_points=PIXEL_BUDGET, method="lttb", value_name="Value"):
+    """
+    Wide(날짜 x 종목) -> 종목마다 따로 줄인 Long Format [Date, Ticker, value_name]
+    종목마다 고른 날짜가 달라도 되므로 종목 수와 관계없이 종목당 num_points개만 남습니다.
+    (st.line_chart(..., x="Date", y=value_name, color="Ticker")로 그리기)
+    """
+    df = as_frame(df)
+    values = df.to_numpy(dtype=np.float64)
+    picks = _indices(values, num_points, method)
+    dates = df.index.to_numpy()
+    frames = []
+    for j, ticker in enumerate(df.columns):
+        idx = np.unique(picks[:, j])
+        frames.append(pd.DataFrame({"Date": dates[idx], "Ticker": ticker, value_name: values[idx, j]}))
+    long = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["Date", "Ticker", value_name])
+    return long.dropna(subset=[value_name])
@@ -1,38 +1,47 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
 
-# 폰트 설정 (Mac/Windows 호환)
-import platform
-if platform.system() == 'Darwin':
-    plt.rc('font', family='AppleGothic')
-else:
-    plt.rc('font', family='Malgun Gothic')
-plt.rc('axes', unicode_minus=False)
+import perf
+from compact_panel import as_frame
+from correlation import ANNOTATE_LIMIT, cluster_order, correlation_matrix, plot_correlation_map
+from pairwise import align_returns, pairwise_corr
+from decimate import PIXEL_BUDGET, decimate_series
+from plotting import pyplot, seaborn, show_or_save
+from price_store import is_store, load_panel
 
-def load_data(filepath):
+@perf.timed("eda.load_data")
+def load_data(filepath, tickers=None):
     """
     CSV 파일을 로드하고 'Wide Format'으로 변환합니다.
+    filepath가 가격 저장소(data/price_store)면 필요한 종목의 종가만 바로 읽습니다.
     """
     if not os.path.exists(filepath):
         print(f"데이터 파일이 없습니다: {filepath}")
         return None
+
+    if is_store(filepath):
+        df = load_panel(filepath, field='Close', tickers=tickers)
+        print("데이터 로드 완료 (price_store)")
+        print(f"포함된 종목: {list(df.columns)}")
+        return df
     
     # 1. 일단 평범하게 읽어옵니다.
-    df = pd.read_csv(filepath)
-    
-    # 2. 날짜 컬럼을 datetime 형식으로 변환
-    if 'Date' in df.columns:
-        df['Date'] = pd.to_datetime(df['Date'])
-        df.set_index('Date', inplace=True)
+    with perf.stage("eda.read_csv") as s:
+        df = pd.read_csv(filepath)
+        
+        # 2. 날짜 컬럼을 datetime 형식으로 변환
+        if 'Date' in df.columns:
+            df['Date'] = pd.to_datetime(df['Date'])
+            df.set_index('Date', inplace=True)
+        s.set(rows=len(df))
     
     # 3. 데이터 구조 확인 및 변환 (Pivot)
     # 만약 'Ticker' 컬럼이 존재한다면 -> Long Format이므로 Wide Format으로 변환해야 함
     if 'Ticker' in df.columns and 'Close' in df.columns:
         print("데이터를 분석용 형태(Wide Format)로 변환 중...")
         # 행: 날짜, 열: 종목명, 값: 종가(Close)
-        df = df.pivot(columns='Ticker', values='Close')
+        with perf.stage("eda.pivot", rows=len(df)):
+            df = df.pivot(columns='Ticker', values='Close')
     
     print("데이터 로드 및 변환 완료")
     print(f"포함된 종목: {list(df.columns)}")
@@ -42,6 +51,7 @@ def preprocess_data(df):
     """
     결측치(NaN) 처리
     """
+    df = as_frame(df)
     print("\n결측치(NaN) 확인 (전처리 전):")
     print(df.isnull().sum())
     
@@ -53,49 +63,69 @@ def preprocess_data(df):
     
     return df
 
-def plot_price_trend(df, ticker1, ticker2):
+def plot_price_trend(df, ticker1, ticker2, max_points=PIXEL_BUDGET, save_path=None):
     """
     두 종목의 가격 비교 (이중축)
+    긴 기간은 종목마다 max_points개로 줄여서 그립니다. (LTTB - 고점/저점 모양 보존, None이면 전체)
+    save_path: 지정하면 화면에 띄우지 않고 이미지 파일로 저장
     """
+    df = as_frame(df)
     # 컬럼이 있는지 확인
     if ticker1 not in df.columns or ticker2 not in df.columns:
         print(f"경고: {ticker1} 또는 {ticker2} 가 데이터에 없습니다.")
         return
 
+    series1, series2 = df[ticker1], df[ticker2]
+    if max_points:
+        series1, series2 = decimate_series(series1, max_points), decimate_series(series2, max_points)
+
+    plt = pyplot()
     fig, ax1 = plt.subplots(figsize=(12, 6))
 
     # 왼쪽 축
     color = 'tab:blue'
     ax1.set_xlabel('Date')
     ax1.set_ylabel(f'{ticker1} Price', color=color)
-    ax1.plot(df.index, df[ticker1], color=color, label=ticker1)
+    ax1.plot(series1.index, series1, color=color, label=ticker1)
     ax1.tick_params(axis='y', labelcolor=color)
 
     # 오른쪽 축
     ax2 = ax1.twinx()  
     color = 'tab:red'
     ax2.set_ylabel(f'{ticker2} Price', color=color)
-    ax2.plot(df.index, df[ticker2], color=color, label=ticker2)
+    ax2.plot(series2.index, series2, color=color, label=ticker2)
     ax2.tick_params(axis='y', labelcolor=color)
 
     plt.title(f'Price Comparison: {ticker1} vs {ticker2}')
     fig.tight_layout()
-    plt.show()
+    show_or_save(fig, save_path)
 
-def plot_correlation(df):
+def plot_correlation(df, daily_returns=None, calendar=None, save_path=None):
     """
     상관관계 히트맵
+    daily_returns: 공통 패널의 수익률 행렬을 넘기면 다시 계산하지 않습니다.
+    결측이 있어도 종목 쌍마다 둘 다 값이 있는 날로 계산합니다. (calendar: align_returns 참고)
+    종목이 많으면 숫자 없이 군집 순서로 정렬한 히트맵을 그립니다. (correlation.plot_correlation_map)
+    save_path: 지정하면 화면에 띄우지 않고 이미지 파일로 저장
     """
-    # 일별 수익률로 변환
-    daily_returns = df.pct_change().dropna()
+    df, daily_returns = as_frame(df), as_frame(daily_returns)
+    # 일별 수익률로 변환 (휴장일은 0% 대신 결측, 상장 전 기간도 그대로 둠)
+    if daily_returns is None:
+        daily_returns = align_returns(df, calendar=calendar)
     
-    plt.figure(figsize=(10, 8))
-    sns.heatmap(daily_returns.corr(), annot=True, cmap='coolwarm', fmt=".2f", linewidths=.5)
+    if daily_returns.shape[1] > ANNOTATE_LIMIT:
+        corr, tickers = correlation_matrix(daily_returns)
+        plot_correlation_map(corr, tickers, cluster_order(corr), save_path=save_path)
+        return
+
+    plt, sns = pyplot(), seaborn()
+    fig = plt.figure(figsize=(10, 8))
+    sns.heatmap(pairwise_corr(daily_returns), annot=True, cmap='coolwarm', fmt=".2f", linewidths=.5)
     plt.title('Stock Correlation Matrix (Daily Returns)')
-    plt.show()
+    show_or_save(fig, save_path)
 
 if __name__ == "__main__":
-    file_path = "data/stock_market_data.csv"
+    file_path = "data/price_store"
     
     # 1. 데이터 로드
     raw_df = load_data(file_path)
@@ -0,0 +1,214 @@
+import numpy as np
+import json
+import math
+import os
+from collections import deque
+
+from indicators import BB_K, BB_WINDOW, MA_WINDOWS, RSI_WINDOW
+
+# 누적 오차가 쌓이지 않도록 이 횟수마다 버퍼에서 합계를 다시 계산 (평균적으로 O(1))
+RESYNC_EVERY = 1000
+
+
+class IndicatorState:
+    """
+    한 종목의 이동평균 / 볼린저 밴드 / RSI를 새 봉(bar)마다 O(1)로 갱신하는 상태 객체
+    과거 데이터로 한 번 초기화(from_history)한 뒤 update(종가)만 호출하면 됩니다.
+    결과는 indicators.compute_indicators의 마지막 행과 같습니다. (창 안에 결측 봉이 있으면 NaN)
+    """
+
+    def __init__(self, ma_windows=MA_WINDOWS, bb_window=BB_WINDOW, bb_k=BB_K, rsi_window=RSI_WINDOW):
+        self.ma_windows = tuple(ma_windows)
+        self.bb_window = bb_window
+        self.bb_k = bb_k
+        self.rsi_window = rsi_window
+
+        # 가장 긴 창 길이만큼의 최근 종가 (고정 크기 버퍼)
+        self.closes = deque(maxlen=max(self.ma_windows + (bb_window,)))
+        self.ma_sums = {w: 0.0 for w in self.ma_windows}
+
+        # 볼린저 밴드용 창 평균/제곱편차합 (Welford 방식)
+        self.bb_mean = 0.0
+        self.bb_m2 = 0.0
+
+        # RSI용 최근 상승폭/하락폭
+        self.gains = deque(maxlen=rsi_window)
+        self.losses = deque(maxlen=rsi_window)
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+
+        # 마지막 결측 봉 이후 연속으로 들어온 봉 수 (창 길이 이상이어야 그 지표 값이 있음)
+        self.prev_close = None
+        self.count = 0
+        self.updates = 0
+
+    # ------------------------------------------------------------------
+    # 갱신
+    # ------------------------------------------------------------------
+    def update(self, bar):
+        """
+        새 종가 하나를 반영하고 현재 지표 값을 반환합니다.
+        bar: 종가(float) 또는 'Close' 키가 있는 dict/Series.
+        결측(NaN) 봉은 배치 계산과 같이 창에 포함됩니다: 이후 창 길이만큼 봉이 다시 쌓일 때까지 해당 지표는 NaN,
+        결측 다음 봉의 등락폭은 0으로 봅니다.
+        """
+        close = float(bar["Close"]) if not isinstance(bar, (int, float, np.number)) else float(bar)
+        if math.isnan(close):
+            self.prev_close = None
+            self.count = 0
+            return self.values()
+
+        self._push_close(close)
+        self._push_delta(0.0 if self.prev_close is None else close - self.prev_close)
+        self.prev_close = close
+        self.count += 1
+
+        self.updates += 1
+        if self.updates % RESYNC_EVERY == 0:
+            self._resync()
+
+        return self.values()
+
+    def _push_close(self, close):
+        """종가 버퍼와 이동평균/볼린저 합계 갱신"""
+        # 버퍼가 가득 차면 가장 오래된 값이 빠지므로, 빠지기 전에 창별로 빠질 값을 구함
+        leaving = {w: self.closes[-w] if len(self.closes) >= w else None
+                   for w in set(self.ma_windows + (self.bb_window,))}
+        self.closes.append(close)
+
+        for w in self.ma_windows:
+            self.ma_sums[w] += close - (leaving[w] or 0.0)
+
+        old = leaving[self.bb_window]
+        if old is None:
+            # 창이 다 차기 전: 일반 Welford 누적
+            n = min(len(self.closes), self.bb_window)
+            delta = close - self.bb_mean
+            self.bb_mean += delta / n
+            self.bb_m2 += delta * (close - self.bb_mean)
+        else:
+            # 창이 가득 찬 뒤: 새 값 추가 + 오래된 값 제거를 한 번에
+            new_mean = self.bb_mean + (close - old) / self.bb_window
+            self.bb_m2 += (close - old) * (close - new_mean + old - self.bb_mean)
+            self.bb_mean = new_mean
+
+    def _push_delta(self, delta):
+        """RSI 상승폭/하락폭 버퍼와 합계 갱신"""
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        if len(self.gains) == self.rsi_window:
+            self.gain_sum -= self.gains[0]
+            self.loss_sum -= self.losses[0]
+        self.gains.append(gain)
+        self.losses.append(loss)
+        self.gain_sum += gain
+        self.loss_sum += loss
+
+    def _resync(self):
+        """버퍼에서 합계를 다시 계산해 부동소수점 누적 오차 제거"""
+        closes = list(self.closes)
+        for w in self.ma_windows:
+            self.ma_sums[w] = math.fsum(closes[-w:])
+        window = closes[-self.bb_window:]
+        self.bb_mean = math.fsum(window) / len(window)
+        self.bb_m2 = math.fsum((c - self.bb_mean) ** 2 for c in window)
+        self.gain_sum = math.fsum(self.gains)
+        self.loss_sum = math.fsum(self.losses)
+
+    # ------------------------------------------------------------------
+    # 현재 값
+    # ------------------------------------------------------------------
+    def values(self):
+        """현재 지표 값 (창이 아직 안 찼으면 NaN)"""
+        result = {}
+        for w in self.ma_windows:
+            result[f"MA{w}"] = self.ma_sums[w] / w if self.count >= w else np.nan
+
+        if self.count >= self.bb_window:
+            std = math.sqrt(max(self.bb_m2, 0.0) / (self.bb_window - 1))
+            result["Bollinger_Upper"] = self.bb_mean + self.bb_k * std
+            result["Bollinger_Lower"] = self.bb_mean - self.bb_k * std
+        else:
+            result["Bollinger_Upper"] = result["Bollinger_Lower"] = np.nan
+
+        if self.count >= self.rsi_window and self.gain_sum + self.loss_sum > 0:
+            # 100 - 100 / (1 + gain/loss) 와 같은 식 (loss가 0이면 100)
+            result["RSI"] = 100.0 * self.gain_sum / (self.gain_sum + self.loss_sum)
+        else:
+            result["RSI"] = np.nan
+        return result
+
+    # ------------------------------------------------------------------
+    # 초기화 / 저장
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_history(cls, closes, **params):
+        """
+        과거 종가로 상태를 초기화합니다.
+        지표는 최근 (가장 긴 창 + 1)개 종가에만 의존하므로 그 부분만 반영합니다.
+        결측이 있으면 마지막 결측 이후 구간만 반영합니다. (그 이전 값은 창에 들어가지 않음)
+        """
+        state = cls(**params)
+        closes = np.asarray(closes, dtype=np.float64)
+        missing = np.flatnonzero(np.isnan(closes))
+        if len(missing):
+            closes = closes[missing[-1] + 1:]
+
+        need = max(state.closes.maxlen, state.rsi_window) + 1
+        if len(closes) > need:
+            # 잘라낸 앞부분은 개수와 직전 종가만 필요
+            state.count = len(closes) - need
+            state.prev_close = float(closes[-need - 1])
+            closes = closes[-need:]
+
+        for close in closes:
+            state.update(float(close))
+        if state.closes:
+            state._resync()
+        return state
+
+    def to_dict(self):
+        """JSON으로 저장할 수 있는 dict"""
+        return {
+            "params": {"ma_windows": list(self.ma_windows), "bb_window": self.bb_window,
+                       "bb_k": self.bb_k, "rsi_window": self.rsi_window},
+            "closes": list(self.closes),
+            "gains": list(self.gains),
+            "losses": list(self.losses),
+            "prev_close": self.prev_close,
+            "count": self.count,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """to_dict() 결과로 상태 복원 (합계는 버퍼에서 다시 계산)"""
+        state = cls(**data["params"])
+        state.closes.extend(data["closes"])
+        state.gains.extend(data["gains"])
+        state.losses.extend(data["losses"])
+        state.prev_close = data["prev_close"]
+        state.count = data["count"]
+        if state.closes:
+            state._resync()
+        return state
+
+
+def save_states(states, path):
+    """{종목: IndicatorState}를 JSON 파일 하나로 저장 (재시작 후 이어서 갱신)"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({t: s.to_dict() for t, s in states.items()}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def load_states(path):
+    """save_states로 저장한 파일에서 {종목: IndicatorState} 복원"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return {t: IndicatorState.from_dict(d) for t, d in json.load(f).items()}
+
+
+def seed_states(prices, **params):
+    """Wide Format 가격(날짜 x 종목)으로 전체 종목 상태를 한 번에 초기화"""
+    return {ticker: IndicatorState.from_history(prices[ticker].to_numpy(), **params)
+            for ticker in prices.columns}
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+import perf
+from compact_panel import as_frame, as_values
+
+# 기본 지표 설정 (technical_analysis.add_technical_indicators와 동일)
+MA_WINDOWS = (20, 60)
+BB_WINDOW = 20
+BB_K = 2.0
+RSI_WINDOW = 14
+
+
+def _prefix_sum(values):
+    """맨 앞에 0행을 붙인 누적합 (창 합계 = csum[t+1] - csum[t+1-w])"""
+    csum = np.zeros((values.shape[0] + 1,) + values.shape[1:])
+    np.cumsum(values, axis=0, out=csum[1:])
+    return csum
+
+
+def _window_sum(csum, window):
+    """누적합으로 모든 시점의 창 합계를 한 번에 계산 (앞쪽 window-1행은 NaN)"""
+    out = np.empty((csum.shape[0] - 1,) + csum.shape[1:])
+    out[:window - 1] = np.nan
+    if window <= out.shape[0]:
+        np.subtract(csum[window:], csum[:-window], out=out[window - 1:])
+    return out
+
+
+def _center(values):
+    """종목별 기준 가격 (마지막 가격, 없으면 평균) - 누적합 오차를 줄이기 위해 빼고 계산"""
+    center = values[-1].copy() if len(values) else np.zeros(values.shape[1])
+    missing = np.isnan(center)
+    if missing.any():
+        with np.errstate(invalid="ignore"):
+            center[missing] = np.nanmean(values[:, missing], axis=0)
+        center[np.isnan(center)] = 0.0
+    return center
+
+
+@perf.timed("indicators.compute")
+def compute_indicators(prices, ma_windows=MA_WINDOWS, bb_window=BB_WINDOW, bb_k=BB_K,
+                       rsi_window=RSI_WINDOW, dtype=np.float64):
+    """
+    전체 종목의 이동평균, 볼린저 밴드, RSI를 한 번에 계산합니다.
+    prices: (날짜 x 종목) 가격 DataFrame 또는 2차원 배열
+
+    종목별 루프 / pandas rolling 대신 누적합(cumsum)으로 창 합계를 구하고,
+    같은 창 길이의 합계는 이동평균과 볼린저 밴드가 함께 씁니다.
+    창 안에 결측(NaN)이 있으면 그 시점 값은 NaN입니다. (pandas rolling과 동일)
+
+    반환: {"MA20", "MA60", "Bollinger_Upper", "Bollinger_Lower", "RSI": (날짜 x 종목) 배열}
+    """
+    values = np.asarray(prices, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+
+    missing = np.isnan(values)
+    has_missing = missing.any()
+    center = _center(values)
+    x = values - center
+    if has_missing:
+        x[missing] = 0.0
+        count = _prefix_sum((~missing).astype(np.float64))
+
+    def incomplete(window):
+        # 창 안에 결측이 있는 위치 (결측이 없으면 None)
+        return _window_sum(count, window) != window if has_missing else None
+
+    csum = _prefix_sum(x)
+    result = {}
+    sums = {}
+
+    def window_mean(window):
+        # 같은 창 길이의 평균은 한 번만 계산해서 공유 (기준 가격을 뺀 값)
+        if window not in sums:
+            mean = _window_sum(csum, window)
+            mean /= window
+            bad = incomplete(window)
+            if bad is not None:
+                mean[bad] = np.nan
+            sums[window] = mean
+        return sums[window]
+
+    # 1. 이동평균선
+    for window in ma_windows:
+        result[f"MA{window}"] = (window_mean(window) + center).astype(dtype, copy=False)
+
+    # 2. 볼린저 밴드 (표본 표준편차, ddof=1)
+    mean = window_mean(bb_window)
+    np.multiply(x, x, out=x)
+    var = _window_sum(_prefix_sum(x), bb_window)
+    var -= bb_window * mean * mean
+    np.maximum(var, 0.0, out=var)
+    var *= bb_k * bb_k / (bb_window - 1)
+    band = np.sqrt(var, out=var)
+    mid = mean + center
+    result["Bollinger_Upper"] = (mid + band).astype(dtype, copy=False)
+    np.subtract(mid, band, out=mid)
+    result["Bollinger_Lower"] = mid.astype(dtype, copy=False)
+    del x, csum
+
+    # 3. RSI (상승폭/하락폭의 단순 이동평균 비율)
+    delta = np.zeros_like(values)
+    np.subtract(values[1:], values[:-1], out=delta[1:])
+    if has_missing:
+        delta[np.isnan(delta)] = 0.0
+    gain = _window_sum(_prefix_sum(np.maximum(delta, 0.0)), rsi_window)
+    np.minimum(delta, 0.0, out=delta)
+    loss = _window_sum(_prefix_sum(delta), rsi_window)
+    # RSI = 100 - 100 / (1 + gain/loss) = 100 * gain / (gain + loss)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.subtract(gain, loss, out=loss)
+        rsi = np.divide(gain, loss, out=gain)
+    rsi *= 100.0
+    bad = incomplete(rsi_window)
+    if bad is not None:
+        rsi[bad] = np.nan
+    result["RSI"] = rsi.astype(dtype, copy=False)
+
+    return result
+
+
+def ticker_frame(prices, indicators, ticker):
+    """
+    계산 결과에서 한 종목만 꺼내 add_technical_indicators와 같은 형태의 DataFrame으로 만듭니다.
+    (plot_technical_analysis에 바로 넘길 수 있음)
+    """
+    prices = as_frame(prices)
+    j = prices.columns.get_loc(ticker)
+    df = pd.DataFrame({"Close": prices[ticker].to_numpy()}, index=prices.index)
+    for name, arr in indicators.items():
+        df[name] = arr[:, j]
+    return df
+
+
+def scan_universe(prices, **params):
+    """
+    전체 종목의 마지막 날짜 기준 지표 요약표 (종목 x 지표)
+    스크리닝용: 예) RSI < 30 인 종목, 종가가 볼린저 하단 아래인 종목
+    """
+    # 마지막 값은 가장 긴 창 + 1일치 가격만 있으면 되므로 그만큼만 잘라서 float64로 (패널 전체는 복사하지 않음)
+    lookback = max(list(params.get("ma_windows", MA_WINDOWS)) +
+                   [params.get("bb_window", BB_WINDOW), params.get("rsi_window", RSI_WINDOW)]) + 1
+    tail = np.asarray(as_values(prices)[-lookback:], dtype=np.float64)
+    indicators = compute_indicators(tail, **params)
+    last = {"Close": tail[-1]}
+    last.update({name: arr[-1] for name, arr in indicators.items()})
+    return pd.DataFrame(last, index=prices.columns)
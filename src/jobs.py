@@ -0,0 +1,156 @@
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 동시에 실행하는 무거운 작업 수 (numpy 연산은 GIL을 풀기 때문에 스레드로 충분)
+MAX_WORKERS = 2
+# 세션 하나가 동시에 걸어둘 수 있는 작업 수
+MAX_JOBS_PER_SESSION = 2
+# 끝난 작업을 보관하는 시간 (초) - 결과를 가져가지 않은 작업도 이 시간이 지나면 정리
+JOB_TTL = 600
+
+ACTIVE = ("queued", "running")
+
+_executor = None
+_jobs = {}
+_lock = threading.Lock()
+_ids = itertools.count(1)
+
+
+class JobCancelled(Exception):
+    """작업이 취소됐을 때 작업 함수 안에서 발생 (job.check / job.report)"""
+
+
+class Job:
+    """
+    백그라운드 작업 하나의 상태
+    작업 함수는 job.report(진행률, 부분 결과)로 진행 상황을 알리고,
+    report / check 호출 시점에 취소 요청이 있으면 JobCancelled로 멈춥니다.
+    """
+
+    def __init__(self, job_id, key, label):
+        self.id = job_id
+        self.key = key
+        self.label = label
+        self.status = "queued"
+        self.progress = 0.0
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.sessions = set()
+        self.created = time.time()
+        self.finished = None
+        self.future = None
+        self._cancel = threading.Event()
+
+    def check(self):
+        """취소 요청이 있으면 JobCancelled 발생"""
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+
+    def report(self, progress, partial=None):
+        """진행률(0~1)과 부분 결과 갱신 (대시보드가 폴링해서 표시)"""
+        self.check()
+        self.progress = float(min(max(progress, 0.0), 1.0))
+        if partial is not None:
+            self.partial = partial
+
+    @property
+    def done(self):
+        return self.status not in ACTIVE
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="job")
+        return _executor
+
+
+def _run(job, fn, args, kwargs):
+    """작업 스레드: 상태를 running -> done / failed / cancelled 로 바꿈"""
+    if job._cancel.is_set():
+        job.status = "cancelled"
+        job.finished = time.time()
+        return
+    job.status = "running"
+    try:
+        job.result = fn(job, *args, **kwargs)
+        job.progress = 1.0
+        job.status = "done"
+    except JobCancelled:
+        job.status = "cancelled"
+    except Exception as e:
+        job.error = f"{type(e).__name__}: {e}"
+        job.status = "failed"
+    finally:
+        job.finished = time.time()
+
+
+def _cleanup():
+    """보관 시간이 지난 끝난 작업 정리 (_lock을 잡은 상태에서 호출)"""
+    now = time.time()
+    for job_id in [i for i, j in _jobs.items() if j.done and now - j.finished > JOB_TTL]:
+        del _jobs[job_id]
+
+
+def submit(fn, *args, key=None, session_id=None, label="", max_per_session=MAX_JOBS_PER_SESSION, **kwargs):
+    """
+    fn(job, *args, **kwargs)를 작업 풀에 제출하고 Job을 반환합니다.
+    - key가 같은 작업이 이미 대기/실행 중이면 새로 만들지 않고 그 작업을 공유 (중복 요청 제거)
+    - 세션별로 동시에 진행 중인 작업이 max_per_session개를 넘으면 RuntimeError
+    """
+    executor = _get_executor()
+    with _lock:
+        _cleanup()
+        if key is not None:
+            for job in _jobs.values():
+                if job.key == key and not job.done:
+                    job.sessions.add(session_id)
+                    return job
+
+        if session_id is not None:
+            running = sum(1 for j in _jobs.values() if session_id in j.sessions and not j.done)
+            if running >= max_per_session:
+                raise RuntimeError(f"동시에 실행할 수 있는 작업은 세션당 {max_per_session}개까지입니다.")
+
+        job = Job(next(_ids), key, label)
+        job.sessions.add(session_id)
+        _jobs[job.id] = job
+        # 잠금 안에서 future를 붙여야 다른 스레드가 찾은 작업에 future가 항상 있음 (_run은 잠금을 쓰지 않음)
+        job.future = executor.submit(_run, job, fn, args, kwargs)
+    return job
+
+
+def get(job_id):
+    """작업 ID로 Job 조회 (없으면 None)"""
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def cancel(job_id, session_id=None):
+    """
+    작업 취소 요청
+    여러 세션이 공유하는 작업이면 이 세션만 빠지고, 마지막 세션이 취소할 때 실제로 멈춥니다.
+    """
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None or job.done:
+            return False
+        job.sessions.discard(session_id)
+        if job.sessions and session_id is not None:
+            return True
+        job._cancel.set()
+    # 아직 대기 중이면 실행 자체를 취소
+    if job.future is not None and job.future.cancel():
+        job.status = "cancelled"
+        job.finished = time.time()
+    return True
+
+
+def session_jobs(session_id):
+    """세션이 요청한 작업 목록 (최근 순)"""
+    with _lock:
+        return sorted((j for j in _jobs.values() if session_id in j.sessions), key=lambda j: -j.created)
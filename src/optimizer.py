@@ -0,0 +1,395 @@
+import numbers
+
+import numpy as np
+import pandas as pd
+
+import perf
+from compact_panel import as_frame
+from covariance import get_covariance
+from portfolio_optimization import RISK_FREE_RATE
+
+# 연간화 (252일 = 1년 개장일)
+TRADING_DAYS = 252
+
+
+def _annualize(mean_daily_returns, cov_matrix):
+    """일별 평균/공분산 -> 연간 기대 수익률 벡터, 공분산 행렬"""
+    mu = np.asarray(mean_daily_returns, dtype=np.float64) * TRADING_DAYS
+    cov = np.asarray(cov_matrix, dtype=np.float64) * TRADING_DAYS
+    return mu, cov
+
+
+def _bound_arrays(num_assets, bounds, max_weights):
+    """
+    종목별 하한/상한 배열
+    bounds: (하한, 상한) 공통 값 (기본 롱온리 (0, 1))
+    max_weights: 종목별 상한 (배열 또는 {인덱스: 상한})
+    """
+    lower = np.full(num_assets, float(bounds[0]))
+    upper = np.full(num_assets, float(bounds[1]))
+    if max_weights is not None:
+        if isinstance(max_weights, dict):
+            for i, cap in max_weights.items():
+                upper[i] = min(upper[i], cap)
+        else:
+            upper = np.minimum(upper, np.asarray(max_weights, dtype=np.float64))
+    if lower.sum() > 1 + 1e-12 or upper.sum() < 1 - 1e-12:
+        raise ValueError("비중 하한/상한으로는 합계 100%를 만들 수 없습니다.")
+    return lower, upper
+
+
+def _group_rows(num_assets, groups):
+    """
+    그룹 제약 -> [(멤버 마스크, 하한, 상한), ...]
+    groups: {그룹명: (종목 인덱스 리스트, 하한, 상한)}
+    """
+    rows = []
+    for members, lo, hi in (groups or {}).values():
+        mask = np.zeros(num_assets)
+        mask[list(members)] = 1.0
+        rows.append((mask, lo, hi))
+    return rows
+
+
+def _linear_constraints(num_assets, lower, upper, groups, scaled):
+    """
+    SLSQP용 선형 제약
+    scaled=True면 변수가 (y, k)이고 비중 w = y / k 인 동차(homogenized) 형태
+    """
+    k = (lambda v: v[-1]) if scaled else (lambda v: 1.0)
+    w = (lambda v: v[:-1]) if scaled else (lambda v: v)
+
+    def jac(row, coef_k=0.0):
+        return np.r_[row, coef_k] if scaled else row
+
+    cons = [{"type": "eq", "fun": lambda v: np.sum(w(v)) - k(v),
+             "jac": lambda v: jac(np.ones(num_assets), -1.0)}]
+    if scaled:
+        # 종목별 하한/상한도 k배 (y_i - lo_i k >= 0, hi_i k - y_i >= 0)
+        eye = np.eye(num_assets)
+        cons.append({"type": "ineq", "fun": lambda v: w(v) - lower * k(v),
+                     "jac": lambda v: np.c_[eye, -lower]})
+        cons.append({"type": "ineq", "fun": lambda v: upper * k(v) - w(v),
+                     "jac": lambda v: np.c_[-eye, upper]})
+    for mask, lo, hi in _group_rows(num_assets, groups):
+        cons.append({"type": "ineq", "fun": lambda v, m=mask, lo=lo: m @ w(v) - lo * k(v),
+                     "jac": lambda v, m=mask, lo=lo: jac(m, -lo)})
+        cons.append({"type": "ineq", "fun": lambda v, m=mask, hi=hi: hi * k(v) - m @ w(v),
+                     "jac": lambda v, m=mask, hi=hi: jac(-m, hi)})
+    return cons
+
+
+def _start_point(lower, upper):
+    """하한/상한 안의 시작 비중 (균등 비중을 범위 안으로 보정)"""
+    w = np.clip(np.full(len(lower), 1.0 / len(lower)), lower, upper)
+    for _ in range(len(lower)):
+        gap = 1.0 - w.sum()
+        if abs(gap) < 1e-12:
+            break
+        room = (upper - w) if gap > 0 else (w - lower)
+        if room.sum() <= 0:
+            break
+        w += gap * room / room.sum()
+    return w
+
+
+def _solve(objective, gradient, x0, bounds, constraints):
+    """SLSQP 실행 (해석적 기울기 사용) - scipy는 이 경로를 처음 쓸 때 불러옴 (active-set만 쓰면 불필요)"""
+    from scipy.optimize import minimize
+
+    result = minimize(objective, x0, jac=gradient, bounds=bounds, constraints=constraints,
+                      method="SLSQP", options={"ftol": 1e-12, "maxiter": 500})
+    if not result.success:
+        raise RuntimeError(f"최적화 실패: {result.message}")
+    return result.x
+
+
+def _greedy_fill(lower, upper, order):
+    """모두 하한에서 출발해 order 순서대로 종목을 상한까지 채운 비중 (합계 1인 꼭짓점)"""
+    w = lower.copy()
+    remaining = 1.0 - w.sum()
+    for i in order:
+        if remaining <= 0:
+            break
+        add = min(upper[i] - w[i], remaining)
+        w[i] += add
+        remaining -= add
+    return w
+
+
+def _vertex_start(cov, lower, upper):
+    """
+    최소 분산용 시작점: 분산이 작은 종목부터 상한까지 채움
+    (자유 변수가 하나뿐인 꼭짓점이라 active-set이 적은 반복으로 시작)
+    """
+    return _greedy_fill(lower, upper, np.argsort(np.diag(cov)))
+
+
+def _active_set_qp(cov, a, lower, upper, x0, max_iter=None, b=1.0):
+    """
+    min 1/2 x'Σx  s.t.  A x = b, lower <= x <= upper  를 푸는 primal active-set 방법
+    (critical line 방식처럼 경계에 걸린 종목 집합을 하나씩 바꿔가며 정확한 해를 구함)
+    a: 등식 제약 한 줄 (a'x = b) 또는 여러 줄 행렬 (효율적 투자선: 합계 = 1, 수익률 = 목표)
+    자유 변수의 KKT 연립방정식만 풀기 때문에 편입 종목이 적으면 종목 수가 많아도 빠릅니다.
+    x0는 실행 가능한 점이어야 하며, 이전 해를 넘기면 warm start가 됩니다.
+    수렴하지 못하면 (또는 해가 등식 제약을 벗어나면) None을 반환합니다.
+    """
+    A = np.atleast_2d(np.asarray(a, dtype=np.float64))
+    b = np.broadcast_to(np.asarray(b, dtype=np.float64), (len(A),))
+    n, k = A.shape[1], len(A)
+    x = x0.astype(np.float64).copy()
+    at_lower = np.abs(x - lower) <= 1e-12
+    at_upper = np.isfinite(upper) & (np.abs(x - upper) <= 1e-12) & ~at_lower
+    tol = 1e-10 * max(1.0, np.abs(np.diag(cov)).max())
+    nu = np.zeros(k)
+
+    for _ in range(max_iter or 20 * n + 100):
+        fixed = at_lower | at_upper
+        free = np.flatnonzero(~fixed)
+        m = len(free)
+
+        if m:
+            # 1. 고정 변수는 그대로 두고 자유 변수에 대한 등식 제약 QP의 KKT 시스템
+            kkt = np.zeros((m + k, m + k))
+            kkt[:m, :m] = cov[np.ix_(free, free)]
+            kkt[:m, m:] = -A[:, free].T
+            kkt[m:, :m] = A[:, free]
+            rhs = np.r_[-(cov[free][:, fixed] @ x[fixed]), b - A[:, fixed] @ x[fixed]]
+            try:
+                sol = np.linalg.solve(kkt, rhs)
+            except np.linalg.LinAlgError:
+                sol = np.linalg.lstsq(kkt, rhs, rcond=None)[0]
+            step = sol[:m] - x[free]
+            nu = sol[m:]
+        else:
+            step = np.zeros(0)
+
+        if not m or np.abs(step).max() <= 1e-12:
+            # 2. 현재 집합에서 최적 -> 경계 종목의 라그랑주 승수 확인
+            grad = cov @ x - A.T @ nu
+            viol = np.full(n, np.inf)
+            viol[at_lower] = grad[at_lower]      # 하한 종목은 grad >= 0 이어야 함
+            viol[at_upper] = -grad[at_upper]     # 상한 종목은 grad <= 0 이어야 함
+            i = int(np.argmin(viol))
+            if viol[i] >= -tol:
+                # KKT 행렬이 특이해서 최소제곱으로 푼 경우 등식 제약을 벗어날 수 있음
+                scale = np.maximum(1.0, np.abs(A).sum(axis=1) * np.abs(x).max())
+                return x if np.all(np.abs(A @ x - b) <= 1e-9 * scale) else None
+            at_lower[i] = at_upper[i] = False
+            continue
+
+        # 3. 경계를 넘지 않는 만큼만 이동 (막히면 그 종목을 경계 집합에 추가)
+        xf = x[free]
+        ratio = np.full(m, np.inf)
+        down, up = step < -1e-15, step > 1e-15
+        ratio[down] = (lower[free][down] - xf[down]) / step[down]
+        ratio[up] = (upper[free][up] - xf[up]) / step[up]
+        j = int(np.argmin(ratio))
+        alpha = min(1.0, max(ratio[j], 0.0))
+        x[free] = xf + alpha * step
+        if alpha < 1.0:
+            i = free[j]
+            if step[j] < 0:
+                x[i], at_lower[i] = lower[i], True
+            else:
+                x[i], at_upper[i] = upper[i], True
+
+    return None
+
+
+def portfolio_performance(weights, mean_daily_returns, cov_matrix, risk_free_rate=RISK_FREE_RATE):
+    """비중 -> (연간 수익률, 연간 변동성, 샤프 지수)"""
+    mu, cov = _annualize(mean_daily_returns, cov_matrix)
+    ret = float(weights @ mu)
+    vol = float(np.sqrt(weights @ cov @ weights))
+    return ret, vol, (ret - risk_free_rate) / vol
+
+
+def _min_variance(mu, cov, lower, upper, groups, target_return=None, x0=None):
+    """연간화된 배열로 최소 분산 QP 풀기 (x0: 시작점, 효율적 투자선에서 이전 점으로 warm start)"""
+    if not groups and target_return is None:
+        # 비중 범위 + 합계 제약만 있으면 active-set으로 빠르게 정확한 해
+        start = x0 if x0 is not None else _vertex_start(cov, lower, upper)
+        w = _active_set_qp(cov, np.ones(len(mu)), lower, upper, start)
+        if w is not None:
+            return w
+
+    constraints = _linear_constraints(len(mu), lower, upper, groups, scaled=False)
+    if target_return is not None:
+        constraints.append({"type": "eq", "fun": lambda w: w @ mu - target_return,
+                            "jac": lambda w: mu})
+    x0 = _start_point(lower, upper) if x0 is None else x0
+    return _solve(lambda w: w @ cov @ w, lambda w: 2 * cov @ w,
+                  x0, list(zip(lower, upper)), constraints)
+
+
+def min_variance(mean_daily_returns, cov_matrix, bounds=(0.0, 1.0), max_weights=None, groups=None,
+                 target_return=None, x0=None):
+    """
+    최소 분산 포트폴리오 (이차계획법, QP)
+    target_return(연간)을 주면 그 수익률을 내는 포트폴리오 중 분산이 가장 작은 것 (효율적 투자선의 한 점)
+    x0: 이전 해 (백테스트처럼 반복해서 풀 때 warm start)
+    """
+    mu, cov = _annualize(mean_daily_returns, cov_matrix)
+    lower, upper = _bound_arrays(len(mu), bounds, max_weights)
+    return _min_variance(mu, cov, lower, upper, groups, target_return, x0)
+
+
+def max_sharpe(mean_daily_returns, cov_matrix, risk_free_rate=RISK_FREE_RATE,
+               bounds=(0.0, 1.0), max_weights=None, groups=None, x0=None):
+    """
+    샤프 지수 최대 포트폴리오
+    초과수익이 양수인 종목이 있으면 y = w / k 치환으로 볼록 QP
+    (min y'Σy  s.t. (μ - rf)'y = 1, 제약은 k배) 를 풀어서 정확한 해를 구합니다.
+    x0: 이전 해 (롱온리 + 상한 없음일 때 warm start)
+    """
+    mu, cov = _annualize(mean_daily_returns, cov_matrix)
+    num_assets = len(mu)
+    lower, upper = _bound_arrays(num_assets, bounds, max_weights)
+    excess = mu - risk_free_rate
+
+    if not groups and excess.max() > 0 and np.all(lower == 0) and np.all(upper >= 1):
+        # 롱온리 + 상한 없음: y >= 0 만 남으므로 active-set으로 바로 풂
+        if x0 is not None and x0 @ excess > 0:
+            start = x0 / (x0 @ excess)
+        else:
+            j = np.argmax(excess / np.sqrt(np.diag(cov)))
+            start = np.zeros(num_assets)
+            start[j] = 1.0 / excess[j]
+        y = _active_set_qp(cov, excess, np.zeros(num_assets), np.full(num_assets, np.inf), start)
+        if y is not None:
+            return y / y.sum()
+
+    # 달성 가능한 최대 초과수익 (그룹 제약이 없으면 초과수익이 큰 종목부터 상한까지 채운 꼭짓점)
+    best_excess = excess.max() if groups else _greedy_fill(lower, upper, np.argsort(-excess)) @ excess
+    if best_excess <= 0:
+        # 어떤 비중으로도 무위험 이자율을 넘지 못하면 (y = w / k 치환 불가) 샤프 지수를 직접 최대화
+        constraints = _linear_constraints(num_assets, lower, upper, groups, scaled=False)
+
+        def neg_sharpe(w):
+            return -(w @ excess) / np.sqrt(w @ cov @ w)
+
+        def neg_sharpe_grad(w):
+            var = w @ cov @ w
+            return -(excess * var - (w @ excess) * (cov @ w)) / var ** 1.5
+
+        return _solve(neg_sharpe, neg_sharpe_grad, _start_point(lower, upper),
+                      list(zip(lower, upper)), constraints)
+
+    constraints = _linear_constraints(num_assets, lower, upper, groups, scaled=True)
+    constraints.append({"type": "eq", "fun": lambda v: v[:-1] @ excess - 1.0,
+                        "jac": lambda v: np.r_[excess, 0.0]})
+
+    # 시작점: 범위 안 비중을 초과수익 1이 되도록 스케일 (불가능하면 초과수익이 가장 큰 종목)
+    w0 = _start_point(lower, upper)
+    if w0 @ excess <= 0:
+        w0 = np.zeros(num_assets)
+        w0[np.argmax(excess)] = 1.0
+    k0 = 1.0 / (w0 @ excess)
+    x0 = np.r_[w0 * k0, k0]
+
+    objective = lambda v: v[:-1] @ cov @ v[:-1]
+    gradient = lambda v: np.r_[2 * cov @ v[:-1], 0.0]
+    bounds_yk = [(None, None)] * num_assets + [(0.0, None)]
+    v = _solve(objective, gradient, x0, bounds_yk, constraints)
+    # y / k는 제약(k배)을 이미 만족하므로 자르지 않고 합계 오차만 정규화
+    if not v[-1] > 0:
+        raise RuntimeError("최적화 실패: 스케일 k가 0 (초과수익을 낼 수 있는 비중이 없음)")
+    w = v[:-1] / v[-1]
+    return w / w.sum()
+
+
+@perf.timed("optimizer.efficient_frontier", record=("num_points",))
+def efficient_frontier(mean_daily_returns, cov_matrix, num_points=50,
+                       bounds=(0.0, 1.0), max_weights=None, groups=None, progress=None):
+    """
+    효율적 투자선: 최소 분산 수익률 ~ 달성 가능한 최대 수익률 사이를 num_points개로 나눠
+    각 목표 수익률의 최소 분산 포트폴리오를 구합니다.
+    progress: progress(완료 점 수, 전체 점 수, 지금까지의 비중 배열) 콜백 (대시보드 진행 표시용)
+    반환: (수익률 배열, 변동성 배열, 비중 배열 (점 수 x 종목 수))
+    """
+    if num_points < 2:
+        raise ValueError("효율적 투자선은 양 끝점을 포함해 2개 이상의 점이 필요합니다.")
+    mu, cov = _annualize(mean_daily_returns, cov_matrix)
+    lower, upper = _bound_arrays(len(mu), bounds, max_weights)
+    constraints = _linear_constraints(len(mu), lower, upper, groups, scaled=False)
+
+    # 양 끝점: 최소 분산 / 최대 수익 (선형계획)
+    w_min = _min_variance(mu, cov, lower, upper, groups)
+    w_max = _solve(lambda w: -(w @ mu), lambda w: -mu, _start_point(lower, upper),
+                   list(zip(lower, upper)), constraints)
+    targets = np.linspace(w_min @ mu, w_max @ mu, num_points)
+
+    weights = np.empty((num_points, len(mu)))
+    weights[0] = w_min
+    weights[-1] = w_max
+    # 그룹 제약이 없으면 각 점을 active-set QP로 (등식 제약: 합계 = 1, 수익률 = 목표)
+    # 시작점: 이전 점과 최대 수익 점을 섞어 목표 수익률을 정확히 맞춘 점 (두 실행 가능한 점의 볼록 결합)
+    # 그룹 제약이 있거나 QP가 수렴하지 못하면 SLSQP
+    equality = np.vstack([np.ones(len(mu)), mu])
+    for i in range(1, num_points - 1):
+        w = None
+        prev = weights[i - 1]
+        gain = (w_max - prev) @ mu
+        if not groups and gain > 0:
+            start = prev + (targets[i] - prev @ mu) / gain * (w_max - prev)
+            w = _active_set_qp(cov, equality, lower, upper, start, b=[1.0, targets[i]])
+        if w is None:
+            w = _min_variance(mu, cov, lower, upper, groups, target_return=targets[i], x0=prev)
+        weights[i] = w
+        if progress is not None:
+            progress(i + 1, num_points, weights[:i + 1])
+
+    returns = weights @ mu
+    vols = np.sqrt(np.einsum('ij,jk,ik->i', weights, cov, weights))
+    return returns, vols, weights
+
+
+@perf.timed("optimizer.optimize_portfolio")
+def optimize_portfolio(daily_returns, risk_free_rate=RISK_FREE_RATE, num_points=50,
+                       bounds=(0.0, 1.0), max_weights=None, groups=None, progress=None, cov_method="sample"):
+    """
+    수익률 행렬(날짜 x 종목)로 Max Sharpe / Min Volatility / 효율적 투자선을 한 번에 계산
+    max_weights, groups는 종목 이름으로도 지정 가능:
+      max_weights={"AAPL": 0.3}, groups={"KR": (["005930.KS"], 0.0, 0.2)}
+    progress: 효율적 투자선 점을 하나 구할 때마다 호출 (efficient_frontier 참고)
+    결측이 있는 수익률도 받습니다. (평균은 종목별, 표본 공분산은 쌍별 공통 관측일 기준 - pairwise_cov)
+    cov_method: 공분산 추정 방법 (sample / ledoit_wolf / ewma) - 종목이 많고 기간이 짧으면 ledoit_wolf가 안정적
+    """
+    daily_returns = as_frame(daily_returns)
+    all_tickers = list(daily_returns.columns)
+    cov_matrix = get_covariance(daily_returns, cov_method)
+    # 관측일이 부족해 공분산에서 빠진 종목은 비중 0 (결과는 입력 종목 순서 그대로)
+    tickers = list(cov_matrix.columns)
+    mean_returns = daily_returns[tickers].mean()
+
+    # 종목 이름 / 입력 위치 -> 공분산 행렬 위치 (빠진 종목은 None)
+    def position(t):
+        name = all_tickers[t] if isinstance(t, numbers.Integral) else t
+        return tickers.index(name) if name in tickers else None
+
+    if isinstance(max_weights, dict):
+        max_weights = {position(t): cap for t, cap in max_weights.items() if position(t) is not None}
+    elif max_weights is not None and np.ndim(max_weights) == 1:
+        # 입력 종목 순서의 상한 배열 -> 공분산 행렬 종목 순서로 (빠진 종목의 상한은 버림)
+        max_weights = np.asarray(max_weights, dtype=np.float64)[[all_tickers.index(t) for t in tickers]]
+    if groups:
+        groups = {name: ([position(t) for t in members if position(t) is not None], lo, hi)
+                  for name, (members, lo, hi) in groups.items()}
+
+    w_sharpe = max_sharpe(mean_returns, cov_matrix, risk_free_rate, bounds, max_weights, groups)
+    w_min = min_variance(mean_returns, cov_matrix, bounds, max_weights, groups)
+    frontier = efficient_frontier(mean_returns, cov_matrix, num_points, bounds, max_weights, groups, progress)
+
+    def summary(w):
+        ret, vol, sharpe = portfolio_performance(w, mean_returns, cov_matrix, risk_free_rate)
+        weights = pd.Series(w, index=tickers).reindex(all_tickers, fill_value=0.0)
+        return {"weights": weights, "Return": ret, "Volatility": vol, "Sharpe": sharpe}
+
+    frontier_weights = pd.DataFrame(frontier[2], columns=tickers).reindex(columns=all_tickers, fill_value=0.0)
+    return {
+        "max_sharpe": summary(w_sharpe),
+        "min_volatility": summary(w_min),
+        "frontier": pd.DataFrame({"Return": frontier[0], "Volatility": frontier[1]}),
+        "frontier_weights": frontier_weights.to_numpy(),
+    }
@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+
+import perf
+from compact_panel import CompactPanel, as_frame, as_values
+
+# 결측(NaN)을 그대로 둔 수익률로 공분산 / 상관계수 / 베타 계산
+# ffill().dropna()는 가장 늦게 상장한 종목의 첫날 이전 기간을 전부 버리므로,
+# 종목 쌍마다 '둘 다 값이 있는 날'만 써서 계산합니다. (마스크 행렬 곱 -> BLAS, 종목 묶음 단위)
+
+# 쌍마다 필요한 최소 공통 관측일 수 (부족하면 NaN)
+MIN_OVERLAP = 20
+# 한 번에 계산하는 종목 수 (임시 배열 크기: 날짜 수 x 종목 수 + 묶음 크기 x 종목 수)
+CHUNK_SIZE = 512
+
+
+def _calendar(frame, calendar):
+    """달력 지정 -> DatetimeIndex (None: 합집합, 종목 이름: 그 종목 거래일, 주기 문자열, 날짜 목록)"""
+    dates = frame.index
+    if calendar is None:
+        return dates
+    if isinstance(calendar, str) and calendar in frame.columns:
+        return dates[frame[calendar].notna().to_numpy()]
+    if isinstance(calendar, str):
+        return pd.date_range(dates[0], dates[-1], freq=calendar, name=dates.name)
+    return pd.DatetimeIndex(calendar, name=dates.name)
+
+
+@perf.timed("pairwise.align_returns", data="prices")
+def align_returns(prices, calendar=None, log=False):
+    """
+    거래소 달력이 다른 종목(예: 005930.KS와 미국 종목)을 한 달력에 맞춘 수익률
+    - 달력 날짜마다 그날까지의 마지막 가격을 쓰고, 직전 달력 날짜 이후 거래가 없던 종목은 NaN
+      (휴장일을 0% 수익률로 채우지 않음 -> 상관계수가 0 쪽으로 줄어드는 것을 막음)
+    - 휴장 뒤 첫 거래일 수익률에는 휴장 기간 전체 변동이 들어감
+    - 상장 전 / 데이터가 없는 구간은 NaN (ffill().dropna()처럼 전체 기간을 자르지 않음)
+
+    calendar: None이면 모든 종목 날짜의 합집합, 종목 이름이면 그 종목의 거래일,
+              "W-FRI"처럼 pandas 주기 문자열이면 그 주기, 또는 날짜 목록
+    반환: 입력과 같은 형태 (DataFrame 또는 CompactPanel)
+    """
+    frame = as_frame(prices)
+    values = frame.to_numpy(dtype=np.float64)
+    calendar = _calendar(frame, calendar)
+
+    # 1. 달력 날짜마다 그날(포함) 이전의 마지막 원래 날짜 위치
+    pos = np.searchsorted(frame.index.values, calendar.values, side="right") - 1
+    calendar, pos = calendar[pos >= 0], pos[pos >= 0]
+
+    # 2. 종목마다 그때까지 관측 수 -> 달력 구간 사이에 새 관측이 없으면 NaN
+    observed = ~np.isnan(values)
+    counts = np.cumsum(observed, axis=0, dtype=np.int32)[pos]
+    filled = frame.ffill().to_numpy(dtype=np.float64)[pos]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = filled[1:] / filled[:-1]
+        values = np.log(ratio) if log else np.subtract(ratio, 1, out=ratio)
+    values[counts[1:] == counts[:-1]] = np.nan
+
+    if isinstance(prices, CompactPanel):
+        days = (calendar[1:].values.astype("datetime64[D]") - np.datetime64("1970-01-01", "D")).astype(np.int64)
+        return CompactPanel(np.ascontiguousarray(values.T, dtype=prices.dtype), days, prices.tickers,
+                            "log_returns" if log else "returns")
+    return pd.DataFrame(values, index=calendar[1:], columns=frame.columns)
+
+
+def _prepare(values):
+    """
+    (날짜 x 종목) 배열 -> (마스크, 결측을 0으로 바꾼 중심화 값, 그 제곱, 중심화에 쓴 평균)
+    float32 값도 그대로 받음 (중심화하면서 float64로 올라가므로 입력 전체의 float64 복사본이 필요 없음)
+    """
+    mask = ~np.isnan(values)
+    count = mask.sum(axis=0)
+    # 숫자 안정성: 열 평균을 먼저 빼 둠 (쌍별 합계는 평균 이동과 무관, 평균만 다시 더함)
+    center = np.where(count > 0, np.nansum(values, axis=0, dtype=np.float64) / np.maximum(count, 1), 0.0)
+    x0 = np.where(mask, values - center, 0.0)
+    return mask.astype(np.float64), x0, x0 * x0, center
+
+
+def _own_var(prepared):
+    """종목 자신의 모든 관측일로 구한 분산 (관측일 2일 미만은 NaN, DataFrame.var()와 같은 값)"""
+    mask, x0, x2, _ = prepared
+    count = mask.sum(axis=0)
+    s = x0.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = (x2.sum(axis=0) - s * s / count) / (count - 1)
+    return np.where(count >= 2, var, np.nan)
+
+
+def _moments(px, py, variances=True):
+    """준비된 두 묶음의 쌍별 합계 (행렬 곱 6번, 분산이 필요 없으면 4번)"""
+    mx, x0, x2, cx = px
+    my, y0, y2, cy = py
+    n = mx.T @ my
+    sx = x0.T @ my
+    sy = mx.T @ y0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sx_n, sy_n = sx / n, sy / n
+        moments = {"n": n, "x_mean": cx[:, None] + sx_n, "y_mean": cy[None, :] + sy_n,
+                   "sxy": x0.T @ y0 - sx * sy_n}
+        if variances:
+            moments["sxx"] = x2.T @ my - sx * sx_n
+            moments["syy"] = mx.T @ y2 - sy * sy_n
+    return moments
+
+
+def pair_moments(x, y):
+    """
+    x (날짜 x a), y (날짜 x b)의 모든 열 쌍에 대해 '둘 다 값이 있는 날' 기준 합계
+    반환: {"n": 공통 관측일 수, "x_mean", "y_mean": 쌍별 평균,
+           "sxx", "syy", "sxy": 쌍별 평균을 뺀 제곱합 / 곱의 합} - 모두 (a x b) 배열
+    (공분산 = sxy / (n - 1), 상관계수 = sxy / sqrt(sxx * syy), 베타 = sxy / sxx)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    x, y = (v[:, None] if v.ndim == 1 else v for v in (x, y))
+    return _moments(_prepare(x), _prepare(y))
+
+
+def _clip_psd(cov):
+    """쌍마다 기간이 달라 생긴 음의 고윳값을 0으로 (최적화 / 시뮬레이션용 양의 준정부호 행렬)"""
+    if not len(cov):
+        return cov
+    eigval, eigvec = np.linalg.eigh(cov)
+    if eigval.min() >= 0:
+        return cov
+    cov = (eigvec * np.maximum(eigval, 0.0)) @ eigvec.T
+    return (cov + cov.T) / 2
+
+
+def psd_frame(cov, columns, own_var):
+    """
+    쌍별 공분산 행렬 -> 최적화에 바로 쓸 수 있는 DataFrame (양의 준정부호)
+    - 분산(대각)이 없으면 종목 자신의 모든 관측일로 구한 분산(own_var)으로 채움 (0으로 두면 무위험 자산처럼 보임)
+    - 그래도 분산이 없는 종목(관측일 2일 미만)은 결과에서 빼고 이름을 출력
+    - 공통 구간이 부족한 쌍의 공분산은 0, 음의 고윳값은 0으로
+    """
+    cov = np.array(cov, dtype=np.float64)
+    diagonal = np.diagonal(cov)
+    np.fill_diagonal(cov, np.where(np.isnan(diagonal), own_var, diagonal))
+    keep = ~np.isnan(np.diagonal(cov))
+    if not keep.all():
+        print(f"공분산 제외 (관측일 부족): {', '.join(map(str, columns[~keep]))}")
+        columns, cov = columns[keep], cov[np.ix_(keep, keep)]
+    cov = _clip_psd(np.nan_to_num(cov, nan=0.0))
+    return pd.DataFrame(cov, index=columns, columns=columns)
+
+
+def _pairwise_matrix(returns, kind, min_periods, chunk_size):
+    """쌍별 공분산 / 상관계수 행렬 -> (종목, 행렬, 종목 자신의 분산)"""
+    values = as_values(returns)
+    num_assets = values.shape[1]
+    prepared = _prepare(values)
+    result = np.empty((num_assets, num_assets))
+
+    # 종목 묶음(행) x 전체 종목(열) 단위로 계산 -> 임시 배열이 묶음 크기에 비례
+    for start in range(0, num_assets, chunk_size):
+        block = slice(start, start + chunk_size)
+        m = _moments(tuple(a[:, block] for a in prepared[:3]) + (prepared[3][block],), prepared,
+                     variances=kind == "corr")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if kind == "cov":
+                values_block = m["sxy"] / (m["n"] - 1)
+            else:
+                values_block = np.clip(m["sxy"] / np.sqrt(m["sxx"] * m["syy"]), -1.0, 1.0)
+        values_block[m["n"] < max(min_periods, 2)] = np.nan
+        result[block] = values_block
+
+    # 행렬 곱 반올림 차이로 생긴 비대칭 제거
+    result += result.T
+    result *= 0.5
+    if kind == "corr":
+        diagonal = np.diagonal(result)
+        np.fill_diagonal(result, np.where(np.isnan(diagonal), np.nan, 1.0))
+    return returns.columns, result, _own_var(prepared)
+
+
+@perf.timed("pairwise.pairwise_cov", data="returns")
+def pairwise_cov(returns, min_periods=MIN_OVERLAP, chunk_size=CHUNK_SIZE, psd=False):
+    """
+    쌍별 공통 관측일 기준 공분산 행렬 (DataFrame.cov()와 같은 값, 결측이 없으면 완전히 같음)
+    psd=True: 음의 고윳값을 0으로 잘라 최적화에 바로 쓸 수 있게 함 (psd_frame 참고)
+    """
+    columns, cov, own_var = _pairwise_matrix(returns, "cov", min_periods, chunk_size)
+    if psd:
+        return psd_frame(cov, columns, own_var)
+    return pd.DataFrame(cov, index=columns, columns=columns)
+
+
+@perf.timed("pairwise.pairwise_corr", data="returns")
+def pairwise_corr(returns, min_periods=MIN_OVERLAP, chunk_size=CHUNK_SIZE):
+    """쌍별 공통 관측일 기준 상관계수 행렬 (DataFrame.corr()와 같은 값)"""
+    columns, corr, _ = _pairwise_matrix(returns, "corr", min_periods, chunk_size)
+    return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+def overlap_counts(returns):
+    """종목 쌍마다 둘 다 값이 있는 날 수 (종목 x 종목)"""
+    mask = (~np.isnan(as_values(returns))).astype(np.float64)
+    return pd.DataFrame((mask.T @ mask).astype(np.int64), index=returns.columns, columns=returns.columns)
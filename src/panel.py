@@ -0,0 +1,269 @@
+import numpy as np
+import pandas as pd
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+import perf
+from compact_panel import from_long, load_compact
+from pairwise import align_returns
+from price_store import STORE_DIR, is_store, load_panel, load_ticker, read_index
+
+# 디스크 캐시 위치 (가격 패널 + 수익률 행렬)
+CACHE_DIR = "data/cache/panel"
+
+# 프로세스 내 캐시: (종류, 경로, 필드, 종목, ...) -> (데이터 버전, 값)
+# 같은 자리에 새 버전이 들어오면 예전 버전은 버리고, 자리 수가 넘치면 오래 안 쓴 것부터 정리
+MAX_MEMORY_ENTRIES = 16
+_MEMORY_CACHE = OrderedDict()
+_cache_lock = threading.Lock()
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+def data_version(filepath=STORE_DIR, tickers=None, field="Close"):
+    """
+    데이터 내용 해시 (저장소 인덱스의 종목별 해시로 계산, 파일을 다시 읽지 않음)
+    데이터가 바뀌면 값이 바뀌므로 캐시 키로 사용합니다.
+    """
+    h = hashlib.sha1(field.encode())
+    if is_store(filepath):
+        entries = read_index(filepath)["tickers"]
+        names = sorted(entries) if tickers is None else sorted(t for t in tickers if t in entries)
+        for name in names:
+            h.update(f"{name}:{entries[name]['hash']};".encode())
+    else:
+        # CSV: 파일 크기 + 수정 시각
+        stat = os.stat(filepath)
+        h.update(f"{os.path.abspath(filepath)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        h.update(repr(None if tickers is None else sorted(tickers)).encode())
+    return h.hexdigest()
+
+
+def _cache_get(slot, version):
+    with _cache_lock:
+        entry = _MEMORY_CACHE.get(slot)
+        if entry is None or entry[0] != version:
+            return None
+        _MEMORY_CACHE.move_to_end(slot)
+        return entry[1]
+
+
+def _cache_put(slot, version, value):
+    with _cache_lock:
+        _MEMORY_CACHE[slot] = (version, value)
+        _MEMORY_CACHE.move_to_end(slot)
+        while len(_MEMORY_CACHE) > MAX_MEMORY_ENTRIES:
+            _MEMORY_CACHE.popitem(last=False)
+    return value
+
+
+def _read_wide_prices(filepath, tickers, field):
+    """저장소(또는 예전 CSV)에서 Wide Format 가격을 읽습니다."""
+    if is_store(filepath):
+        return load_panel(filepath, field=field, tickers=tickers)
+
+    with perf.stage("panel.read_csv") as s:
+        df = pd.read_csv(filepath)
+        df['Date'] = pd.to_datetime(df['Date'])
+        s.set(rows=len(df))
+    with perf.stage("panel.pivot", rows=len(df)):
+        df = df.pivot(index='Date', columns='Ticker', values=field)
+    return df if tickers is None else df[[t for t in tickers if t in df.columns]]
+
+
+@perf.timed("panel.build_arrays")
+def _build_arrays(prices):
+    """ffill().dropna() 한 가격 -> (가격, 일별 수익률, 로그 수익률) 배열"""
+    values = np.ascontiguousarray(prices.to_numpy(dtype=np.float64))
+    ratio = values[1:] / values[:-1]
+    return values, ratio - 1.0, np.log(ratio)
+
+
+def _readonly(arr):
+    """캐시 배열은 여러 곳에서 공유하므로 수정 불가로 만듭니다."""
+    arr.flags.writeable = False
+    return arr
+
+
+def _wrap(prices, returns, log_returns, dates, tickers, version):
+    """배열을 복사 없이 DataFrame으로 감쌉니다."""
+    index = pd.DatetimeIndex(_EPOCH + dates, name="Date")
+    columns = pd.Index(tickers, name="Ticker")
+    return {
+        "prices": pd.DataFrame(prices, index=index, columns=columns, copy=False),
+        "returns": pd.DataFrame(returns, index=index[1:], columns=columns, copy=False),
+        "log_returns": pd.DataFrame(log_returns, index=index[1:], columns=columns, copy=False),
+        "version": version,
+    }
+
+
+def _save_disk_cache(cache_path, prices, returns, log_returns, dates, tickers):
+    """
+    캐시를 .npy 파일들로 저장 (다음 실행에서 메모리 맵으로 바로 열기)
+    프로세스마다 고유한 임시 폴더에 쓴 뒤 이름을 바꿔서 (다른 프로세스와 같은 캐시를 동시에 써도 안전)
+    """
+    cache_dir, name = os.path.split(cache_path)
+    tmp_path = tempfile.mkdtemp(dir=cache_dir, prefix=name + ".tmp-")
+    np.save(os.path.join(tmp_path, "prices.npy"), prices)
+    np.save(os.path.join(tmp_path, "returns.npy"), returns)
+    np.save(os.path.join(tmp_path, "log_returns.npy"), log_returns)
+    np.save(os.path.join(tmp_path, "dates.npy"), dates)
+    with open(os.path.join(tmp_path, "tickers.json"), "w", encoding="utf-8") as f:
+        json.dump(list(tickers), f, ensure_ascii=False)
+    try:
+        os.rename(tmp_path, cache_path)
+    except OSError:
+        # 다른 프로세스가 먼저 만들었으면 그대로 사용
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def _prune_disk_cache(cache_dir, slot, keep):
+    """
+    같은 자리(slot)의 예전 버전 캐시 폴더 삭제 (다른 프로세스의 임시 폴더는 건드리지 않음)
+    자리 구분이 없던 예전 형식(해시 40자리) 폴더도 함께 삭제
+    """
+    pattern = re.compile(re.escape(slot) + r"_[0-9a-f]{16}|[0-9a-f]{40}")
+    for name in os.listdir(cache_dir):
+        if name != keep and pattern.fullmatch(name):
+            shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+
+
+def _load_disk_cache(cache_path):
+    """디스크 캐시를 메모리 맵(읽기 전용)으로 엽니다."""
+    arrays = [np.load(os.path.join(cache_path, f"{name}.npy"), mmap_mode="r")
+              for name in ("prices", "returns", "log_returns")]
+    dates = np.load(os.path.join(cache_path, "dates.npy"))
+    with open(os.path.join(cache_path, "tickers.json"), encoding="utf-8") as f:
+        tickers = json.load(f)
+    return arrays, dates, tickers
+
+
+@perf.timed("panel.get_panel")
+def get_panel(filepath=STORE_DIR, tickers=None, field="Close", cache_dir=CACHE_DIR):
+    """
+    분석 공통 패널을 반환합니다.
+    가격 Wide Format -> ffill().dropna() -> 일별/로그 수익률을 한 번만 계산하고
+    메모리와 디스크(data/cache/panel)에 캐시합니다. (키: 데이터 내용 해시)
+
+    반환: {"prices", "returns", "log_returns": DataFrame (읽기 전용, 복사 없음), "version": 해시}
+    """
+    if not os.path.exists(filepath):
+        print(f"데이터 파일이 없습니다: {filepath}")
+        return None
+
+    version = data_version(filepath, tickers, field)
+    slot = ("panel", os.path.abspath(filepath), field, None if tickers is None else tuple(tickers))
+
+    # 1. 프로세스 내 캐시
+    panel = _cache_get(slot, version)
+    if panel is not None:
+        return panel
+
+    # 2. 디스크 캐시 (폴더 이름: 자리 해시_버전 앞 16자리 -> 새 버전을 저장할 때 예전 버전 삭제)
+    slot_hash = hashlib.sha1(repr(slot).encode()).hexdigest()
+    key = f"{slot_hash}_{version[:16]}"
+    cache_path = os.path.join(cache_dir, key) if cache_dir else None
+    if cache_path and os.path.isdir(cache_path):
+        (prices, returns, log_returns), dates, names = _load_disk_cache(cache_path)
+    else:
+        # 3. 새로 계산
+        wide = _read_wide_prices(filepath, tickers, field).ffill().dropna()
+        prices, returns, log_returns = _build_arrays(wide)
+        dates = (wide.index.values.astype("datetime64[D]") - _EPOCH).astype(np.int64)
+        names = list(wide.columns)
+        if cache_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            _save_disk_cache(cache_path, prices, returns, log_returns, dates, names)
+            _prune_disk_cache(cache_dir, slot_hash, key)
+        prices, returns, log_returns = (_readonly(a) for a in (prices, returns, log_returns))
+
+    return _cache_put(slot, version, _wrap(prices, returns, log_returns, dates, names, version))
+
+
+def get_prices(filepath=STORE_DIR, tickers=None, field="Close"):
+    """공통 패널의 가격 (날짜 x 종목)"""
+    panel = get_panel(filepath, tickers, field)
+    return None if panel is None else panel["prices"]
+
+
+def get_returns(filepath=STORE_DIR, tickers=None, log=False):
+    """공통 패널의 일별 수익률 (log=True면 로그 수익률)"""
+    panel = get_panel(filepath, tickers)
+    if panel is None:
+        return None
+    return panel["log_returns"] if log else panel["returns"]
+
+
+def get_ticker(filepath, ticker, fields=None):
+    """
+    단일 종목 OHLCV (전체 파일 스캔 + 필터링 대신 해당 종목 파일만 메모리 맵으로 읽음)
+    """
+    if not is_store(filepath):
+        print(f"가격 저장소가 아닙니다: {filepath}")
+        return None
+    return load_ticker(filepath, ticker, fields=fields)
+
+
+@perf.timed("panel.get_compact")
+def get_compact(filepath=STORE_DIR, tickers=None, field="Close", dtype=np.float32):
+    """
+    종목이 많을 때 쓰는 CompactPanel 버전 (정수 코드 축 + float32 기본, 결측 유지)
+    ffill().dropna()를 하지 않으므로 상장일이 다른 종목이 섞여도 기간이 줄지 않고,
+    수익률은 종목마다 값이 있는 구간에서 계산합니다. (프로세스 내 캐시)
+
+    반환: {"prices", "returns": CompactPanel, "version": 해시}
+    """
+    if not os.path.exists(filepath):
+        print(f"데이터 파일이 없습니다: {filepath}")
+        return None
+
+    version = data_version(filepath, tickers, field)
+    slot = ("compact", os.path.abspath(filepath), field, None if tickers is None else tuple(tickers),
+            np.dtype(dtype).str)
+    cached = _cache_get(slot, version)
+    if cached is None:
+        if is_store(filepath):
+            prices = load_compact(filepath, field, tickers, dtype=dtype)
+        else:
+            prices = from_long(pd.read_csv(filepath), field, dtype=dtype)
+            if tickers is not None:
+                prices = prices.select([t for t in tickers if t in prices.codes])
+        _readonly(prices.data)
+        returns = prices.returns()
+        _readonly(returns.data)
+        cached = _cache_put(slot, version, {"prices": prices, "returns": returns, "version": version})
+    return cached
+
+
+@perf.timed("panel.get_aligned_returns")
+def get_aligned_returns(filepath=STORE_DIR, tickers=None, field="Close", calendar=None, log=False):
+    """
+    ffill().dropna() 없이 달력을 맞춘 수익률 (날짜 x 종목, 결측 유지, 프로세스 내 캐시)
+    상장일 / 거래소가 다른 종목이 섞여도 전체 기간을 자르지 않습니다. (pairwise.align_returns 참고)
+    pairwise_cov / pairwise_corr / calculate_beta_batch로 쌍마다 공통 관측일을 써서 계산하세요.
+    """
+    if not os.path.exists(filepath):
+        print(f"데이터 파일이 없습니다: {filepath}")
+        return None
+
+    version = data_version(filepath, tickers, field)
+    calendar_key = calendar if calendar is None or isinstance(calendar, str) else tuple(map(str, calendar))
+    slot = ("aligned", os.path.abspath(filepath), field, None if tickers is None else tuple(tickers),
+            calendar_key, log)
+    returns = _cache_get(slot, version)
+    if returns is None:
+        returns = _cache_put(slot, version,
+                             align_returns(_read_wide_prices(filepath, tickers, field), calendar=calendar, log=log))
+    return returns
+
+
+def clear_cache():
+    """프로세스 내 캐시 비우기 (디스크 캐시는 유지)"""
+    with _cache_lock:
+        _MEMORY_CACHE.clear()
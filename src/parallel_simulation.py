@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from covariance import get_covariance
+from panel import get_panel
+from portfolio_optimization import CHUNK_SIZE, RISK_FREE_RATE, simulate_portfolios
+
+# 프로세스 하나가 한 번에 맡는 시뮬레이션 수 (시드도 이 단위로 나눔)
+BATCH_SIZE = 1_000_000
+
+
+def _empty_summary(num_assets):
+    """빈 요약 (stats: [수익률, 변동성, 샤프] 행, weights: 같은 순서의 비중 행)"""
+    empty = {"stats": np.empty((0, 3)), "weights": np.empty((0, num_assets))}
+    return {"top": dict(empty), "min_vol": dict(empty), "pareto": dict(empty), "count": 0}
+
+
+def _pareto_front(stats):
+    """
+    (수익률은 높을수록, 변동성은 낮을수록 좋은) 지배되지 않는 점들의 인덱스
+    변동성 오름차순으로 보면서 지금까지의 최고 수익률보다 높은 점만 남깁니다.
+    """
+    order = np.lexsort((-stats[:, 0], stats[:, 1]))
+    returns = stats[order, 0]
+    running_max = np.maximum.accumulate(returns)
+    keep = np.r_[True, returns[1:] > running_max[:-1]]
+    return order[keep]
+
+
+def _reduce_part(part, stats, weights, top_k):
+    """한 부분의 후보들(stats, weights)을 줄입니다. (top-k / 최소 변동성 / 파레토 집합)"""
+    if part == "top":
+        # 샤프 지수 상위 k개 (부분 정렬 후 k개만 정렬)
+        idx = np.argpartition(-stats[:, 2], top_k - 1)[:top_k] if len(stats) > top_k else np.arange(len(stats))
+        idx = idx[np.argsort(-stats[idx, 2], kind="stable")]
+    elif part == "min_vol":
+        idx = np.argmin(stats[:, 1], keepdims=True) if len(stats) else np.arange(0)
+    else:
+        idx = _pareto_front(stats)
+    return {"stats": stats[idx], "weights": weights[idx]}
+
+
+def _merge(summary, stats, weights, top_k):
+    """새 시뮬레이션 결과(stats, weights)를 요약에 합칩니다."""
+    for part in ("top", "min_vol", "pareto"):
+        summary[part] = _reduce_part(part,
+                                     np.concatenate([summary[part]["stats"], stats]),
+                                     np.concatenate([summary[part]["weights"], weights]), top_k)
+    summary["count"] += len(stats)
+    return summary
+
+
+def merge_summaries(a, b, top_k):
+    """두 요약을 하나로 합칩니다. (배치별 결과 합치기 - 부분끼리만 합침)"""
+    for part in ("top", "min_vol", "pareto"):
+        a[part] = _reduce_part(part,
+                               np.concatenate([a[part]["stats"], b[part]["stats"]]),
+                               np.concatenate([a[part]["weights"], b[part]["weights"]]), top_k)
+    a["count"] += b["count"]
+    return a
+
+
+def simulate_batch(mu, cov, num_simulations, seed, top_k=10, risk_free_rate=RISK_FREE_RATE,
+                   chunk_size=CHUNK_SIZE):
+    """
+    한 배치를 chunk_size씩 시뮬레이션하면서 바로 요약만 남깁니다.
+    전체 결과/비중을 모아두지 않으므로 메모리는 chunk_size에만 비례합니다.
+    seed: SeedSequence (배치마다 독립적인 난수 흐름)
+    """
+    rng = np.random.default_rng(seed)
+    summary = _empty_summary(len(mu))
+    for start in range(0, num_simulations, chunk_size):
+        size = min(chunk_size, num_simulations - start)
+        # 같은 Generator를 넘기므로 청크가 이어서 난수를 뽑음
+        results, weights = simulate_portfolios(mu, cov, size, risk_free_rate=risk_free_rate,
+                                               chunk_size=size, seed=rng)
+        summary = _merge(summary, results.T, weights, top_k)
+    return summary
+
+
+def run_parallel_monte_carlo(mean_daily_returns, cov_matrix, num_simulations, num_workers=None,
+                             batch_size=BATCH_SIZE, top_k=10, seed=None,
+                             risk_free_rate=RISK_FREE_RATE, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    몬테카를로 시뮬레이션을 여러 프로세스로 나눠 실행합니다.
+    - 배치마다 SeedSequence.spawn으로 만든 독립 시드 사용 -> 프로세스 수와 무관하게 같은 seed면 같은 결과
+    - 각 프로세스는 전체 결과 대신 요약(샤프 상위 k개, 최소 변동성, 파레토 집합)만 반환
+    -> 1억 번 시뮬레이션도 메모리 일정, 코어 수에 비례해 빨라짐
+
+    num_workers=1이면 현재 프로세스에서 실행합니다. (대시보드/테스트용)
+    progress: progress(완료 배치 수, 전체 배치 수, 현재까지 요약) 콜백
+    """
+    mu = np.asarray(mean_daily_returns, dtype=np.float64)
+    cov = np.asarray(cov_matrix, dtype=np.float64)
+    sizes = [min(batch_size, num_simulations - s) for s in range(0, num_simulations, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    num_workers = num_workers or os.cpu_count() or 1
+
+    summary = _empty_summary(len(mu))
+    print(f"{num_simulations}번의 시뮬레이션을 {len(sizes)}개 배치, {num_workers}개 프로세스로 실행 중...")
+
+    if num_workers == 1:
+        for done, (size, batch_seed) in enumerate(zip(sizes, seeds), start=1):
+            batch = simulate_batch(mu, cov, size, batch_seed, top_k, risk_free_rate, chunk_size)
+            summary = merge_summaries(summary, batch, top_k)
+            if progress is not None:
+                progress(done, len(sizes), summary)
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers) as pool:
+            futures = [pool.submit(simulate_batch, mu, cov, size, batch_seed, top_k, risk_free_rate, chunk_size)
+                       for size, batch_seed in zip(sizes, seeds)]
+            # 끝나는 배치부터 바로 합침 (배치 결과를 쌓아두지 않음)
+            for done, future in enumerate(as_completed(futures), start=1):
+                summary = merge_summaries(summary, future.result(), top_k)
+                if progress is not None:
+                    progress(done, len(sizes), summary)
+
+    return summary
+
+
+def summary_frame(summary, part, tickers):
+    """요약의 한 부분(top / min_vol / pareto)을 [수익률, 변동성, 샤프 + 종목별 비중] 표로 변환"""
+    stats = pd.DataFrame(summary[part]["stats"], columns=['Return', 'Volatility', 'Sharpe'])
+    weights = pd.DataFrame(summary[part]["weights"], columns=list(tickers))
+    return pd.concat([stats, weights], axis=1)
+
+
+if __name__ == "__main__":
+    file_path = "data/price_store"
+    panel = get_panel(file_path)
+
+    if panel is not None:
+        returns = panel['returns']
+        # 공분산은 다른 분석과 같은 추정기 캐시에서 가져옴
+        cov_matrix = get_covariance(returns)
+        tickers = list(cov_matrix.columns)
+        summary = run_parallel_monte_carlo(returns[tickers].mean(), cov_matrix, 10_000_000, seed=42)
+
+        print(f"\n총 {summary['count']}개 포트폴리오 중 샤프 지수 상위 5개:")
+        print(summary_frame(summary, "top", tickers).head().round(4))
+        print("\n최소 변동성 포트폴리오:")
+        print(summary_frame(summary, "min_vol", tickers).round(4))
+        print(f"\n파레토 집합 크기: {len(summary['pareto']['stats'])}")
@@ -0,0 +1,312 @@
+import functools
+import io
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 단계별 시간 / 메모리 측정 (로더, 지표, 통계, 최적화, 대시보드)
+# 꺼져 있으면 stage()는 아무것도 하지 않는 객체를 돌려주므로 비용이 거의 없습니다.
+# 켜는 방법: 환경 변수 ALPHASEEKER_PERF=1 (자식 프로세스에도 적용) 또는 enable()
+ENV_FLAG = "ALPHASEEKER_PERF"
+ENV_LOG = "ALPHASEEKER_PERF_LOG"
+
+# 최근 기록 보관 개수 (대시보드 성능 패널에서 표시)
+MAX_RECORDS = 2000
+PROFILE_DIR = "data/benchmarks/profiles"
+
+logger = logging.getLogger("alphaseeker.perf")
+logger.propagate = False
+
+_enabled = os.environ.get(ENV_FLAG, "") not in ("", "0")
+_records = deque(maxlen=MAX_RECORDS)
+_seq = itertools.count(1)
+_local = threading.local()
+_capture = None
+_capture_lock = threading.Lock()
+
+
+class _NoStage:
+    """꺼져 있을 때의 stage (아무것도 하지 않음)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **counts):
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+
+class _Stage:
+    """
+    측정 중인 단계 하나: 벽시계 시간, CPU 시간, 메모리, 행/종목 수
+    메모리: tracemalloc이 켜져 있으면 단계 안에서의 최대 할당량(peak_mb),
+           항상 프로세스 최대 상주 메모리(rss_mb, 운영체제 기준)를 함께 기록
+    """
+
+    def __init__(self, name, counts):
+        self.name = name
+        self.counts = counts
+        self.peak = 0
+
+    def set(self, **counts):
+        """단계 안에서 알게 된 크기 정보 (rows=..., assets=..., simulations=...)"""
+        self.counts.update(counts)
+
+    def __enter__(self):
+        stack = _stack()
+        self.parent = stack[-1].name if stack else None
+        self.depth = len(stack)
+        self.tracing = tracemalloc.is_tracing()
+        if self.tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.start_memory = current
+        stack.append(self)
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        stack = _stack()
+        stack.pop()
+
+        peak_mb = None
+        if self.tracing and tracemalloc.is_tracing():
+            peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            peak_mb = round((peak - self.start_memory) / 1024 ** 2, 3)
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+
+        _record({"seq": next(_seq), "time": datetime.now().isoformat(timespec="milliseconds"),
+                 "stage": self.name, "parent": self.parent, "depth": self.depth,
+                 "wall_s": round(wall, 6), "cpu_s": round(cpu, 6), "peak_mb": peak_mb, "rss_mb": _rss_mb(),
+                 "thread": threading.current_thread().name, "error": None if exc_type is None else exc_type.__name__,
+                 **self.counts})
+        return False
+
+
+def _stack():
+    """스레드별 진행 중인 단계 (중첩 단계의 부모 / 깊이 계산용)"""
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _rss_mb():
+    """프로세스 최대 상주 메모리 (MB, 리눅스는 KB / macOS는 바이트 단위)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 ** 2 if sys.platform == "darwin" else 1024), 1)
+
+
+def _record(record):
+    _records.append(record)
+    if logger.handlers:
+        logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+
+def stage(name, **counts):
+    """
+    단계 측정: with perf.stage("panel.load", assets=10) as s: ... s.set(rows=len(df))
+    꺼져 있으면 비용 없는 빈 객체를 반환합니다.
+    """
+    if not _enabled:
+        return _NO_STAGE
+    return _Stage(name, counts)
+
+
+def _shape(value):
+    """표 / 배열 모양 -> {"rows", "assets"} (날짜 x 종목 기준, 1차원이면 종목 수만)"""
+    shape = getattr(value, "shape", None)
+    if shape is None or len(shape) not in (1, 2):
+        return {}
+    counts = {"assets": int(shape[-1])}
+    if len(shape) == 2:
+        counts["rows"] = int(shape[0])
+    return counts
+
+
+def _counts(fn, args, kwargs, data, record):
+    """
+    함수 인자에서 크기 정보 추출 (측정이 켜져 있을 때만 호출)
+    data 인자(없으면 첫 번째 표 / 배열 인자)의 모양 -> rows / assets, record에 있는 인자 값은 그대로
+    """
+    import inspect
+
+    bound = inspect.signature(fn).bind_partial(*args, **kwargs).arguments
+    counts = {name: bound[name] for name in record if name in bound}
+    for value in ([bound[data]] if data in bound else bound.values()):
+        shape = _shape(value)
+        if shape:
+            counts.update(shape)
+            break
+    return counts
+
+
+def timed(name, data=None, record=()):
+    """
+    함수 전체를 단계로 측정하는 데코레이터 (꺼져 있으면 함수를 그대로 호출)
+    data: 모양(rows / assets)을 기록할 인자 이름 (인자에 표 / 배열이 없으면 반환값의 모양)
+    record: 값을 그대로 기록할 인자 이름들 (예: num_simulations)
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            counts = _counts(fn, args, kwargs, data, record)
+            with _Stage(name, counts) as s:
+                result = fn(*args, **kwargs)
+                if "assets" not in counts:
+                    s.set(**_shape(result))
+                return result
+        return wrapper
+    return decorator
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable(on=True, log_path=None, stream=True):
+    """
+    측정 켜기 / 끄기
+    log_path: 기록을 JSON Lines 파일로 남김, stream: 표준 에러로도 출력
+    (환경 변수도 바꾸므로 이후에 만든 자식 프로세스도 같은 설정으로 측정)
+    """
+    global _enabled
+    _enabled = bool(on)
+    os.environ[ENV_FLAG] = "1" if _enabled else "0"
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    if not _enabled:
+        return
+    logger.setLevel(logging.INFO)
+    log_path = log_path or os.environ.get(ENV_LOG)
+    if log_path:
+        os.environ[ENV_LOG] = log_path
+        os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+        logger.addHandler(logging.FileHandler(log_path, encoding="utf-8"))
+    if stream:
+        logger.addHandler(logging.StreamHandler())
+
+
+def mark():
+    """현재 기록 위치 (records(since=mark())로 이후 기록만 가져오기)"""
+    return _records[-1]["seq"] if _records else 0
+
+
+def records(since=0):
+    """since 이후의 단계 기록 목록 (오래된 순)"""
+    return [r for r in list(_records) if r["seq"] > since]
+
+
+def summary(since=0):
+    """단계별 합계표 [stage, calls, wall_s, cpu_s, peak_mb, rss_mb] (시간 많이 쓴 순)"""
+    import pandas as pd
+
+    rows = records(since)
+    if not rows:
+        return pd.DataFrame(columns=["stage", "calls", "wall_s", "cpu_s", "peak_mb", "rss_mb"])
+    frame = pd.DataFrame(rows)
+    table = frame.groupby("stage").agg(calls=("seq", "size"), wall_s=("wall_s", "sum"), cpu_s=("cpu_s", "sum"),
+                                       peak_mb=("peak_mb", "max"), rss_mb=("rss_mb", "max"))
+    return table.sort_values("wall_s", ascending=False).reset_index()
+
+
+def clear():
+    _records.clear()
+
+
+def start_capture(name="run", profile=True, memory=True):
+    """
+    실행 한 번의 상세 측정 시작 (cProfile 함수별 시간 + tracemalloc 할당 위치)
+    측정하는 동안 단계 기록도 켭니다. 한 번에 하나만 가능 (이미 진행 중이면 False)
+    """
+    global _capture
+    with _capture_lock:
+        if _capture is not None:
+            return False
+        _capture = {"name": name, "was_enabled": _enabled, "since": mark(), "profiler": None,
+                    "started_tracing": False}
+    if not _enabled:
+        enable(True, stream=False)
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _capture["started_tracing"] = True
+    if profile:
+        import cProfile
+
+        # cProfile은 시작한 스레드만 측정 (백그라운드 작업 스레드는 단계 기록으로 확인)
+        _capture["profiler"] = cProfile.Profile()
+        _capture["profiler"].enable()
+    return True
+
+
+def stop_capture(top=25, profile_dir=PROFILE_DIR):
+    """
+    상세 측정 종료
+    반환: {"profile": 누적 시간 상위 함수 (텍스트), "memory": 할당 상위 위치 [(위치, MB, 횟수)],
+           "stages": 이 실행의 단계 기록, "profile_path": .prof 파일 (snakeviz 등으로 보기)}
+    """
+    global _capture
+    with _capture_lock:
+        capture, _capture = _capture, None
+    if capture is None:
+        return None
+
+    report = {"name": capture["name"], "profile": "", "memory": [], "profile_path": None}
+    profiler = capture["profiler"]
+    if profiler is not None:
+        import pstats
+
+        profiler.disable()
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(top)
+        report["profile"] = text.getvalue()
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            report["profile_path"] = os.path.join(profile_dir, f"{capture['name']}-{stamp}.prof")
+            profiler.dump_stats(report["profile_path"])
+
+    if tracemalloc.is_tracing():
+        snapshot = tracemalloc.take_snapshot()
+        stats = snapshot.statistics("lineno")[:top]
+        report["memory"] = [(str(s.traceback[0]), round(s.size / 1024 ** 2, 3), s.count) for s in stats]
+        if capture["started_tracing"]:
+            tracemalloc.stop()
+
+    report["stages"] = records(capture["since"])
+    if not capture["was_enabled"]:
+        enable(False)
+    return report
+
+
+if _enabled:
+    enable(True)
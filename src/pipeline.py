@@ -0,0 +1,330 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import perf
+from pairwise import MIN_OVERLAP, align_returns
+from panel import data_version, get_aligned_returns
+from plotting import use_headless
+from portfolio_optimization import RISK_FREE_RATE, plot_efficient_frontier, run_monte_carlo_simulation
+from price_store import STORE_DIR, list_tickers, load_panel, load_ticker, read_index
+
+# 화면 없이 돌리는 배치 분석 (서버 / 스케줄러용)
+# 저장소 -> 종목별 기술적 지표 + 베타 (프로세스 풀) -> 전체 종목 포트폴리오 최적화 -> Parquet / JSON 리포트
+OUTPUT_DIR = "reports"
+MARKET_TICKER = "^GSPC"
+MANIFEST_FILE = "manifest.json"
+FRONTIER_POINTS = 50
+# 최적화에 넣는 최대 종목 수 (효율적 투자선은 점마다 종목 수 크기의 최적화를 풀어야 함)
+# 넘으면 기록이 가장 긴 종목부터 사용, None이면 제한 없음
+MAX_OPT_ASSETS = 50
+
+TRADING_DAYS = 252
+
+
+def _safe_name(ticker):
+    """종목 코드 -> 파일명 (^GSPC -> _GSPC)"""
+    return re.sub(r"[^\w.-]", "_", ticker)
+
+
+def _paths(output_dir, ticker):
+    """종목별 결과 파일 위치"""
+    name = _safe_name(ticker)
+    return {
+        "indicators": os.path.join(output_dir, "indicators", name + ".parquet"),
+        "figure": os.path.join(output_dir, "figures", name + ".png"),
+    }
+
+
+def _write_json(path, data):
+    """임시 파일에 쓴 뒤 교체 (중간에 끊겨도 이전 결과가 깨지지 않도록)"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1, default=str)
+    os.replace(tmp_path, path)
+
+
+def _read_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"params": None, "tickers": {}, "optimization": None}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _number(value):
+    """JSON에 쓸 수 있는 숫자 (NaN / inf -> None)"""
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+@perf.timed("pipeline.analyze_ticker")
+def analyze_ticker(store_dir, ticker, market_ticker, output_dir, save_figures=False):
+    """
+    종목 하나: 로드 -> 기술적 지표 -> 베타 -> (그림 저장)
+    프로세스 풀의 작업자에서 실행되므로 결과는 파일로 쓰고 요약 한 줄(dict)만 반환합니다.
+    """
+    # 작업자 프로세스에서 import (부모가 불러오지 않은 무거운 라이브러리는 필요할 때만)
+    from statistical_analysis import calculate_beta
+    from technical_analysis import add_technical_indicators, plot_technical_analysis
+
+    paths = _paths(output_dir, ticker)
+
+    # 1. 데이터 로드
+    df = load_ticker(store_dir, ticker)
+    if df is None or df["Close"].notna().sum() < 2:
+        raise ValueError(f"{ticker}: 데이터 부족")
+    df = df.drop(columns="Ticker").dropna(subset=["Close"])
+
+    # 2. 기술적 지표
+    df = add_technical_indicators(df)
+    df.to_parquet(paths["indicators"])
+
+    # 3. 베타 (시장 거래일 달력에 맞춘 수익률 중 둘 다 거래한 날)
+    beta = alpha = r_squared = np.nan
+    if ticker == market_ticker:
+        beta, alpha, r_squared = 1.0, 0.0, 1.0
+    else:
+        prices = load_panel(store_dir, tickers=[market_ticker, ticker])
+        if market_ticker in prices.columns:
+            returns_df = align_returns(prices, calendar=market_ticker)
+            result = calculate_beta(returns_df, market_ticker, ticker)
+            if result is not None:
+                beta, alpha, r_squared = result
+
+    # 4. 그림 (화면에 띄우지 않고 파일로만)
+    if save_figures:
+        use_headless()
+        plot_technical_analysis(df.dropna(), ticker, save_path=paths["figure"])
+
+    daily = df["Close"].pct_change().dropna()
+    last = df.iloc[-1]
+    return {
+        "Ticker": ticker,
+        "Rows": int(len(df)),
+        "Start": str(df.index[0].date()),
+        "End": str(df.index[-1].date()),
+        "Close": _number(last["Close"]),
+        "MA20": _number(last["MA20"]),
+        "MA60": _number(last["MA60"]),
+        "RSI": _number(last["RSI"]),
+        "Annual Return": _number(daily.mean() * TRADING_DAYS),
+        "Annual Volatility": _number(daily.std() * np.sqrt(TRADING_DAYS)),
+        "Beta": _number(beta),
+        "Alpha": _number(alpha),
+        "R2": _number(r_squared),
+    }
+
+
+def _needs_update(ticker, entry, hashes, output_dir, save_figures):
+    """데이터가 바뀌었거나 결과 파일이 없으면 다시 계산"""
+    if entry is None or entry.get("hash") != hashes.get(ticker) or entry.get("row") is None:
+        return True
+    paths = _paths(output_dir, ticker)
+    if not os.path.exists(paths["indicators"]):
+        return True
+    return save_figures and not os.path.exists(paths["figure"])
+
+
+def _refresh_betas(store_dir, market_ticker, tickers):
+    """
+    시장 지수 데이터만 바뀐 종목의 Beta / Alpha / R2를 한 번에 다시 계산 (지표 파일은 그대로)
+    analyze_ticker와 같은 기준 (시장 거래일 달력, 둘 다 거래한 날)
+    """
+    from statistical_analysis import calculate_beta_batch
+
+    returns_df = get_aligned_returns(store_dir, [market_ticker] + tickers, calendar=market_ticker)
+    result = calculate_beta_batch(returns_df, market_ticker, tickers)
+    if result is None:
+        return {}
+    return {t: {"Beta": _number(result["beta"][0, j]), "Alpha": _number(result["alpha"][0, j]),
+                "R2": _number(result["r_squared"][0, j])}
+            for j, t in enumerate(result["tickers"])}
+
+
+def _optimization_universe(tickers, manifest, optimize_tickers=None, max_assets=MAX_OPT_ASSETS):
+    """최적화에 넣을 종목 (optimize_tickers로 지정, 아니면 기록이 가장 긴 max_assets개)"""
+    if optimize_tickers is not None:
+        return [t for t in optimize_tickers if t in tickers]
+    if not max_assets or len(tickers) <= max_assets:
+        return tickers
+    chosen = set(sorted(tickers, key=lambda t: (-manifest["tickers"][t]["row"]["Rows"], t))[:max_assets])
+    print(f"[파이프라인] 최적화: 종목 {len(tickers)}개 중 기록이 가장 긴 {max_assets}개 사용 "
+          f"(--max-assets / --optimize로 변경)")
+    return [t for t in tickers if t in chosen]
+
+
+def _optimization_report(store_dir, tickers, risk_free_rate, num_points, output_dir, save_figures, seed):
+    """
+    종목 묶음 최적화 결과 (Max Sharpe / Min Volatility / 효율적 투자선) 저장
+    수익률은 ffill().dropna() 대신 달력만 맞춘 수익률 (가장 늦게 상장한 종목에 맞춰 기간을 자르지 않음,
+    평균은 종목별, 공분산은 쌍별 공통 관측일 기준 - covariance.get_covariance)
+    """
+    from optimizer import optimize_portfolio
+
+    daily_returns = get_aligned_returns(store_dir, tickers)
+    # 관측일이 너무 적은 종목은 평균 / 분산을 믿을 수 없으므로 제외
+    daily_returns = daily_returns.loc[:, (daily_returns.count() >= MIN_OVERLAP).to_numpy()]
+    if daily_returns.shape[1] < 2:
+        print("[파이프라인] 최적화: 관측일이 충분한 종목이 2개보다 적습니다.")
+        return None
+    exact = optimize_portfolio(daily_returns, risk_free_rate=risk_free_rate, num_points=num_points)
+
+    report = {"tickers": list(daily_returns.columns), "version": data_version(store_dir, tickers),
+              "start": str(daily_returns.index[0].date()), "end": str(daily_returns.index[-1].date())}
+    for name in ("max_sharpe", "min_volatility"):
+        best = exact[name]
+        report[name] = {"Return": _number(best["Return"]), "Volatility": _number(best["Volatility"]),
+                        "Sharpe": _number(best["Sharpe"]),
+                        "weights": {t: round(float(w), 6) for t, w in best["weights"].items()}}
+    _write_json(os.path.join(output_dir, "optimization.json"), report)
+
+    frontier = exact["frontier"].copy()
+    weights = pd.DataFrame(exact["frontier_weights"], columns=daily_returns.columns)
+    pd.concat([frontier, weights], axis=1).to_parquet(os.path.join(output_dir, "frontier.parquet"))
+
+    if save_figures:
+        results, weights_record = run_monte_carlo_simulation(None, num_simulations=5000,
+                                                             daily_returns=daily_returns, seed=seed)
+        plot_efficient_frontier(results, weights_record, daily_returns.columns, exact=exact,
+                                save_path=os.path.join(output_dir, "figures", "efficient_frontier.png"))
+    return report
+
+
+def run_pipeline(store_dir=STORE_DIR, tickers=None, market_ticker=MARKET_TICKER, output_dir=OUTPUT_DIR,
+                 workers=None, save_figures=False, force=False, risk_free_rate=RISK_FREE_RATE,
+                 num_points=FRONTIER_POINTS, seed=42, max_assets=MAX_OPT_ASSETS, optimize_tickers=None):
+    """
+    배치 분석 실행. 이전 실행의 manifest.json과 저장소 해시를 비교해서
+    데이터가 바뀐 종목만 다시 계산합니다. (설정이 바뀌면 전체 다시 계산)
+    시장 지수만 바뀐 종목은 지표는 그대로 두고 베타만 한 번에 다시 계산합니다.
+    max_assets / optimize_tickers: 최적화에 넣을 종목 수 제한 / 직접 지정 (_optimization_universe)
+    반환: (요약 DataFrame, 실패한 종목 {종목: 오류})
+    """
+    start = time.perf_counter()
+    entries = read_index(store_dir)["tickers"]
+    hashes = {t: e["hash"] for t, e in entries.items()}
+    if market_ticker not in hashes:
+        raise ValueError(f"저장소에 시장 지수가 없습니다: {market_ticker}")
+    if tickers is None:
+        tickers = [t for t in list_tickers(store_dir) if t != market_ticker]
+    missing = [t for t in tickers if t not in hashes]
+    if missing:
+        print(f"저장소에 없는 종목은 제외합니다: {missing}")
+    tickers = [t for t in tickers if t in hashes]
+
+    os.makedirs(os.path.join(output_dir, "indicators"), exist_ok=True)
+    if save_figures:
+        os.makedirs(os.path.join(output_dir, "figures"), exist_ok=True)
+
+    # 1. 다시 계산할 종목 고르기
+    manifest = _read_manifest(output_dir)
+    params = {"market": market_ticker, "version": 3}
+    if force or manifest["params"] != params:
+        manifest = {"params": params, "tickers": {}, "optimization": None}
+    market_hash = hashes[market_ticker]
+    todo = [t for t in tickers
+            if _needs_update(t, manifest["tickers"].get(t), hashes, output_dir, save_figures)]
+    # 종목 데이터는 그대로이고 시장 지수만 바뀐 종목 -> 베타만
+    beta_todo = [t for t in tickers if t not in todo and t != market_ticker
+                 and manifest["tickers"][t].get("market_hash") != market_hash]
+    print(f"[파이프라인] 종목 {len(tickers)}개 중 {len(todo)}개 계산, {len(beta_todo)}개 베타만 갱신 "
+          f"({len(tickers) - len(todo) - len(beta_todo)}개는 변경 없음)")
+
+    # 2. 종목별 분석 (프로세스 풀)
+    failed = {}
+
+    def record(ticker, row):
+        manifest["tickers"][ticker] = {"hash": hashes[ticker], "market_hash": market_hash, "row": row}
+
+    if todo:
+        args = (market_ticker, output_dir, save_figures)
+        if workers == 1 or len(todo) == 1:
+            for ticker in todo:
+                try:
+                    record(ticker, analyze_ticker(store_dir, ticker, *args))
+                except Exception as e:
+                    failed[ticker] = f"{type(e).__name__}: {e}"
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(analyze_ticker, store_dir, t, *args): t for t in todo}
+                for i, future in enumerate(as_completed(futures), start=1):
+                    ticker = futures[future]
+                    try:
+                        record(ticker, future.result())
+                    except Exception as e:
+                        failed[ticker] = f"{type(e).__name__}: {e}"
+                    if i % 50 == 0:
+                        print(f"   {i}/{len(todo)} 완료")
+    for ticker, error in failed.items():
+        manifest["tickers"].pop(ticker, None)
+        print(f"   실패: {ticker} ({error})")
+    if beta_todo:
+        for ticker, values in _refresh_betas(store_dir, market_ticker, beta_todo).items():
+            record(ticker, {**manifest["tickers"][ticker]["row"], **values})
+    _write_json(os.path.join(output_dir, MANIFEST_FILE), manifest)
+
+    # 3. 요약 리포트 (이번에 계산한 종목 + 변경 없는 종목의 이전 결과)
+    rows = [manifest["tickers"][t]["row"] for t in tickers if t in manifest["tickers"]]
+    summary = pd.DataFrame(rows)
+    summary.to_parquet(os.path.join(output_dir, "summary.parquet"), index=False)
+    _write_json(os.path.join(output_dir, "summary.json"),
+                {"market": market_ticker, "tickers": rows, "failed": failed})
+
+    # 4. 포트폴리오 최적화 (최적화에 넣는 종목의 데이터가 바뀌었을 때만, 시장 지수와 무관)
+    universe = _optimization_universe([t for t in tickers if t in manifest["tickers"]], manifest,
+                                      optimize_tickers, max_assets)
+    opt_key = {"tickers": universe, "hashes": [hashes[t] for t in universe], "risk_free_rate": risk_free_rate,
+               "num_points": num_points, "figures": save_figures}
+    if len(universe) >= 2 and (manifest.get("optimization") != opt_key
+                               or not os.path.exists(os.path.join(output_dir, "optimization.json"))):
+        report = _optimization_report(store_dir, universe, risk_free_rate, num_points, output_dir,
+                                      save_figures, seed)
+        if report is not None:
+            manifest["optimization"] = opt_key
+            _write_json(os.path.join(output_dir, MANIFEST_FILE), manifest)
+            print(f"[파이프라인] 최적화 완료 (Max Sharpe 샤프 지수 {report['max_sharpe']['Sharpe']:.2f})")
+    elif len(universe) >= 2:
+        print("[파이프라인] 최적화: 데이터 변경 없음 (이전 결과 사용)")
+
+    print(f"[파이프라인] 완료 ({time.perf_counter() - start:.1f}초) -> {output_dir}")
+    return summary, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AlphaSeeker 배치 분석 (지표 -> 베타 -> 최적화, 화면 출력 없음)")
+    parser.add_argument("--store", default=STORE_DIR, help="가격 저장소 폴더")
+    parser.add_argument("--tickers", nargs="+", help="분석할 종목 (없으면 저장소 전체)")
+    parser.add_argument("--market", default=MARKET_TICKER, help="베타 기준 시장 지수")
+    parser.add_argument("--output", default=OUTPUT_DIR, help="리포트 폴더")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--figures", action="store_true", help="그림을 PNG로 저장")
+    parser.add_argument("--force", action="store_true", help="변경 여부와 관계없이 전부 다시 계산")
+    parser.add_argument("--frontier-points", type=int, default=FRONTIER_POINTS, help="효율적 투자선 점 수")
+    parser.add_argument("--max-assets", type=int, default=MAX_OPT_ASSETS,
+                        help="최적화에 넣는 최대 종목 수 (기록이 긴 종목부터, 0이면 제한 없음)")
+    parser.add_argument("--optimize", nargs="+", help="최적화할 종목 직접 지정 (--max-assets 무시)")
+    parser.add_argument("--perf", action="store_true",
+                        help="단계별 시간 / 메모리를 <output>/perf.jsonl 에 기록 (작업자 프로세스 포함)")
+    args = parser.parse_args(argv)
+
+    # 서버에는 화면이 없으므로 그림은 항상 파일로만
+    use_headless()
+    if args.perf:
+        os.makedirs(args.output, exist_ok=True)
+        perf.enable(log_path=os.path.join(args.output, "perf.jsonl"), stream=False)
+    _, failed = run_pipeline(args.store, args.tickers, args.market, args.output, args.workers,
+                             args.figures, args.force, num_points=args.frontier_points,
+                             max_assets=args.max_assets, optimize_tickers=args.optimize)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import os
+import platform
+import sys
+
+# matplotlib / seaborn은 불러오는 데만 수 초가 걸리므로 실제로 그림을 그릴 때 처음 불러옵니다.
+# (대시보드 / 배치 작업 시작 시간 단축) 폰트 설정도 그때 한 번만 합니다.
+_fonts_ready = False
+
+
+def setup_fonts(plt):
+    """한글 폰트 / 마이너스 기호 설정 (프로세스당 한 번)"""
+    global _fonts_ready
+    if _fonts_ready:
+        return
+    if platform.system() == 'Darwin':
+        plt.rc('font', family='AppleGothic')
+    else:
+        plt.rc('font', family='Malgun Gothic')
+    plt.rc('axes', unicode_minus=False)
+    _fonts_ready = True
+
+
+def pyplot():
+    """폰트 설정이 끝난 matplotlib.pyplot (처음 호출할 때 import)"""
+    import matplotlib.pyplot as plt
+
+    setup_fonts(plt)
+    return plt
+
+
+def use_headless():
+    """
+    화면 없이 파일로만 저장 (서버 / 배치 작업용 Agg 백엔드)
+    아직 matplotlib을 불러오지 않았으면 환경 변수만 설정 (import 비용 없음, 자식 프로세스에도 적용)
+    """
+    if "matplotlib" in sys.modules:
+        sys.modules["matplotlib"].use("Agg")
+    else:
+        os.environ["MPLBACKEND"] = "Agg"
+
+
+def show_or_save(fig, save_path=None, dpi=100):
+    """save_path가 있으면 파일로 저장하고 닫음 (화면에 띄우지 않음), 없으면 plt.show()"""
+    plt = pyplot()
+    if save_path:
+        fig.savefig(save_path, dpi=dpi, bbox_inches="tight")
+        plt.close(fig)
+    else:
+        plt.show()
+
+
+def seaborn():
+    """seaborn (처음 호출할 때 import, 폰트 설정 포함)"""
+    import seaborn as sns
+
+    pyplot()
+    return sns
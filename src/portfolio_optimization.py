@@ -1,80 +1,111 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import os
-
-# 폰트 설정
-import platform
-if platform.system() == 'Darwin':
-    plt.rc('font', family='AppleGothic')
-else:
-    plt.rc('font', family='Malgun Gothic')
-plt.rc('axes', unicode_minus=False)
-
-def load_data(filepath):
+
+import perf
+from compact_panel import as_frame
+from covariance import get_covariance
+from panel import get_panel
+from plotting import pyplot, show_or_save
+from risk import CONFIDENCE, historical_drawdowns, historical_var_cvar, parametric_var_cvar
+
+def load_data(filepath, tickers=None):
     """데이터 로드 및 Wide Format 변환"""
-    if not os.path.exists(filepath):
-        print("데이터 파일이 없습니다.")
+    # 공통 패널 로더 (Wide Format + 결측치 제거 + 수익률을 한 번만 계산해서 캐시)
+    panel = get_panel(filepath, tickers=tickers)
+    if panel is None:
         return None
-    
-    df = pd.read_csv(filepath)
-    df['Date'] = pd.to_datetime(df['Date'])
-    
-    # Wide Format (날짜 x 종목) 변환
-    if 'Ticker' in df.columns:
-        df = df.pivot(index='Date', columns='Ticker', values='Close')
-    
-    # 결측치 제거
-    df = df.ffill().dropna()
-    return df
+    return panel['prices']
+
+# 무위험 이자율 (예: 미국 국채 3.5%)
+RISK_FREE_RATE = 0.035
+
+# 한 번에 계산할 포트폴리오 수 (메모리 사용량 상한)
+CHUNK_SIZE = 100_000
+
+@perf.timed("portfolio.simulate", record=("num_simulations",))
+def simulate_portfolios(mean_daily_returns, cov_matrix, num_simulations=10000,
+                        risk_free_rate=RISK_FREE_RATE, chunk_size=CHUNK_SIZE, dtype=np.float64, seed=None):
+    """
+    랜덤 포트폴리오를 행렬 연산으로 한꺼번에 계산합니다. (for 루프 없음)
+    chunk_size개씩 나눠서 계산하므로 시뮬레이션 횟수가 커도 임시 메모리는 일정합니다.
+    seed를 주면 같은 결과가 재현됩니다. dtype=np.float32로 메모리를 절반으로 줄일 수 있습니다.
+
+    반환: (results, weights)
+      results: (3 x 시뮬레이션 수) 배열 [수익률, 변동성, 샤프지수]
+      weights: (시뮬레이션 수 x 종목 수) 연속 배열
+    """
+    rng = np.random.default_rng(seed)
+    mu = np.asarray(mean_daily_returns, dtype=np.float64)
+    cov = np.asarray(cov_matrix, dtype=np.float64)
+    num_assets = len(mu)
+
+    results = np.empty((3, num_simulations), dtype=dtype)
+    weights = np.empty((num_simulations, num_assets), dtype=dtype)
+
+    for start in range(0, num_simulations, chunk_size):
+        stop = min(start + chunk_size, num_simulations)
+
+        # 1. 랜덤 비중 생성 (행마다 합이 1이 되도록)
+        w = rng.random((stop - start, num_assets))
+        w /= w.sum(axis=1, keepdims=True)
+        weights[start:stop] = w
+
+        # 2. 포트폴리오 기대 수익률 (연간): 비중 @ 평균수익률 * 252
+        port_return = (w @ mu) * 252
 
-def run_monte_carlo_simulation(df, num_simulations=10000):
+        # 3. 포트폴리오 변동성 (연간): sqrt(w' Σ w) * sqrt(252) - 행마다 이차형식을 한 번에
+        port_std = np.sqrt(np.einsum('ij,ij->i', w @ cov, w) * 252)
+
+        # 4. 샤프 지수
+        results[0, start:stop] = port_return
+        results[1, start:stop] = port_std
+        results[2, start:stop] = (port_return - risk_free_rate) / port_std
+
+    return results, weights
+
+def run_monte_carlo_simulation(df, num_simulations=10000, daily_returns=None, seed=None,
+                               chunk_size=CHUNK_SIZE, dtype=np.float64, cov_method="sample"):
     """
     몬테카를로 시뮬레이션:
     수만 번의 랜덤 비중 조합을 테스트하여 최적의 포트폴리오를 찾습니다.
+    daily_returns: 공통 패널의 수익률 행렬을 넘기면 다시 계산하지 않습니다.
+    cov_method: 공분산 추정 방법 (sample / ledoit_wolf / ewma, covariance.get_covariance 참고)
     """
+    df, daily_returns = as_frame(df), as_frame(daily_returns)
     # 일별 수익률
-    daily_returns = df.pct_change().dropna()
+    if daily_returns is None:
+        daily_returns = df.pct_change().dropna()
     
     # 연간 기대 수익률 및 공분산 (252일 = 1년 개장일)
     mean_daily_returns = daily_returns.mean()
-    cov_matrix = daily_returns.cov()
-    
-    # 결과 저장할 리스트
-    results = np.zeros((3, num_simulations)) # [수익률, 변동성, 샤프지수]
-    weights_record = [] # 비중 저장
-    
-    tickers = df.columns
-    num_assets = len(tickers)
-    risk_free_rate = 0.035 # 무위험 이자율 (예: 미국 국채 3.5%)
+    cov_matrix = get_covariance(daily_returns, cov_method)
 
     print(f"{num_simulations}번의 시뮬레이션을 돌리는 중... (잠시만 기다려주세요)")
 
-    for i in range(num_simulations):
-        # 1. 랜덤 비중 생성 (합이 1이 되도록)
-        weights = np.random.random(num_assets)
-        weights /= np.sum(weights)
-        weights_record.append(weights)
-        
-        # 2. 포트폴리오 기대 수익률 (연간)
-        # 공식: 비중 * 평균수익률 * 252
-        portfolio_return = np.sum(weights * mean_daily_returns) * 252
-        
-        # 3. 포트폴리오 변동성 (Risk)
-        # 공식: sqrt(비중.T * 공분산 * 비중) * sqrt(252)
-        portfolio_std_dev = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights))) * np.sqrt(252)
-        
-        # 4. 샤프 지수 (Sharpe Ratio)
-        # 공식: (수익률 - 무위험이자율) / 변동성
-        results[0,i] = portfolio_return
-        results[1,i] = portfolio_std_dev
-        results[2,i] = (portfolio_return - risk_free_rate) / portfolio_std_dev
+    # 결과: [수익률, 변동성, 샤프지수] 배열 + 비중 배열 (시뮬레이션 수 x 종목 수)
+    return simulate_portfolios(mean_daily_returns, cov_matrix, num_simulations,
+                               chunk_size=chunk_size, dtype=dtype, seed=seed)
 
-    return results, weights_record
+def add_risk_metrics(results, weights, daily_returns, confidence=CONFIDENCE, cov_method="sample"):
+    """
+    시뮬레이션 결과표에 후보별 1일 VaR / CVaR (과거, 정규분포)와 과거 최대 낙폭을 추가합니다.
+    모든 후보를 risk 모듈의 행렬곱 한 번으로 계산하므로 후보 수만큼 반복하지 않습니다.
+    (정규분포 VaR의 공분산은 시뮬레이션과 같은 추정기 캐시에서 가져옴)
+    """
+    daily_returns = as_frame(daily_returns)
+    results_frame = pd.DataFrame(results.T, columns=['Return', 'Volatility', 'Sharpe'])
+    results_frame['Hist VaR'], results_frame['Hist CVaR'] = historical_var_cvar(weights, daily_returns, confidence)
+    results_frame['Param VaR'], results_frame['Param CVaR'] = parametric_var_cvar(
+        weights, daily_returns.mean(), get_covariance(daily_returns, cov_method), confidence)
+    results_frame['Max Drawdown'] = historical_drawdowns(weights, daily_returns)
+    return results_frame
 
-def plot_efficient_frontier(results, weights_record, tickers):
+@perf.timed("portfolio.plot_frontier")
+def plot_efficient_frontier(results, weights_record, tickers, exact=None, save_path=None):
     """
     효율적 투자선 시각화
+    exact: optimizer.optimize_portfolio 결과를 넘기면 정확한 투자선과 최적점을 함께 표시
+    save_path: 지정하면 화면에 띄우지 않고 이미지 파일로 저장
     """
     results_frame = pd.DataFrame(results.T, columns=['Return', 'Volatility', 'Sharpe'])
     
@@ -99,8 +130,19 @@ def plot_efficient_frontier(results, weights_record, tickers):
     print("\n[가장 안전한 포트폴리오 (Min Volatility)]")
     print(f"   - 리스크(변동성): {min_vol_port['Volatility']*100:.2f}%")
     
+    if exact is not None:
+        best = exact['max_sharpe']
+        print("\n[정확한 해 (Max Sharpe, QP)]")
+        print(f"   - 기대 수익률: {best['Return']*100:.2f}%")
+        print(f"   - 리스크(변동성): {best['Volatility']*100:.2f}%")
+        print(f"   - 샤프 지수: {best['Sharpe']:.2f}")
+        for ticker, weight in best['weights'].items():
+            print(f"     {ticker}: {weight*100:.2f}%")
+        print(f"\n[정확한 해 (Min Volatility, QP)] 리스크(변동성): {exact['min_volatility']['Volatility']*100:.2f}%")
+    
     # 시각화
-    plt.figure(figsize=(12, 8))
+    plt = pyplot()
+    fig = plt.figure(figsize=(12, 8))
     
     # 산점도 (모든 시뮬레이션 결과)
     plt.scatter(results_frame.Volatility, results_frame.Return, c=results_frame.Sharpe, cmap='viridis', alpha=0.5, s=10)
@@ -112,25 +154,42 @@ def plot_efficient_frontier(results, weights_record, tickers):
     # Min Volatility (파란 별)
     plt.scatter(min_vol_port['Volatility'], min_vol_port['Return'], marker='*', color='blue', s=300, label='Min Volatility (Safe)')
 
+    # 정확한 효율적 투자선 (선) + 정확한 최적점 (다이아몬드)
+    if exact is not None:
+        frontier = exact['frontier']
+        plt.plot(frontier['Volatility'], frontier['Return'], color='black', linewidth=2, label='Efficient Frontier (Exact)')
+        plt.scatter(exact['max_sharpe']['Volatility'], exact['max_sharpe']['Return'], marker='D', color='red', edgecolors='black', s=120, label='Max Sharpe (Exact)')
+        plt.scatter(exact['min_volatility']['Volatility'], exact['min_volatility']['Return'], marker='D', color='blue', edgecolors='black', s=120, label='Min Volatility (Exact)')
+
     plt.title('Efficient Frontier (Portfolio Optimization)')
     plt.xlabel('Risk (Volatility)')
     plt.ylabel('Expected Annual Return')
     plt.legend(labelspacing=1.2)
     plt.grid(True, alpha=0.3)
-    plt.show()
+    show_or_save(fig, save_path)
 
 if __name__ == "__main__":
-    file_path = "data/stock_market_data.csv"
+    file_path = "data/price_store"
     
-    # 1. 데이터 로드
-    df = load_data(file_path)
+    # 1. 데이터 로드 (가격 + 미리 계산된 수익률)
+    panel = get_panel(file_path)
     
-    if df is not None:
+    if panel is not None:
+        df = panel['prices']
         tickers = df.columns
         print(f"분석 대상 종목: {list(tickers)}")
         
         # 2. 시뮬레이션 실행 (10,000번)
-        results, weights = run_monte_carlo_simulation(df, num_simulations=10000)
+        results, weights = run_monte_carlo_simulation(df, num_simulations=10000, daily_returns=panel['returns'])
+        
+        # 3. 후보별 리스크 (VaR / CVaR / 최대 낙폭)
+        risk_frame = add_risk_metrics(results, weights, panel['returns'])
+        print("\n[CVaR(95%)가 가장 낮은 포트폴리오]")
+        print(risk_frame.loc[risk_frame['Hist CVaR'].idxmin()].round(4))
+        
+        # 4. 정확한 최적해 (이차계획법) - 랜덤 샘플과 비교
+        from optimizer import optimize_portfolio
+        exact = optimize_portfolio(panel['returns'])
         
-        # 3. 결과 분석 및 시각화
-        plot_efficient_frontier(results, weights, tickers)
\ No newline at end of file
+        # 5. 결과 분석 및 시각화
+        plot_efficient_frontier(results, weights, tickers, exact=exact)
\ No newline at end of file
@@ -0,0 +1,292 @@
+import numpy as np
+import pandas as pd
+import hashlib
+import json
+import os
+import re
+
+import perf
+
+# 기본 저장소 위치 (CSV 대신 사용하는 바이너리 컬럼형 저장소)
+STORE_DIR = "data/price_store"
+INDEX_FILE = "index.json"
+
+# 저장하는 가격 필드 (yfinance OHLCV 순서)
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+# 여러 종목을 읽을 때 날짜 합집합을 한 번에 구하는 종목 수
+UNION_CHUNK = 256
+
+# 이 일수(달력 기준)보다 긴 빈 구간은 '중간에 빠진 구간'으로 봄 (연휴보다 길게)
+MAX_GAP_DAYS = 10
+
+# 날짜는 1970-01-01 기준 '일(day)' 수로 저장 (float64로 정확히 표현 가능)
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+def _dates_to_days(dates):
+    """DatetimeIndex -> 1970-01-01 기준 일수 (float64)"""
+    days = pd.DatetimeIndex(dates).values.astype("datetime64[D]")
+    return (days - _EPOCH).astype(np.int64).astype(np.float64)
+
+
+def _days_to_dates(days):
+    """일수 배열 -> DatetimeIndex"""
+    return pd.DatetimeIndex(_EPOCH + np.asarray(days, dtype=np.int64), name="Date")
+
+
+def _to_days(date):
+    """'2020-01-01' 같은 단일 날짜 -> 일수"""
+    return float((np.datetime64(pd.Timestamp(date).date(), "D") - _EPOCH).astype(np.int64))
+
+
+def _file_name(ticker):
+    """종목 코드를 안전한 파일명으로 변환 (^GSPC -> _GSPC.npy)"""
+    return re.sub(r"[^\w.-]", "_", ticker) + ".npy"
+
+
+def is_store(path):
+    """경로가 가격 저장소(index.json 포함 폴더)인지 확인"""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, INDEX_FILE))
+
+
+def read_index(store_dir=STORE_DIR):
+    """저장소 인덱스(종목별 파일명, 기간, 해시)를 읽어옵니다."""
+    index_path = os.path.join(store_dir, INDEX_FILE)
+    if not os.path.exists(index_path):
+        return {"fields": list(FIELDS), "tickers": {}}
+    with open(index_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_index(store_dir, index):
+    """인덱스를 임시 파일에 쓴 뒤 교체 (중간에 끊겨도 깨지지 않도록)"""
+    os.makedirs(store_dir, exist_ok=True)
+    index_path = os.path.join(store_dir, INDEX_FILE)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, index_path)
+
+
+def list_tickers(store_dir=STORE_DIR):
+    """저장소에 들어있는 종목 리스트"""
+    return sorted(read_index(store_dir)["tickers"])
+
+
+def _write_ticker_array(store_dir, ticker, frame):
+    """
+    한 종목의 OHLCV를 (1 + 필드 수, 행 수) 배열로 저장합니다.
+    0번 행은 날짜, 나머지는 필드별 행이라 필드 하나만 읽을 때 그 바이트만 읽습니다.
+    """
+    frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+    arr = np.full((1 + len(FIELDS), len(frame)), np.nan)
+    arr[0] = _dates_to_days(frame.index)
+    for i, field in enumerate(FIELDS, start=1):
+        if field in frame.columns:
+            arr[i] = frame[field].to_numpy(dtype=np.float64)
+
+    file_name = _file_name(ticker)
+    path = os.path.join(store_dir, file_name)
+    # np.save는 확장자가 없으면 .npy를 붙이므로 임시 파일도 .npy로 끝나게 함
+    tmp_path = path[:-len(".npy")] + ".tmp.npy"
+    np.save(tmp_path, arr)
+    os.replace(tmp_path, path)
+
+    return {
+        "file": file_name,
+        "rows": int(len(frame)),
+        "start": str(frame.index.min().date()) if len(frame) else None,
+        "end": str(frame.index.max().date()) if len(frame) else None,
+        # 데이터 내용 해시 (캐시/증분 계산 시 변경 여부 판단용)
+        "hash": hashlib.sha1(arr.tobytes()).hexdigest(),
+    }
+
+
+def _split_by_ticker(df, ticker=None):
+    """
+    yfinance 결과를 {종목: 날짜 x 필드 DataFrame} 으로 나눕니다.
+    Long Format('Ticker' 컬럼), Multi-index 컬럼, 단일 종목 모두 처리.
+    """
+    if "Ticker" in df.columns:
+        return {t: g.drop(columns="Ticker") for t, g in df.groupby("Ticker", sort=False)}
+    if isinstance(df.columns, pd.MultiIndex):
+        stacked = df.stack(level=1).rename_axis(["Date", "Ticker"]).reset_index(level=1)
+        return _split_by_ticker(stacked.dropna(how="all", subset=[c for c in FIELDS if c in stacked.columns]))
+    if ticker is None:
+        raise ValueError("단일 종목 데이터는 ticker 이름이 필요합니다.")
+    return {ticker: df}
+
+
+def _read_ticker_frame(store_dir, entry):
+    """저장된 종목 배열 전체를 날짜 x 필드 DataFrame으로 읽어옵니다."""
+    arr = _open_ticker(store_dir, entry)
+    return pd.DataFrame(np.array(arr[1:]).T, index=_days_to_dates(arr[0]), columns=FIELDS)
+
+
+def save_prices(df, store_dir=STORE_DIR, ticker=None, merge=False, index=None):
+    """
+    주가 데이터를 저장소에 씁니다.
+    merge=False: 종목별로 덮어쓰기 / merge=True: 기존 데이터와 합친 뒤 날짜 중복 제거 (새 데이터 우선)
+    index: read_index 결과를 주면 그 dict만 갱신하고 index.json은 쓰지 않음
+           (여러 번 나눠 저장할 때 마지막에 write_index로 한 번만 기록)
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    write = index is None
+    if write:
+        index = read_index(store_dir)
+
+    for name, frame in _split_by_ticker(df, ticker).items():
+        frame = frame.copy()
+        frame.index = pd.to_datetime(frame.index)
+
+        old_entry = index["tickers"].get(name, {})
+        if merge and old_entry:
+            frame = pd.concat([_read_ticker_frame(store_dir, old_entry), frame.reindex(columns=FIELDS)])
+
+        entry = _write_ticker_array(store_dir, name, frame)
+        # 합치는 경우 수집 완료 구간(coverage) 정보는 유지
+        for key in ("covered_start", "covered_end"):
+            if merge and key in old_entry:
+                entry[key] = old_entry[key]
+        index["tickers"][name] = entry
+
+    if write:
+        write_index(store_dir, index)
+    return index
+
+
+def update_coverage(store_dir, tickers, start_date, end_date, index=None):
+    """
+    종목별 '수집 완료 구간'을 [start_date, end_date) 만큼 넓혀서 기록합니다.
+    상장 전 기간처럼 데이터가 원래 없는 구간을 매번 다시 요청하지 않기 위해 사용합니다.
+    index: save_prices와 같음 (주면 dict만 갱신, index.json은 호출한 쪽에서 write_index)
+    """
+    write = index is None
+    if write:
+        index = read_index(store_dir)
+    start = str(pd.Timestamp(start_date).date())
+    end = str(pd.Timestamp(end_date).date())
+
+    for ticker in tickers:
+        entry = index["tickers"].get(ticker)
+        if entry is None:
+            continue
+        entry["covered_start"] = min(start, entry.get("covered_start", start))
+        entry["covered_end"] = max(end, entry.get("covered_end", end))
+
+    if write:
+        write_index(store_dir, index)
+
+
+def find_internal_gaps(store_dir, ticker, max_gap_days=MAX_GAP_DAYS):
+    """
+    저장된 데이터 안에서 max_gap_days(달력 기준)보다 긴 빈 구간을 찾습니다.
+    반환: [(빈 구간 시작일, 빈 구간 끝 다음날), ...]
+    """
+    entry = read_index(store_dir)["tickers"].get(ticker)
+    if entry is None or entry["rows"] < 2:
+        return []
+
+    days = np.asarray(_open_ticker(store_dir, entry)[0])
+    gap_pos = np.nonzero(np.diff(days) > max_gap_days)[0]
+    dates = _days_to_dates(days)
+    return [(dates[i] + pd.Timedelta(days=1), dates[i + 1]) for i in gap_pos]
+
+
+def _open_ticker(store_dir, entry):
+    """종목 파일을 메모리 맵으로 엽니다. (실제 읽기는 슬라이싱할 때 발생)"""
+    return np.load(os.path.join(store_dir, entry["file"]), mmap_mode="r")
+
+
+def _date_slice(days, start, end):
+    """정렬된 날짜 배열에서 [start, end] 구간의 슬라이스"""
+    lo = 0 if start is None else int(np.searchsorted(days, _to_days(start), side="left"))
+    hi = len(days) if end is None else int(np.searchsorted(days, _to_days(end), side="right"))
+    return slice(lo, hi)
+
+
+@perf.timed("price_store.load_ticker")
+def load_ticker(store_dir, ticker, fields=None, start=None, end=None):
+    """
+    특정 종목의 데이터만 읽어옵니다. (필요한 필드 행만 디스크에서 읽음)
+    """
+    index = read_index(store_dir)
+    entry = index["tickers"].get(ticker)
+    if entry is None:
+        print(f"저장소에 없는 종목: {ticker}")
+        return None
+
+    fields = list(FIELDS) if fields is None else list(fields)
+    arr = _open_ticker(store_dir, entry)
+    rows = _date_slice(arr[0], start, end)
+
+    data = {field: np.array(arr[1 + FIELDS.index(field), rows]) for field in fields}
+    df = pd.DataFrame(data, index=_days_to_dates(arr[0, rows]))
+    df["Ticker"] = ticker
+    return df
+
+
+def load_arrays(store_dir=STORE_DIR, field="Close", tickers=None, start=None, end=None, dtype=np.float64):
+    """
+    여러 종목의 한 필드를 (종목 x 날짜) 배열 하나로 읽어옵니다. (결측은 NaN)
+    날짜 합집합을 먼저 구한 뒤 종목별 값을 결과 배열에 바로 써서, 중간 복사본 없이
+    결과 크기(종목 수 x 날짜 수 x dtype)만큼만 메모리를 씁니다.
+    반환: (values, days, tickers) - days는 1970-01-01 기준 일수 (int64)
+    """
+    index = read_index(store_dir)
+    if tickers is None:
+        tickers = sorted(index["tickers"])
+    else:
+        missing = [t for t in tickers if t not in index["tickers"]]
+        if missing:
+            print(f"저장소에 없는 종목은 제외합니다: {missing}")
+        tickers = [t for t in tickers if t in index["tickers"]]
+
+    # 1. 날짜 합집합 (날짜 행만 읽음, 종목 수천 개의 날짜를 한 번에 이어 붙이지 않도록 묶음 단위로 합침)
+    arrays = [_open_ticker(store_dir, index["tickers"][t]) for t in tickers]
+    slices = [_date_slice(arr[0], start, end) for arr in arrays]
+    all_days = np.array([])
+    for i in range(0, len(arrays), UNION_CHUNK):
+        chunk = [arr[0, rows] for arr, rows in zip(arrays[i:i + UNION_CHUNK], slices[i:i + UNION_CHUNK])]
+        all_days = np.union1d(all_days, np.concatenate(chunk))
+
+    # 2. 종목별 값을 제자리에 배치
+    row = 1 + FIELDS.index(field)
+    values = np.full((len(tickers), len(all_days)), np.nan, dtype=dtype)
+    for j, (arr, rows) in enumerate(zip(arrays, slices)):
+        values[j, np.searchsorted(all_days, arr[0, rows])] = arr[row, rows]
+
+    return values, all_days.astype(np.int64), tickers
+
+
+@perf.timed("price_store.load_panel")
+def load_panel(store_dir=STORE_DIR, field="Close", tickers=None, start=None, end=None):
+    """
+    여러 종목의 한 필드를 Wide Format(날짜 x 종목)으로 읽어옵니다.
+    CSV read + pivot 대신 종목별 배열을 날짜 합집합 위에 바로 배치합니다.
+    """
+    values, days, tickers = load_arrays(store_dir, field, tickers, start, end)
+    # (종목 x 날짜) 배열의 전치 뷰를 그대로 사용 (복사 없음)
+    return pd.DataFrame(values.T, index=_days_to_dates(days),
+                        columns=pd.Index(tickers, name="Ticker"), copy=False)
+
+
+def convert_csv(csv_path, store_dir=STORE_DIR):
+    """
+    기존 data/stock_market_data.csv (Long Format)를 저장소로 변환합니다.
+    """
+    df = pd.read_csv(csv_path)
+    df["Date"] = pd.to_datetime(df["Date"])
+    df.set_index("Date", inplace=True)
+    return save_prices(df, store_dir)
+
+
+if __name__ == "__main__":
+    csv_path = "data/stock_market_data.csv"
+
+    if os.path.exists(csv_path):
+        index = convert_csv(csv_path)
+        print(f"저장소 변환 완료: {STORE_DIR} ({len(index['tickers'])}개 종목)")
+    else:
+        print(f"변환할 CSV 파일이 없습니다: {csv_path}")
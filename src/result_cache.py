@@ -0,0 +1,199 @@
+import hashlib
+import io
+import json
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+
+import perf
+
+# 디스크 캐시 위치 (세션 / 서버 재시작과 관계없이 공유)
+CACHE_DIR = "data/cache/results"
+
+# 메모리 / 디스크 캐시 크기 상한 (바이트)
+MEMORY_LIMIT = 256 * 1024 * 1024
+DISK_LIMIT = 1024 * 1024 * 1024
+
+# 프로세스 내 LRU: 키 -> (값, 크기). 스트림릿은 세션마다 스레드를 쓰므로 모든 사용자가 공유
+_MEMORY_CACHE = OrderedDict()
+_memory_size = 0
+_lock = threading.Lock()
+# 같은 키를 여러 세션이 동시에 요청하면 한 번만 계산하도록 키별 잠금: 키 -> [잠금, 기다리는 스레드 수]
+# (마지막 스레드가 나갈 때만 지움 - 먼저 지우면 새로 온 스레드가 다른 잠금으로 같이 계산함)
+_key_locks = {}
+# 적중 / 미스 / 제거 횟수 (여러 세션 스레드가 함께 갱신하므로 _lock 안에서만 수정)
+_stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+
+def make_key(name, tickers=(), params=None, seed=None, version=None):
+    """
+    캐시 키: (결과 이름, 선택 종목, 파라미터, 시드, 데이터 버전)의 해시
+    종목 순서는 결과(열 순서)에 영향을 주므로 그대로 사용합니다.
+    """
+    payload = json.dumps([name, list(tickers), params or {}, seed, version],
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return f"{name}-{hashlib.sha1(payload.encode()).hexdigest()}"
+
+
+def _estimate_size(value):
+    """
+    메모리 캐시 항목 크기 추정 (바이트) - 메모리에만 둘 때는 pickle로 직렬화하지 않음
+    DataFrame / Series는 memory_usage(deep=True), 배열은 nbytes, dict / list / tuple은 원소 합계
+    """
+    if hasattr(value, "memory_usage"):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _memory_get(key):
+    """메모리 캐시 조회 (찾으면 가장 최근 사용으로 이동 + 적중 횟수 증가)"""
+    with _lock:
+        if key in _MEMORY_CACHE:
+            _MEMORY_CACHE.move_to_end(key)
+            _stats["hits"] += 1
+            return True, _MEMORY_CACHE[key][0]
+    return False, None
+
+
+def _memory_put(key, value, size, limit):
+    """메모리 캐시 저장 후 크기 상한을 넘으면 오래 안 쓴 것부터 제거"""
+    global _memory_size
+    if size > limit:
+        return
+    with _lock:
+        if key in _MEMORY_CACHE:
+            _memory_size -= _MEMORY_CACHE.pop(key)[1]
+        _MEMORY_CACHE[key] = (value, size)
+        _memory_size += size
+        while _memory_size > limit and _MEMORY_CACHE:
+            _memory_size -= _MEMORY_CACHE.popitem(last=False)[1][1]
+            _stats["evictions"] += 1
+
+
+def _disk_path(cache_dir, key):
+    return os.path.join(cache_dir, key + ".pkl")
+
+
+def _disk_get(cache_dir, key):
+    """디스크 캐시 조회 (읽으면 수정 시각을 갱신해서 LRU 순서로 사용)"""
+    path = _disk_path(cache_dir, key)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)
+    except OSError:
+        return False, None, None
+    try:
+        return True, pickle.loads(data), data
+    except Exception:
+        # 깨진 파일 (예: 다른 버전에서 저장) -> 없는 것으로 처리
+        return False, None, None
+
+
+def _disk_put(cache_dir, key, data, limit):
+    """디스크 캐시 저장 (임시 파일 -> 원자적 교체) 후 크기 상한을 넘으면 오래된 파일부터 삭제"""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _disk_path(cache_dir, key)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".pkl"):
+            try:
+                stat = os.stat(os.path.join(cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, name))
+        except OSError:
+            pass
+        total -= size
+
+
+def cached(name, compute, tickers=(), params=None, seed=None, version=None,
+           disk=True, cache_dir=CACHE_DIR, memory_limit=MEMORY_LIMIT, disk_limit=DISK_LIMIT):
+    """
+    파생 결과(수익률, 상관계수, 최적화 결과, 그림 등)를 캐시에서 꺼내거나 compute()로 새로 계산합니다.
+    1. 메모리 LRU (프로세스 안의 모든 세션 공유)  2. 디스크 (disk=True일 때, 서버 재시작 후에도 유지)
+    데이터 버전(get_panel의 "version")이 키에 들어가므로 데이터가 바뀌면 자동으로 새로 계산됩니다.
+    """
+    key = make_key(name, tickers, params, seed, version)
+    found, value = _memory_get(key)
+    if found:
+        return value
+
+    with _lock:
+        entry = _key_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            # 기다리는 동안 다른 세션이 계산했을 수 있음
+            found, value = _memory_get(key)
+            if found:
+                return value
+
+            data = None
+            if disk and cache_dir:
+                found, value, data = _disk_get(cache_dir, key)
+            with _lock:
+                _stats["disk_hits" if found else "misses"] += 1
+            if not found:
+                value = compute()
+                # 디스크에 쓸 때만 직렬화 (디스크에서 읽은 값은 읽은 바이트 수를 그대로 크기로)
+                if disk and cache_dir:
+                    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                    _disk_put(cache_dir, key, data, disk_limit)
+
+            _memory_put(key, value, len(data) if data is not None else _estimate_size(value), memory_limit)
+    finally:
+        with _lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                _key_locks.pop(key, None)
+    return value
+
+
+@perf.timed("render.figure_png")
+def figure_png(fig, dpi=100):
+    """matplotlib 그림을 PNG 바이트로 (그림 대신 렌더링 결과를 캐시하고 바로 닫음)"""
+    from plotting import pyplot
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    pyplot().close(fig)
+    return buffer.getvalue()
+
+
+def cache_stats():
+    """캐시 상태 (적중 / 디스크 적중 / 미스 / 제거 횟수, 메모리 항목 수, 메모리 사용량)"""
+    with _lock:
+        return dict(_stats, entries=len(_MEMORY_CACHE), memory_bytes=_memory_size)
+
+
+def clear_cache(cache_dir=None):
+    """메모리 캐시 비우기 (cache_dir를 주면 디스크 캐시 파일도 삭제)"""
+    global _memory_size
+    with _lock:
+        _MEMORY_CACHE.clear()
+        _memory_size = 0
+    if cache_dir and os.path.isdir(cache_dir):
+        for name in os.listdir(cache_dir):
+            if name.endswith(".pkl"):
+                os.remove(os.path.join(cache_dir, name))
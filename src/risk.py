@@ -0,0 +1,213 @@
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+
+import perf
+from panel import get_panel
+
+# 기본 설정: 95% 신뢰수준, 1일 보유기간
+CONFIDENCE = 0.95
+TRADING_DAYS = 252
+
+# 한 번에 만드는 (날짜/경로 x 후보) 임시 배열의 원소 수 상한 (float64 기준 약 256MB)
+MAX_ELEMENTS = 32 * 1024 * 1024
+
+
+def _as_weights(weights):
+    """비중을 (후보 수 x 종목 수) 2차원 배열로 (비중 하나면 1행)"""
+    w = np.asarray(weights, dtype=np.float64)
+    return w[None, :] if w.ndim == 1 else w
+
+
+def _complete_returns(daily_returns):
+    """모든 종목 값이 있는 날만 남긴 수익률 배열 (날짜 x 종목)"""
+    values = np.asarray(daily_returns, dtype=np.float64)
+    return values[~np.isnan(values).any(axis=1)]
+
+
+def _tail_size(num_obs, confidence):
+    """하위 (1 - 신뢰수준) 꼬리에 들어가는 관측치 수 (최소 1개)"""
+    return max(1, int(np.ceil((1.0 - confidence) * num_obs - 1e-9)))
+
+
+def _tail_risk(returns, confidence):
+    """
+    (관측치 x 후보) 수익률에서 후보별 VaR / CVaR (손실을 양수로)
+    전체 정렬 대신 np.partition으로 하위 꼬리만 골라냅니다. (O(관측치 수))
+    """
+    m = _tail_size(returns.shape[0], confidence)
+    tail = np.partition(returns, m - 1, axis=0)[:m]
+    return -tail.max(axis=0), -tail.mean(axis=0)
+
+
+def _horizon_returns(port, horizon):
+    """일별 포트폴리오 수익률 -> 겹치는 horizon일 누적 수익률 (로그 누적합의 차이)"""
+    if horizon == 1:
+        return port
+    csum = np.zeros((port.shape[0] + 1, port.shape[1]))
+    np.cumsum(np.log1p(port), axis=0, out=csum[1:])
+    return np.expm1(csum[horizon:] - csum[:-horizon])
+
+
+def historical_var_cvar(weights, daily_returns, confidence=CONFIDENCE, horizon=1):
+    """
+    과거 수익률 기반(Historical Simulation) VaR / CVaR
+    후보 비중 행렬 전체를 (날짜 x 종목) @ (종목 x 후보) 행렬곱 한 번으로 포트폴리오 수익률로 바꾼 뒤
+    후보별 하위 꼬리를 구합니다. 후보가 많으면 메모리 상한 안에서 후보를 나눠 계산합니다.
+
+    weights: (후보 수 x 종목 수) 또는 비중 하나, horizon: 보유기간(일, 겹치는 구간 사용)
+    반환: (VaR, CVaR) - 각각 (후보 수,) 배열, 손실률(양수)
+    """
+    w = _as_weights(weights)
+    values = _complete_returns(daily_returns)
+    chunk = max(1, MAX_ELEMENTS // max(1, values.shape[0]))
+
+    var = np.empty(len(w))
+    cvar = np.empty(len(w))
+    for start in range(0, len(w), chunk):
+        stop = min(start + chunk, len(w))
+        port = _horizon_returns(values @ w[start:stop].T, horizon)
+        var[start:stop], cvar[start:stop] = _tail_risk(port, confidence)
+    return var, cvar
+
+
+def parametric_var_cvar(weights, mean_daily_returns, cov_matrix, confidence=CONFIDENCE, horizon=1):
+    """
+    정규분포 가정(분산-공분산 방식) VaR / CVaR
+    후보별 평균 / 표준편차는 행렬곱과 이차형식(einsum)으로 한 번에 계산합니다.
+    반환: (VaR, CVaR) - 각각 (후보 수,) 배열, 손실률(양수)
+    """
+    w = _as_weights(weights)
+    mu = np.asarray(mean_daily_returns, dtype=np.float64)
+    cov = np.asarray(cov_matrix, dtype=np.float64)
+
+    port_mean = (w @ mu) * horizon
+    port_std = np.sqrt(np.maximum(np.einsum('ij,ij->i', w @ cov, w), 0.0) * horizon)
+    # 표준정규 분위수 / 밀도 (표준 라이브러리 statistics - scipy 없이)
+    z = NormalDist().inv_cdf(1.0 - confidence)
+    var = -(port_mean + z * port_std)
+    cvar = -(port_mean - port_std * NormalDist().pdf(z) / (1.0 - confidence))
+    return var, cvar
+
+
+def _max_drawdown(port):
+    """(기간 x ... ) 수익률의 최대 낙폭 (시작 자산 1을 첫 고점으로 포함, 손실을 양수로)"""
+    wealth = np.cumprod(1.0 + port, axis=0)
+    peak = np.maximum(np.maximum.accumulate(wealth, axis=0), 1.0)
+    return -(wealth / peak - 1.0).min(axis=0)
+
+
+def historical_drawdowns(weights, daily_returns):
+    """후보별 과거 최대 낙폭 (후보 수,) - 리밸런싱 없이 일별 비중 유지 가정"""
+    w = _as_weights(weights)
+    values = _complete_returns(daily_returns)
+    chunk = max(1, MAX_ELEMENTS // max(1, values.shape[0]))
+    return np.concatenate([_max_drawdown(values @ w[s:s + chunk].T) for s in range(0, len(w), chunk)])
+
+
+def _cholesky(cov):
+    """공분산의 Cholesky 인자 (양의 준정부호라 실패하면 고유값 분해로 대신)"""
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        eigval, eigvec = np.linalg.eigh(cov)
+        return eigvec * np.sqrt(np.maximum(eigval, 0.0))
+
+
+def simulate_paths(mean_daily_returns, cov_matrix, num_paths, horizon=TRADING_DAYS, chunk_size=None, seed=None):
+    """
+    상관관계가 있는 일별 수익률 경로를 chunk_size개씩 만들어 내는 제너레이터
+    r = μ + L z  (L: cov_matrix의 Cholesky 인자, z: 표준정규)
+    같은 seed면 chunk_size와 관계없이 같은 경로가 나옵니다. (난수를 경로 순서대로 뽑음)
+    반환: (경로 수 x horizon x 종목 수) 배열 조각
+    """
+    rng = np.random.default_rng(seed)
+    mu = np.asarray(mean_daily_returns, dtype=np.float64)
+    factor = _cholesky(np.asarray(cov_matrix, dtype=np.float64))
+    if chunk_size is None:
+        chunk_size = max(1, MAX_ELEMENTS // (horizon * len(mu)))
+
+    for start in range(0, num_paths, chunk_size):
+        size = min(chunk_size, num_paths - start)
+        paths = rng.standard_normal((size, horizon, len(mu))) @ factor.T
+        paths += mu
+        yield paths
+
+
+def simulate_risk(weights, mean_daily_returns, cov_matrix, num_paths=10000, horizon=TRADING_DAYS,
+                  chunk_size=None, seed=None, dtype=np.float64):
+    """
+    후보 비중 전체에 대해 같은 시뮬레이션 경로로 기간 수익률 / 최대 낙폭 분포를 구합니다.
+    경로는 chunk_size개씩 만들고 바로 후보별 결과만 남기므로 메모리는 chunk_size에 비례합니다.
+
+    반환: {"terminal": (경로 수 x 후보 수) 기간 수익률, "max_drawdown": (경로 수 x 후보 수) 최대 낙폭}
+    """
+    w = _as_weights(weights)
+    num_assets = w.shape[1]
+    if chunk_size is None:
+        chunk_size = max(1, MAX_ELEMENTS // (horizon * max(num_assets, len(w))))
+
+    terminal = np.empty((num_paths, len(w)), dtype=dtype)
+    drawdown = np.empty((num_paths, len(w)), dtype=dtype)
+    start = 0
+    for paths in simulate_paths(mean_daily_returns, cov_matrix, num_paths, horizon, chunk_size, seed):
+        # (경로 x 기간 x 종목) @ (종목 x 후보) -> 기간 축이 앞으로 오도록 (기간 x 경로 x 후보)
+        port = np.einsum('pta,ka->tpk', paths, w, optimize=True)
+        stop = start + len(paths)
+        terminal[start:stop] = np.prod(1.0 + port, axis=0) - 1.0
+        drawdown[start:stop] = _max_drawdown(port)
+        start = stop
+    return {"terminal": terminal, "max_drawdown": drawdown}
+
+
+@perf.timed("risk.risk_table", data="daily_returns", record=("num_paths",))
+def risk_table(weights, daily_returns, confidence=CONFIDENCE, horizon=1, names=None,
+               num_paths=0, path_horizon=TRADING_DAYS, seed=None, cov_matrix=None):
+    """
+    후보 비중별 리스크 요약표
+    - Hist/Param VaR, CVaR: horizon일 기준 손실률
+    - Max Drawdown: 과거 최대 낙폭
+    - names: 행 이름 (후보 이름 목록)
+    - num_paths > 0이면 시뮬레이션 경로로 1년(path_horizon일) VaR와 낙폭 분포(중앙값, 95% 분위)도 계산
+    - cov_matrix: 정규분포 VaR / 시뮬레이션에 쓸 공분산 (최적화와 같은 추정치를 넘김, 없으면 표본 공분산)
+    """
+    w = _as_weights(weights)
+    values = _complete_returns(daily_returns)
+    mu = values.mean(axis=0)
+    if cov_matrix is None:
+        cov = np.cov(values, rowvar=False).reshape(w.shape[1], w.shape[1])
+    else:
+        cov = np.asarray(cov_matrix, dtype=np.float64)
+
+    table = pd.DataFrame(index=pd.Index(names) if names is not None else pd.RangeIndex(len(w)))
+    table["Hist VaR"], table["Hist CVaR"] = historical_var_cvar(w, values, confidence, horizon)
+    table["Param VaR"], table["Param CVaR"] = parametric_var_cvar(w, mu, cov, confidence, horizon)
+    table["Max Drawdown"] = historical_drawdowns(w, values)
+
+    if num_paths:
+        sim = simulate_risk(w, mu, cov, num_paths, path_horizon, seed=seed)
+        table["Sim VaR"], table["Sim CVaR"] = _tail_risk(sim["terminal"], confidence)
+        table["Sim MDD (median)"] = np.median(sim["max_drawdown"], axis=0)
+        table["Sim MDD (95%)"] = np.quantile(sim["max_drawdown"], confidence, axis=0)
+    return table
+
+
+if __name__ == "__main__":
+    file_path = "data/price_store"
+    panel = get_panel(file_path)
+
+    if panel is not None:
+        returns = panel['returns']
+        num_assets = returns.shape[1]
+
+        # 1. 동일 비중 + 랜덤 후보 1,000개의 리스크를 한 번에
+        rng = np.random.default_rng(42)
+        candidates = rng.random((1000, num_assets))
+        candidates /= candidates.sum(axis=1, keepdims=True)
+        candidates[0] = 1.0 / num_assets
+
+        table = risk_table(candidates, returns, num_paths=2000, seed=42)
+        print("\n[동일 비중 포트폴리오 리스크]")
+        print(table.iloc[0].round(4))
+        print("\n[CVaR(95%)가 가장 낮은 후보 5개]")
+        print(table.nsmallest(5, "Hist CVaR").round(4))
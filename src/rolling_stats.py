@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+from compact_panel import as_frame
+from indicators import _prefix_sum, _window_sum
+
+# 기본 롤링 창 (약 3개월 / 6개월 / 1년)
+WINDOWS = (60, 120, 252)
+
+# rolling_correlation 블록 하나의 메모리 한도 (블록 x 종목 x 종목 float64 배열 2개 합계)
+BLOCK_BYTES = 256 * 1024 * 1024
+
+
+def _output_array(shape, dtype, out_path):
+    """결과 배열 (out_path를 주면 디스크 메모리 맵 .npy로 생성)"""
+    if out_path is None:
+        return np.empty(shape, dtype=dtype)
+    return np.lib.format.open_memmap(out_path, mode="w+", dtype=dtype, shape=shape)
+
+
+def rolling_beta(returns_df, market_ticker, window=60, tickers=None, out_path=None, corr_out_path=None,
+                 dtype=np.float64):
+    """
+    모든 종목의 롤링 Beta / 상관계수를 한 번에 계산합니다.
+    시점마다 linregress를 돌리는 대신 누적합(합, 제곱합, 곱의 합)의 차이로
+    창 통계를 구하므로 창 하나당 O(1)입니다. 창 안에 결측이 있으면 NaN.
+
+    반환: (beta, corr) - 각각 (날짜 x 종목) DataFrame
+    out_path / corr_out_path를 주면 beta / 상관계수를 .npy 메모리 맵으로 디스크에 씁니다. (긴 기간용)
+    """
+    returns_df = as_frame(returns_df)
+    if tickers is None:
+        tickers = [t for t in returns_df.columns if t != market_ticker]
+
+    x = returns_df[market_ticker].to_numpy(dtype=np.float64)[:, None]
+    y = returns_df[tickers].to_numpy(dtype=np.float64)
+
+    # 결측 처리: 두 값이 모두 있는 날만 창 통계에 포함
+    valid = ~np.isnan(x) & ~np.isnan(y)
+    # 누적합 오차를 줄이기 위해 평균을 빼고 계산 (Beta/상관계수는 평행이동에 불변)
+    x = np.where(valid, x - np.nanmean(x), 0.0)
+    y = np.where(valid, y - np.nanmean(y, axis=0), 0.0)
+
+    n = _window_sum(_prefix_sum(valid.astype(np.float64)), window)
+    sx = _window_sum(_prefix_sum(x), window)
+    sy = _window_sum(_prefix_sum(y), window)
+    sxx = _window_sum(_prefix_sum(x * x), window)
+    syy = _window_sum(_prefix_sum(y * y), window)
+    sxy = _window_sum(_prefix_sum(x * y), window)
+
+    # 창 안의 공분산 / 분산 (n을 곱한 형태)
+    cov = n * sxy - sx * sy
+    var_x = n * sxx - sx * sx
+    var_y = n * syy - sy * sy
+    incomplete = n != window
+
+    # 결과 배열에 바로 씀 (float64 임시 배열 + astype 복사 없음, var_y는 분모로 재사용)
+    beta = _output_array(y.shape, dtype, out_path)
+    corr = _output_array(y.shape, dtype, corr_out_path)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var_y *= var_x
+        np.sqrt(var_y, out=var_y)
+        np.divide(cov, var_x, out=beta)
+        np.divide(cov, var_y, out=corr)
+    beta[incomplete] = np.nan
+    corr[incomplete] = np.nan
+    for result, path in ((beta, out_path), (corr, corr_out_path)):
+        if path is not None:
+            result.flush()
+
+    index, columns = returns_df.index, pd.Index(tickers, name="Ticker")
+    return (pd.DataFrame(beta, index=index, columns=columns, copy=False),
+            pd.DataFrame(corr, index=index, columns=columns, copy=False))
+
+
+def rolling_betas(returns_df, market_ticker, windows=WINDOWS, tickers=None):
+    """여러 창 길이의 롤링 Beta {창: (날짜 x 종목) DataFrame}"""
+    return {w: rolling_beta(returns_df, market_ticker, w, tickers)[0] for w in windows}
+
+
+def rolling_correlation(returns_df, window=60, tickers=None, out_path=None,
+                        dtype=np.float32, block_size=None):
+    """
+    여러 종목의 롤링 상관계수 행렬 (날짜 x 종목 x 종목)
+    창 합계 S_t = S_(t-1) + x_t x_t' - x_(t-w) x_(t-w)' 를 블록 단위 누적합으로 갱신해
+    한 시점당 O(종목 수^2)만 듭니다. (창 길이와 무관)
+    블록 시작마다 창 합계를 새로 계산해서 누적 오차가 쌓이지 않습니다.
+
+    결과가 크므로 기본 float32, out_path를 주면 .npy 메모리 맵으로 디스크에 씁니다.
+    반환: {"corr": 배열(또는 메모리 맵), "dates": 날짜, "tickers": 종목}
+    """
+    returns_df = as_frame(returns_df)
+    if tickers is None:
+        tickers = list(returns_df.columns)
+    x = returns_df[tickers].to_numpy(dtype=np.float64)
+    num_days, num_assets = x.shape
+
+    # 결측이 있는 날은 모든 쌍에서 제외 (그 날을 포함한 창은 NaN)
+    complete = ~np.isnan(x).any(axis=1)
+    x = np.where(complete[:, None], x - np.nanmean(x, axis=0), 0.0)
+    count = _window_sum(_prefix_sum(complete.astype(np.float64)[:, None]), window)[:, 0]
+
+    corr = _output_array((num_days, num_assets, num_assets), dtype, out_path)
+    corr[:window - 1] = np.nan
+    if block_size is None:
+        # 블록마다 (블록 x 종목 x 종목) float64 배열을 최대 2개 (창 합계 + 임시 외적) 만들므로 합계가 BLOCK_BYTES 이하
+        block_size = max(1, min(num_days, BLOCK_BYTES // (2 * 8 * max(1, num_assets * num_assets))))
+
+    for start in range(window - 1, num_days, block_size):
+        stop = min(start + block_size, num_days)
+
+        # 1. 블록 첫 시점의 창 합계를 직접 계산
+        first = x[start - window + 1:start + 1]
+        s = first.sum(axis=0)
+        ss_block = np.empty((stop - start, num_assets, num_assets))
+        ss_block[0] = first.T @ first
+
+        # 2. 나머지 시점은 들어오는 행 - 나가는 행의 누적합으로 갱신 (같은 배열에서 제자리 계산)
+        enter = x[start + 1:stop]
+        leave = x[start + 1 - window:stop - window]
+        s_block = s + np.concatenate([np.zeros((1, num_assets)), np.cumsum(enter - leave, axis=0)])
+        np.einsum('ti,tj->tij', enter, enter, out=ss_block[1:])
+        ss_block[1:] -= np.einsum('ti,tj->tij', leave, leave)
+        np.cumsum(ss_block, axis=0, out=ss_block)
+
+        # 3. 공분산 -> 상관계수 (ss_block을 그대로 덮어씀)
+        ss_block *= count[start:stop][:, None, None]
+        ss_block -= s_block[:, :, None] * s_block[:, None, :]
+        std = np.sqrt(np.maximum(np.einsum('tii->ti', ss_block), 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ss_block /= std[:, :, None] * std[:, None, :]
+        ss_block[count[start:stop] != window] = np.nan
+        corr[start:stop] = ss_block
+
+    if out_path is not None:
+        corr.flush()
+    return {"corr": corr, "dates": returns_df.index, "tickers": list(tickers)}
+
+
+def pair_series(result, ticker1, ticker2):
+    """rolling_correlation 결과에서 두 종목의 상관계수 시계열만 꺼냅니다."""
+    i, j = result["tickers"].index(ticker1), result["tickers"].index(ticker2)
+    return pd.Series(np.asarray(result["corr"][:, i, j]), index=result["dates"],
+                     name=f"{ticker1} vs {ticker2}")
+
+
+if __name__ == "__main__":
+    file_path = "data/price_store"
+    market_ticker = "^GSPC"
+
+    from panel import get_panel
+    panel = get_panel(file_path)
+    if panel is not None:
+        returns_df = panel['returns']
+
+        # 1. 창 길이별 롤링 Beta (최근 값)
+        for window, beta in rolling_betas(returns_df, market_ticker).items():
+            print(f"\n[롤링 Beta - {window}일] 최근 값")
+            print(beta.iloc[-1].round(3))
+
+        # 2. 롤링 상관계수 (60일)
+        result = rolling_correlation(returns_df, window=60)
+        print("\n[롤링 상관계수 - 60일] 최근 값")
+        print(pd.DataFrame(result["corr"][-1], index=result["tickers"], columns=result["tickers"]).round(2))
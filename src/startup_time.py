@@ -0,0 +1,127 @@
+import ast
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_FILE = os.path.join(os.path.dirname(SRC_DIR), "app.py")
+
+
+def app_imports(app_file=APP_FILE):
+    """app.py가 최상위에서 import하는 모듈 (표준 라이브러리 제외, 함수 안의 지연 import도 제외)"""
+    with open(app_file, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            top = name.split(".")[0]
+            if top not in sys.stdlib_module_names and top not in modules:
+                modules.append(top)
+    return modules
+
+
+# 측정 대상: 새 프로세스에서 처음 import할 때 드는 시간 (콜드 스타트)
+TARGETS = {
+    # app.py가 첫 화면을 그리기 전에 불러오는 모듈 (app.py에서 직접 읽어서 목록이 어긋나지 않게)
+    "dashboard": app_imports(),
+    # 그림 없이 돌리는 배치 분석 (스크립트 / 스케줄러)
+    "pipeline": ["panel", "price_store", "indicators", "rolling_stats", "risk", "backtest",
+                 "portfolio_optimization", "statistical_analysis"],
+}
+
+# 목표 시간 (초) - 넘으면 종료 코드 1
+BUDGETS = {"dashboard": 1.5, "pipeline": 1.0}
+
+# 시작할 때 불러오면 안 되는 무거운 라이브러리 (그림 / 통계가 실제로 필요할 때만)
+HEAVY_MODULES = ("matplotlib", "seaborn", "scipy")
+
+RESULT_FILE = "data/benchmarks/startup_times.jsonl"
+
+_PROBE = """
+import sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+loaded = sorted({{m.split('.')[0] for m in sys.modules}} & set({heavy!r}))
+print(elapsed)
+print(','.join(loaded))
+"""
+
+
+def _parse_importtime(stderr, top=10):
+    """-X importtime 출력에서 누적 시간이 큰 최상위 import 목록 [(모듈, 초)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # 들여쓰기가 없는 줄(공백 한 칸)이 최상위 import
+        if len(name) - len(name.lstrip()) == 1:
+            rows.append((name.strip(), int(cumulative) / 1e6))
+    return sorted(rows, key=lambda r: -r[1])[:top]
+
+
+def measure(modules, repeat=3):
+    """
+    새 파이썬 프로세스에서 modules를 import하는 시간을 repeat번 재서 최솟값을 반환합니다.
+    반환: {"seconds", "heavy_loaded", "top_imports"}
+    """
+    code = _PROBE.format(src=SRC_DIR, imports="\n".join(f"import {m}" for m in modules), heavy=HEAVY_MODULES)
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                              capture_output=True, text=True, check=True)
+        elapsed, loaded = proc.stdout.splitlines()[-2:]
+        seconds = float(elapsed)
+        if best is None or seconds < best["seconds"]:
+            best = {"seconds": seconds,
+                    "heavy_loaded": [m for m in loaded.split(",") if m],
+                    "top_imports": _parse_importtime(proc.stderr)}
+    return best
+
+
+def check_startup(targets=TARGETS, budgets=BUDGETS, repeat=3, result_file=RESULT_FILE):
+    """
+    대상별 시작 시간을 재고 목표와 비교합니다. result_file에 한 줄씩 기록해서 추이를 볼 수 있습니다.
+    반환: 모두 목표 안이고 무거운 라이브러리를 불러오지 않았으면 True
+    """
+    ok = True
+    record = {"time": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0]}
+
+    for name, modules in targets.items():
+        result = measure(modules, repeat)
+        budget = budgets.get(name)
+        passed = (budget is None or result["seconds"] <= budget) and not result["heavy_loaded"]
+        ok = ok and passed
+        record[name] = {"seconds": round(result["seconds"], 4), "budget": budget, "passed": passed,
+                        "heavy_loaded": result["heavy_loaded"]}
+
+        print(f"\n[{name}] {result['seconds']:.3f}초 (목표 {budget}초) -> {'통과' if passed else '초과'}")
+        if result["heavy_loaded"]:
+            print(f"   시작 시 불러온 무거운 라이브러리: {', '.join(result['heavy_loaded'])}")
+        print("   import 시간 상위:")
+        for module, seconds in result["top_imports"][:5]:
+            print(f"     {module}: {seconds:.3f}초")
+
+    if result_file:
+        os.makedirs(os.path.dirname(result_file), exist_ok=True)
+        with open(result_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return ok
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    passed = check_startup()
+    print(f"\n측정 완료 ({time.perf_counter() - start:.1f}초) - {'모두 목표 이내' if passed else '목표 초과 항목 있음'}")
+    sys.exit(0 if passed else 1)
@@ -1,52 +1,41 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
-import os
-
-# 폰트 설정
-import platform
-if platform.system() == 'Darwin':
-    plt.rc('font', family='AppleGothic')
-else:
-    plt.rc('font', family='Malgun Gothic')
-plt.rc('axes', unicode_minus=False)
-
-def load_and_prep_data(filepath):
+import numpy as np
+
+import perf
+from compact_panel import as_frame
+from pairwise import MIN_OVERLAP, pair_moments
+from panel import get_aligned_returns
+from plotting import pyplot, seaborn, show_or_save
+
+def load_and_prep_data(filepath, tickers=None, calendar=None):
     """데이터 로드 및 수익률 변환"""
-    if not os.path.exists(filepath):
-        print("데이터 파일이 없습니다.")
-        return None
-    
-    df = pd.read_csv(filepath)
-    df['Date'] = pd.to_datetime(df['Date'])
-    
-    # Wide Format으로 변환 (날짜 x 종목)
-    if 'Ticker' in df.columns:
-        df = df.pivot(index='Date', columns='Ticker', values='Close')
-    
-    # 결측치 제거
-    df = df.ffill().dropna()
-    
-    # ⭐️ 핵심: 가격(Price) -> 일별 수익률(Daily Returns)로 변환
-    # 로그 수익률을 쓰기도 하지만, 여기선 이해하기 쉬운 퍼센트 수익률 사용
-    returns = df.pct_change().dropna()
-    
-    return returns
+    # 달력을 맞춘 수익률 (결측 유지): 상장일 / 거래소가 다른 종목이 섞여도 기간을 자르지 않고
+    # 베타는 종목과 벤치마크가 둘 다 거래한 날로 계산
+    # (로그 수익률을 쓰기도 하지만, 여기선 이해하기 쉬운 퍼센트 수익률 사용)
+    return get_aligned_returns(filepath, tickers=tickers, calendar=calendar)
 
-def calculate_beta(returns_df, market_ticker, stock_ticker):
+@perf.timed("stats.calculate_beta")
+def calculate_beta(returns_df, market_ticker, stock_ticker, min_periods=MIN_OVERLAP):
     """
     선형 회귀를 통해 Beta와 Alpha를 계산
+    (두 종목 모두 값이 있는 날만 사용, min_periods일보다 적으면 None)
     """
+    returns_df = as_frame(returns_df)
     # 두 종목의 데이터만 추출
     if market_ticker not in returns_df.columns or stock_ticker not in returns_df.columns:
         print(f"데이터 부족: {stock_ticker} 또는 {market_ticker}")
         return None
 
-    x = returns_df[market_ticker] # 시장 (독립변수)
-    y = returns_df[stock_ticker]  # 개별 종목 (종속변수)
+    pair = returns_df[[market_ticker, stock_ticker]].dropna()
+    if len(pair) < max(min_periods, 3):
+        print(f"데이터 부족: {stock_ticker}와 {market_ticker}의 공통 관측일 {len(pair)}일")
+        return None
+
+    x = pair.iloc[:, 0] # 시장 (독립변수)
+    y = pair.iloc[:, 1] # 개별 종목 (종속변수)
 
-    # 선형 회귀 분석 (Linear Regression)
+    # 선형 회귀 분석 (Linear Regression) - scipy는 처음 쓸 때 불러옴 (시작 시간 단축)
+    from scipy import stats
     slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
     
     beta = slope       # 기울기 = 베타
@@ -54,14 +43,80 @@ def calculate_beta(returns_df, market_ticker, stock_ticker):
     
     return beta, alpha, r_value**2
 
-def plot_beta_scatter(returns_df, market_ticker, stock_ticker, beta, alpha):
+@perf.timed("stats.calculate_beta_batch")
+def calculate_beta_batch(returns_df, market_tickers, stock_tickers=None, min_periods=MIN_OVERLAP):
+    """
+    모든 종목의 Beta/Alpha를 한 번에 계산 (종목별 linregress 루프 대신 행렬 연산)
+    market_tickers: 벤치마크 리스트 (예: ["^GSPC", "^KS11"]) - 벤치마크마다 모든 종목을 회귀
+    stock_tickers: 분석할 종목 (None이면 벤치마크를 제외한 전체)
+    (벤치마크, 종목) 쌍마다 둘 다 값이 있는 날만 사용, min_periods일보다 적은 쌍은 NaN
+
+    반환: {"beta", "alpha", "r_squared", "beta_stderr", "alpha_stderr", "p_value", "n_obs":
+           (벤치마크 수 x 종목 수) 배열, "benchmarks": 리스트, "tickers": 리스트}
+    (값은 쌍마다 결측을 뺀 scipy.stats.linregress와 같음)
+    """
+    returns_df = as_frame(returns_df)
+    if isinstance(market_tickers, str):
+        market_tickers = [market_tickers]
+    market_tickers = [t for t in market_tickers if t in returns_df.columns]
+    if stock_tickers is None:
+        stock_tickers = [t for t in returns_df.columns if t not in market_tickers]
+    else:
+        stock_tickers = [t for t in stock_tickers if t in returns_df.columns]
+    if not market_tickers or not stock_tickers:
+        print("데이터 부족: 벤치마크 또는 종목이 없습니다.")
+        return None
+
+    x = returns_df[market_tickers].to_numpy(dtype=np.float64)  # (날짜 x 벤치마크)
+    y = returns_df[stock_tickers].to_numpy(dtype=np.float64)   # (날짜 x 종목)
+
+    # 1. 쌍별 공통 관측일 기준 평균 / 분산 / 공분산 (마스크 행렬 곱, (벤치마크 x 종목))
+    m = pair_moments(x, y)
+    n, sxx, syy, sxy = m["n"], m["sxx"], m["syy"], m["sxy"]
+    x_mean, y_mean = m["x_mean"], m["y_mean"]
+    dof = n - 2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 2. 기울기(Beta), 절편(Alpha), 상관계수
+        beta = sxy / sxx
+        alpha = y_mean - beta * x_mean
+        r = np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0)
+
+        # 3. 표준오차, t-검정 p-value (linregress와 같은 공식)
+        beta_stderr = np.sqrt((1 - r**2) * syy / sxx / dof)
+        alpha_stderr = beta_stderr * np.sqrt(sxx / n + x_mean**2)
+        t_stat = r * np.sqrt(dof / ((1.0 - r) * (1.0 + r)))
+    from scipy import stats
+    p_value = 2 * stats.t.sf(np.abs(t_stat), np.maximum(dof, 1))
+
+    # 4. 공통 관측일이 부족한 쌍은 NaN
+    result = {
+        "beta": beta, "alpha": alpha, "r_squared": r**2,
+        "beta_stderr": beta_stderr, "alpha_stderr": alpha_stderr, "p_value": p_value,
+    }
+    short = n < max(min_periods, 3)
+    for values in result.values():
+        values[short] = np.nan
+    result.update({"n_obs": n.astype(np.int64), "benchmarks": market_tickers, "tickers": stock_tickers})
+    return result
+
+def beta_table(result):
+    """calculate_beta_batch 결과를 (벤치마크, 종목) 행의 표로 정리"""
+    stats_names = ["beta", "alpha", "r_squared", "beta_stderr", "alpha_stderr", "p_value", "n_obs"]
+    index = pd.MultiIndex.from_product([result["benchmarks"], result["tickers"]], names=["Benchmark", "Ticker"])
+    return pd.DataFrame({name: result[name].ravel() for name in stats_names}, index=index)
+
+def plot_beta_scatter(returns_df, market_ticker, stock_ticker, beta, alpha, save_path=None):
     """
     산점도와 회귀선 시각화
+    save_path: 지정하면 화면에 띄우지 않고 이미지 파일로 저장
     """
+    returns_df = as_frame(returns_df)
     x = returns_df[market_ticker]
     y = returns_df[stock_ticker]
 
-    plt.figure(figsize=(10, 6))
+    plt, sns = pyplot(), seaborn()
+    fig = plt.figure(figsize=(10, 6))
     
     # 1. 산점도 (Scatter Plot)
     sns.scatterplot(x=x, y=y, alpha=0.5, label='Daily Returns')
@@ -78,32 +133,38 @@ def plot_beta_scatter(returns_df, market_ticker, stock_ticker, beta, alpha):
     plt.axvline(0, color='black', linestyle='--', linewidth=0.8)
     plt.legend()
     plt.grid(True, alpha=0.3)
-    plt.show()
+    show_or_save(fig, save_path)
 
 if __name__ == "__main__":
-    file_path = "data/stock_market_data.csv"
+    file_path = "data/price_store"
     
     # 벤치마크 지수 (시장 기준)
     market_ticker = "^GSPC" # S&P 500
+    # 추가 벤치마크 (한국 상장 종목용 KOSPI 지수, 데이터에 있을 때만 사용)
+    market_tickers = [market_ticker, "^KS11"]
     
     # 분석할 종목들
     target_tickers = ["AAPL", "005930.KS", "MSFT"]
     
     # 1. 데이터 로드
-    returns_df = load_and_prep_data(file_path)
+    returns_df = load_and_prep_data(file_path, tickers=market_tickers + target_tickers)
     
     if returns_df is not None:
-        print(f"벤치마크 지수: {market_ticker}\n")
+        print(f"벤치마크 지수: {[t for t in market_tickers if t in returns_df.columns]}\n")
         
-        for ticker in target_tickers:
-            if ticker == market_ticker: continue # 자기 자신은 제외
-            
-            # 2. 베타 계산
-            result = calculate_beta(returns_df, market_ticker, ticker)
+        # 2. 베타 계산 (전체 종목 x 전체 벤치마크를 한 번에)
+        batch = calculate_beta_batch(returns_df, market_tickers, target_tickers)
+        
+        if batch:
+            print(beta_table(batch).round(4))
+            print()
             
-            if result:
-                beta, alpha, r_squared = result
-                print(f"[{ticker}] 분석 결과")
+            bench_idx = batch["benchmarks"].index(market_ticker) if market_ticker in batch["benchmarks"] else 0
+            for j, ticker in enumerate(batch["tickers"]):
+                beta = batch["beta"][bench_idx, j]
+                alpha = batch["alpha"][bench_idx, j]
+                r_squared = batch["r_squared"][bench_idx, j]
+                print(f"[{ticker}] 분석 결과 (vs {batch['benchmarks'][bench_idx]})")
                 print(f"   - Beta (민감도)  : {beta:.4f}")
                 print(f"   - Alpha (초과수익): {alpha:.6f}")
                 print(f"   - R-squared (설명력): {r_squared:.4f}")
@@ -115,4 +176,4 @@ if __name__ == "__main__":
                 print("-" * 30)
 
                 # 3. 시각화 (하나씩 팝업 뜸)
-                plot_beta_scatter(returns_df, market_ticker, ticker, beta, alpha)
\ No newline at end of file
+                plot_beta_scatter(returns_df, batch["benchmarks"][bench_idx], ticker, beta, alpha)
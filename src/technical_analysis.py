@@ -1,14 +1,14 @@
 import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
 import os
 
-# 폰트 설정
-import platform
-if platform.system() == 'Darwin':
-    plt.rc('font', family='AppleGothic')
-else:
-    plt.rc('font', family='Malgun Gothic')
-plt.rc('axes', unicode_minus=False)
+import perf
+from compact_panel import CompactPanel
+from decimate import PIXEL_BUDGET, decimate_frame
+from indicators import compute_indicators
+from panel import get_ticker
+from plotting import pyplot, show_or_save
+from price_store import is_store
 
 def load_ticker_data(filepath, ticker):
     """
@@ -18,6 +18,13 @@ def load_ticker_data(filepath, ticker):
         print(f"파일 없음: {filepath}")
         return None
     
+    if is_store(filepath):
+        # 공통 로더의 단일 종목 경로: 해당 종목 파일만 열어서 읽음 (전체 스캔 없음)
+        target_df = get_ticker(filepath, ticker)
+        if target_df is not None:
+            print(f"{ticker} 데이터 로드 완료 ({len(target_df)} rows)")
+        return target_df
+    
     df = pd.read_csv(filepath)
     df['Date'] = pd.to_datetime(df['Date'])
     
@@ -29,10 +36,20 @@ def load_ticker_data(filepath, ticker):
     print(f"{ticker} 데이터 로드 완료 ({len(target_df)} rows)")
     return target_df
 
+@perf.timed("technical.add_indicators")
 def add_technical_indicators(df):
     """
     데이터프레임에 기술적 지표 컬럼을 추가합니다.
+    CompactPanel(여러 종목)을 넘기면 종목별 컬럼 대신 지표마다 같은 dtype의 패널을 반환합니다.
+    ({"Close": 가격 패널, "MA20": ..., "RSI": ...} - float32 패널이면 지표도 float32)
     """
+    if isinstance(df, CompactPanel):
+        indicators = compute_indicators(df.values, dtype=df.dtype)
+        panels = {"Close": df}
+        for name in list(indicators):
+            panels[name] = CompactPanel(np.ascontiguousarray(indicators.pop(name).T), df.days, df.tickers, name)
+        return panels
+
     # 1. 이동평균선 (Moving Average)
     # 20일선(단기 추세), 60일선(중기 추세)
     df['MA20'] = df['Close'].rolling(window=20).mean()
@@ -56,13 +73,21 @@ def add_technical_indicators(df):
 
     return df
 
-def plot_technical_analysis(df, ticker):
+@perf.timed("technical.plot")
+def plot_technical_analysis(df, ticker, days=250, max_points=PIXEL_BUDGET, save_path=None):
     """
     가격, 볼린저 밴드, RSI를 시각화합니다.
+    days: 최근 며칠을 볼지 (None이면 전체), max_points: 그보다 길면 고점/저점을 남기고 줄임 (min/max 버킷)
+    save_path: 지정하면 화면에 띄우지 않고 이미지 파일로 저장
     """
     # 최근 1년치 데이터만 보기 (너무 길면 안 보임)
-    recent_df = df.tail(250)
+    recent_df = df.tail(days) if days else df
+    if max_points:
+        # 밴드 채우기에 같은 날짜가 필요하므로 열 전체를 같은 날짜로 줄임
+        recent_df = decimate_frame(recent_df[['Close', 'MA20', 'MA60', 'Bollinger_Upper', 'Bollinger_Lower', 'RSI']],
+                                   max_points)
 
+    plt = pyplot()
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10), gridspec_kw={'height_ratios': [3, 1]})
     
     # [위쪽 차트] 가격 + 이평선 + 볼린저 밴드
@@ -96,10 +121,10 @@ def plot_technical_analysis(df, ticker):
     ax2.grid(True, alpha=0.3)
 
     plt.tight_layout()
-    plt.show()
+    show_or_save(fig, save_path)
 
 if __name__ == "__main__":
-    file_path = "data/stock_market_data.csv"
+    file_path = "data/price_store"
     
     # 분석할 종목 선택 (삼성전자: 005930.KS, 애플: AAPL 등)
     target_ticker = "005930.KS"  
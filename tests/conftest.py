@@ -0,0 +1,31 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# src/ 모듈은 서로 형제 모듈로 import하므로 테스트에서도 src를 경로에 추가
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+@pytest.fixture
+def returns():
+    """시장 요인이 있는 합성 일별 수익률 (날짜 x 종목, 첫 열이 시장)"""
+    rng = np.random.default_rng(0)
+    market = rng.normal(0.0004, 0.01, 400)
+    betas = rng.uniform(0.5, 1.5, 8)
+    values = 0.0002 + market[:, None] * betas + rng.normal(0, 0.01, (400, 8))
+    index = pd.bdate_range("2020-01-01", periods=400, name="Date")
+    return pd.DataFrame(np.column_stack([market, values]), index=index,
+                        columns=["^GSPC"] + [f"S{i}" for i in range(8)])
+
+
+@pytest.fixture
+def gappy_returns(returns):
+    """상장일이 다른 종목 + 중간 결측이 섞인 수익률"""
+    rng = np.random.default_rng(1)
+    gappy = returns.mask(rng.random(returns.shape) < 0.05)
+    gappy.iloc[:250, 1] = np.nan
+    gappy.iloc[:120, 4] = np.nan
+    return gappy
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from backtest import RESYNC_EVERY, run_backtest
+from covariance import CovarianceEstimator
+
+
+def test_equal_weight_first_period_matches_buy_and_hold(returns):
+    result = run_backtest(returns, "equal", lookback=60, transaction_cost=0.001)
+    weights = result["weights"]
+    np.testing.assert_allclose(weights.to_numpy(), 1.0 / returns.shape[1])
+
+    # 첫 리밸런싱: 현금 -> 동일 비중 (회전율 1), 다음 리밸런싱까지 보유
+    start, end = returns.index.get_indexer(weights.index[:2])
+    assert result["turnover"].iloc[0] == pytest.approx(1.0)
+    growth = (1 + returns.iloc[start:end]).cumprod().to_numpy() @ weights.iloc[0].to_numpy() * (1 - 0.001)
+    expected = growth / np.r_[1.0, growth[:-1]] - 1
+    np.testing.assert_allclose(result["returns"].iloc[:end - start], expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("method", ["min_variance", "max_sharpe"])
+def test_no_lookahead(returns, method):
+    # 리밸런싱 시점 이후의 수익률을 바꿔도 그 시점까지의 비중은 그대로
+    base = run_backtest(returns, method, lookback=60)
+    cut = base["weights"].index[3]
+    changed = returns.copy()
+    changed.loc[changed.index >= cut] *= -3
+    other = run_backtest(changed, method, lookback=60)
+    np.testing.assert_allclose(other["weights"].loc[:cut], base["weights"].loc[:cut], atol=1e-10)
+
+
+def test_max_turnover_limits_trades(returns):
+    result = run_backtest(returns, "max_sharpe", lookback=60, max_turnover=0.2)
+    assert result["turnover"].max() <= 0.2 + 1e-12
+    assert result["weights"].sum(axis=1).max() <= 1 + 1e-9
+
+
+@pytest.mark.parametrize("cov_method", ["sample", "ledoit_wolf", "ewma"])
+def test_window_estimates_match_full_recompute(returns, cov_method):
+    # 증분 갱신한 창 평균 / 공분산 = 창마다 결측 없는 종목으로 새로 계산한 값 (리밸런싱 간격 < 룩백 -> 창이 겹침)
+    data = returns.copy()
+    data.iloc[:150, 2] = np.nan      # 늦게 상장
+    data.iloc[250:270, 5] = np.nan   # 거래 정지
+    seen = []
+
+    def record(mu, cov):
+        seen.append((mu, cov))
+        return np.ones(len(mu))
+
+    result = run_backtest(data, record, lookback=60, rebalance=7, cov_method=cov_method)
+    assert len(seen) == len(result["weights"]) > RESYNC_EVERY
+    for (mu, cov), date in zip(seen, result["weights"].index):
+        pos = data.index.get_loc(date)
+        window = data.iloc[pos - 60:pos].dropna(axis=1)
+        expected = CovarianceEstimator(window.shape[1], cov_method).update(window).covariance()
+        np.testing.assert_allclose(mu, window.mean(), rtol=1e-9)
+        np.testing.assert_allclose(cov, expected, rtol=1e-7, atol=1e-12)
+        if cov_method == "sample":
+            np.testing.assert_allclose(cov, window.cov(), rtol=1e-7, atol=1e-12)
@@ -0,0 +1,30 @@
+import numpy as np
+
+from benchmark import compare_results, data_hash, synthetic_ohlcv
+
+
+def _report(seconds, data="a"):
+    return {"results": [{"stage": "stage", "tickers": 10, "days": 100, "simulations": None,
+                         "seconds": seconds, "data_hash": data}]}
+
+
+def test_synthetic_ohlcv_is_reproducible():
+    a, b = synthetic_ohlcv(3, num_days=50), synthetic_ohlcv(3, num_days=50)
+    assert data_hash(a) == data_hash(b)
+    assert data_hash(a) != data_hash(synthetic_ohlcv(3, num_days=50, seed=1))
+    assert len(a) == 4 * 50
+    assert (a["Low"] <= a[["Open", "Close"]].min(axis=1)).all()
+    assert (a["High"] >= a[["Open", "Close"]].max(axis=1)).all()
+
+
+def test_compare_flags_only_real_regressions():
+    # 비율과 절대 차이가 둘 다 기준을 넘어야 성능 저하
+    assert compare_results(_report(1.0), _report(1.3))["regression"].item()
+    assert not compare_results(_report(1.0), _report(1.1))["regression"].item()
+    assert not compare_results(_report(0.001), _report(0.005))["regression"].item()
+
+
+def test_compare_marks_different_data():
+    table = compare_results(_report(1.0, data="a"), _report(1.0, data="b"))
+    assert not table["same_data"].item()
+    assert np.isclose(table["ratio"].item(), 1.0)
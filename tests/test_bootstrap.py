@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from bootstrap import _prepare, _regress, bootstrap_beta, resample_counts
+from statistical_analysis import calculate_beta_batch
+
+
+@pytest.mark.parametrize("fixture", ["returns", "gappy_returns"])
+def test_point_estimates_match_batch(request, fixture):
+    data = request.getfixturevalue(fixture)
+    result = bootstrap_beta(data, "^GSPC", num_resamples=50, seed=0, num_workers=1)
+    point = calculate_beta_batch(data, "^GSPC")
+    table = result["table"]
+    np.testing.assert_array_equal(table["beta"], point["beta"][0])
+    np.testing.assert_array_equal(table["alpha"], point["alpha"][0])
+    np.testing.assert_array_equal(table["n_obs"], point["n_obs"][0])
+
+
+@pytest.mark.parametrize("fixture", ["returns", "gappy_returns"])
+def test_identity_resample_is_point_estimate(request, fixture):
+    # 모든 날짜를 한 번씩 뽑은 재표본 = 전체 표본 회귀
+    data = request.getfixturevalue(fixture)
+    x = data["^GSPC"].to_numpy()
+    keep = ~np.isnan(x)
+    y = data.drop(columns="^GSPC").to_numpy()[keep]
+    beta, alpha = _regress(np.ones((1, keep.sum())), _prepare(x[keep], y), min_periods=20)
+    point = calculate_beta_batch(data, "^GSPC")
+    np.testing.assert_allclose(beta[0], point["beta"][0], rtol=1e-9)
+    np.testing.assert_allclose(alpha[0], point["alpha"][0], rtol=1e-7, atol=1e-12)
+
+
+@pytest.mark.parametrize("block_size", [None, 10])
+def test_resample_counts_sum_to_days(block_size):
+    counts = resample_counts(250, 40, block_size, rng=0)
+    assert counts.shape == (40, 250)
+    np.testing.assert_array_equal(counts.sum(axis=1), 250)
+
+
+def test_same_seed_same_result_across_workers(gappy_returns):
+    params = dict(num_resamples=120, batch_size=40, block_size=5, seed=7)
+    serial = bootstrap_beta(gappy_returns, "^GSPC", num_workers=1, **params)
+    parallel = bootstrap_beta(gappy_returns, "^GSPC", num_workers=2, **params)
+    np.testing.assert_array_equal(serial["beta"], parallel["beta"])
+    np.testing.assert_array_equal(serial["alpha"], parallel["alpha"])
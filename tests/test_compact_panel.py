@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import covariance
+from compact_panel import CompactPanel, as_frame, from_frame, from_long
+from covariance import get_covariance
+from indicators import compute_indicators, scan_universe
+from pairwise import overlap_counts, pairwise_corr, pairwise_cov
+
+
+@pytest.fixture
+def prices(gappy_returns):
+    """중간 결측 + 늦게 상장한 종목이 섞인 가격 (날짜 x 종목)"""
+    return 100 * (1 + gappy_returns.fillna(0)).cumprod().where(gappy_returns.notna())
+
+
+@pytest.fixture
+def no_frame(monkeypatch):
+    """계산 경로가 DataFrame 뷰를 만들지 않는지 확인 (만들면 실패)"""
+    monkeypatch.setattr(CompactPanel, "to_frame", lambda *a, **k: pytest.fail("DataFrame으로 변환함"))
+
+
+def _assert_frame(panel, expected, **kwargs):
+    # 날짜 축은 일 단위 코드에서 만들므로 시간 단위(s / us)만 다를 수 있음
+    pd.testing.assert_frame_equal(panel.to_frame(), expected, check_names=False, check_freq=False,
+                                  check_index_type=False, **kwargs)
+
+
+def test_views_match_frame(prices):
+    panel = from_frame(prices, dtype=np.float64)
+    _assert_frame(panel, prices)
+    assert np.shares_memory(panel.to_frame().to_numpy(), panel.data)
+    assert np.shares_memory(np.asarray(panel), panel.data)
+    np.testing.assert_array_equal(panel.series("S3"), prices["S3"])
+    assert panel.column("S3").flags["C_CONTIGUOUS"]
+
+    part = panel.between("2020-03-02", "2020-06-30")
+    _assert_frame(part, prices.loc["2020-03-02":"2020-06-30"])
+    assert np.shares_memory(part.data, panel.data)
+    _assert_frame(panel.select(["S4", "S0"]), prices[["S4", "S0"]])
+
+
+def test_ffill_returns_complete_match_pandas(prices):
+    panel = from_frame(prices, dtype=np.float64)
+    filled = prices.ffill()
+    _assert_frame(panel.ffill(), filled)
+    _assert_frame(panel.returns(), filled.pct_change(fill_method=None).iloc[1:], rtol=1e-12)
+    _assert_frame(panel.returns(log=True), np.log(filled / filled.shift()).iloc[1:], rtol=1e-12)
+    _assert_frame(panel.complete(), prices.dropna())
+
+
+def test_from_long_matches_pivot(prices):
+    long = prices.stack().rename("Close").reset_index()
+    long.columns = ["Date", "Ticker", "Close"]
+    panel = from_long(long.sample(frac=1, random_state=0), dtype=np.float64)
+    expected = long.pivot(index="Date", columns="Ticker", values="Close")
+    _assert_frame(panel, expected)
+
+
+def test_float32_stays_float32(returns):
+    panel = from_frame(returns)
+    assert panel.dtype == np.float32 and as_frame(panel).dtypes.eq(np.float32).all()
+    assert panel.nbytes < returns.to_numpy().nbytes
+
+
+def test_pairwise_on_panel_matches_frame(gappy_returns, no_frame):
+    panel = from_frame(gappy_returns)
+    # float32 값을 float64로 올린 DataFrame과 같은 결과 (패널 전체의 float64 복사본 없이)
+    frame = gappy_returns.astype(np.float32).astype(np.float64)
+    pd.testing.assert_frame_equal(pairwise_cov(panel), pairwise_cov(frame), check_names=False, rtol=1e-12)
+    pd.testing.assert_frame_equal(pairwise_cov(panel, psd=True), pairwise_cov(frame, psd=True),
+                                  check_names=False, rtol=1e-12)
+    pd.testing.assert_frame_equal(pairwise_corr(panel), pairwise_corr(frame), check_names=False, rtol=1e-12)
+    pd.testing.assert_frame_equal(overlap_counts(panel), overlap_counts(frame), check_names=False)
+
+
+@pytest.mark.parametrize("method", ["sample", "ledoit_wolf", "ewma"])
+def test_covariance_on_panel_matches_frame(returns, gappy_returns, method):
+    covariance.clear_cache()
+    for data in (returns, gappy_returns):
+        panel = from_frame(data)
+        frame = data.astype(np.float32).astype(np.float64)
+        expected = get_covariance(frame, method, window=120)
+        covariance.clear_cache()
+        pd.testing.assert_frame_equal(get_covariance(panel, method, window=120), expected,
+                                      check_names=False, rtol=1e-10)
+    covariance.clear_cache()
+
+
+def test_covariance_incremental_on_panel(returns, no_frame):
+    covariance.clear_cache()
+    panel = from_frame(returns)
+    get_covariance(panel.between(end=returns.index[299]), "sample")
+    grown = get_covariance(panel, "sample")
+    covariance.clear_cache()
+    np.testing.assert_allclose(grown, get_covariance(panel, "sample"), rtol=1e-10)
+    covariance.clear_cache()
+
+
+def test_indicators_on_panel_match_frame(prices, no_frame):
+    panel = from_frame(prices)
+    frame = prices.astype(np.float32).astype(np.float64)
+    expected = compute_indicators(frame)
+    for name, arr in compute_indicators(panel).items():
+        np.testing.assert_allclose(arr, expected[name], rtol=1e-12, equal_nan=True)
+    pd.testing.assert_frame_equal(scan_universe(panel), scan_universe(frame), check_names=False, rtol=1e-12)
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from correlation import CorrelationIndex, cluster_order, correlation_matrix, downsample
+
+
+@pytest.fixture
+def wide_returns(returns):
+    """종목이 많은 수익률 (fixture 종목 + 시장 요인을 섞은 합성 종목 60개, 일부 결측)"""
+    rng = np.random.default_rng(2)
+    loadings = rng.normal(0, 1, (returns.shape[1], 60))
+    values = returns.to_numpy() @ loadings / 3 + rng.normal(0, 0.01, (len(returns), 60))
+    wide = pd.DataFrame(values, index=returns.index, columns=[f"W{i:02d}" for i in range(60)])
+    return pd.concat([returns, wide], axis=1)
+
+
+def _brute_pairs(corr, tickers, k, largest):
+    """위 삼각형의 모든 쌍을 전부 정렬한 기준 결과"""
+    i, j = np.triu_indices(len(tickers), 1)
+    values = corr[i, j]
+    keep = ~np.isnan(values)
+    i, j, values = i[keep], j[keep], values[keep]
+    order = np.argsort(-values if largest else values, kind="stable")[:k]
+    return [(tickers[a], tickers[b]) for a, b in zip(i[order], j[order])], values[order]
+
+
+def test_matrix_matches_pandas(returns, gappy_returns):
+    corr, tickers = correlation_matrix(returns)
+    np.testing.assert_allclose(corr, returns.corr().to_numpy(), rtol=1e-12)
+    assert tickers == list(returns.columns)
+
+    corr, _ = correlation_matrix(gappy_returns, min_periods=30)
+    np.testing.assert_allclose(corr, gappy_returns.corr(min_periods=30).to_numpy(), rtol=1e-10, equal_nan=True)
+
+
+@pytest.mark.parametrize("depth", [3, 20])
+@pytest.mark.parametrize("k", [1, 5, 40])
+@pytest.mark.parametrize("largest", [True, False])
+def test_top_pairs_match_brute_force(wide_returns, depth, k, largest):
+    corr, tickers = correlation_matrix(wide_returns)
+    # 인덱스 깊이보다 큰 k, 행을 나눠 계산하는 경우까지
+    table = CorrelationIndex(corr, tickers, depth=depth, chunk_size=7).top_pairs(k, largest=largest)
+    pairs, values = _brute_pairs(corr, tickers, k, largest)
+    assert list(zip(table["Ticker 1"], table["Ticker 2"])) == pairs
+    np.testing.assert_array_equal(table["Correlation"], values)
+
+
+def test_top_pairs_skip_missing(gappy_returns):
+    # 공통 관측일이 부족한 쌍(NaN)은 후보에서 빠짐
+    corr, tickers = correlation_matrix(gappy_returns, min_periods=200)
+    assert np.isnan(corr).any()
+    table = CorrelationIndex(corr, tickers, depth=2).top_pairs(100)
+    pairs, values = _brute_pairs(corr, tickers, 100, True)
+    assert list(zip(table["Ticker 1"], table["Ticker 2"])) == pairs
+    np.testing.assert_array_equal(table["Correlation"], values)
+
+
+@pytest.mark.parametrize("k", [3, 30])
+@pytest.mark.parametrize("largest", [True, False])
+def test_neighbours_match_sorted_row(wide_returns, k, largest):
+    corr, tickers = correlation_matrix(wide_returns)
+    index = CorrelationIndex(corr, tickers, depth=10)
+    for ticker in ("^GSPC", "W17"):
+        i = tickers.index(ticker)
+        row = pd.Series(corr[i], index=tickers).drop(ticker)
+        expected = row.sort_values(ascending=not largest, kind="stable").iloc[:k]
+        result = index.neighbours(ticker, k, largest=largest)
+        assert list(result.index) == list(expected.index)
+        np.testing.assert_array_equal(result, expected)
+
+
+def test_downsample_block_mean():
+    matrix = np.arange(36, dtype=np.float64).reshape(6, 6)
+    matrix[0, 0] = np.nan
+    small = downsample(matrix, 3)
+    assert small.shape == (3, 3)
+    assert small[0, 0] == pytest.approx(np.nanmean(matrix[:2, :2]))
+    assert small[2, 1] == pytest.approx(matrix[4:, 2:4].mean())
+    assert downsample(matrix, 6) is matrix
+
+
+def test_cluster_order_is_permutation(wide_returns):
+    corr, tickers = correlation_matrix(wide_returns)
+    order = cluster_order(corr)
+    assert sorted(order) == list(range(len(tickers)))
@@ -0,0 +1,131 @@
+import threading
+
+import numpy as np
+import pytest
+
+import covariance
+import perf
+from covariance import CovarianceEstimator, clear_cache, get_covariance, pairwise_estimate
+
+
+@pytest.fixture
+def updates(monkeypatch):
+    """get_covariance가 추정기에 넘긴 날짜 수 기록 (캐시는 비운 상태로 시작)"""
+    clear_cache()
+    sizes = []
+    update = CovarianceEstimator.update
+
+    def recording(self, returns):
+        sizes.append(len(returns))
+        return update(self, returns)
+
+    monkeypatch.setattr(CovarianceEstimator, "update", recording)
+    yield sizes
+    clear_cache()
+
+
+def _ledoit_wolf_reference(x):
+    """sklearn.covariance.ledoit_wolf와 같은 식을 전체 데이터로 직접 계산"""
+    x = x - x.mean(axis=0)
+    n, p = x.shape
+    emp = x.T @ x / n
+    mu = np.trace(emp) / p
+    x2 = x ** 2
+    delta_ = np.sum(emp ** 2)
+    beta = (np.sum(x2.T @ x2) / n - delta_) / (p * n)
+    delta = (delta_ - 2 * mu * np.trace(emp) + p * mu ** 2) / p
+    shrinkage = min(beta, delta) / delta
+    return (1 - shrinkage) * emp + shrinkage * mu * np.eye(p)
+
+
+def test_ledoit_wolf_matches_reference(returns):
+    values = returns.to_numpy()
+    cov = CovarianceEstimator(values.shape[1], "ledoit_wolf").update(values).covariance()
+    np.testing.assert_allclose(cov, _ledoit_wolf_reference(values), rtol=1e-10, atol=1e-18)
+
+
+def test_ledoit_wolf_matches_sklearn(returns):
+    sklearn_covariance = pytest.importorskip("sklearn.covariance")
+    values = returns.to_numpy()
+    cov = CovarianceEstimator(values.shape[1], "ledoit_wolf").update(values).covariance()
+    np.testing.assert_allclose(cov, sklearn_covariance.ledoit_wolf(values)[0], rtol=1e-10, atol=1e-18)
+
+
+@pytest.mark.parametrize("method", ["sample", "ledoit_wolf", "ewma"])
+@pytest.mark.parametrize("window", [None, 120])
+def test_incremental_update_matches_full(returns, method, window):
+    values = returns.to_numpy()
+    full = CovarianceEstimator(values.shape[1], method, window).update(values).covariance()
+    estimator = CovarianceEstimator(values.shape[1], method, window)
+    for start in range(0, len(values), 37):
+        estimator.update(values[start:start + 37])
+    np.testing.assert_allclose(estimator.covariance(), full, rtol=1e-9, atol=1e-18)
+
+
+def test_sample_matches_pandas(returns):
+    np.testing.assert_allclose(get_covariance(returns, "sample").to_numpy(), returns.cov().to_numpy(),
+                               rtol=1e-10, atol=1e-18)
+
+
+@pytest.mark.parametrize("method", ["ledoit_wolf", "ewma"])
+def test_pairwise_estimate_matches_estimator_without_gaps(returns, method):
+    values = returns.to_numpy()
+    expected = CovarianceEstimator(values.shape[1], method).update(values).covariance()
+    np.testing.assert_allclose(pairwise_estimate(returns, method).to_numpy(), expected, rtol=1e-9, atol=1e-18)
+
+
+@pytest.mark.parametrize("method", ["sample", "ledoit_wolf", "ewma"])
+def test_gaps_use_pairwise_overlap(gappy_returns, method):
+    cov = get_covariance(gappy_returns, method)
+    assert list(cov.columns) == list(gappy_returns.columns)
+    assert np.all(np.diagonal(cov) > 0)
+    assert np.linalg.eigvalsh(cov.to_numpy()).min() > -1e-12
+
+
+@pytest.mark.parametrize("method", ["sample", "ledoit_wolf", "ewma"])
+def test_cached_estimator_takes_only_new_rows(returns, updates, method):
+    get_covariance(returns.iloc[:300], method, window=120)
+    grown = get_covariance(returns, method, window=120)
+    assert updates == [300, 100]
+    expected = CovarianceEstimator(returns.shape[1], method, 120).update(returns.to_numpy()).covariance()
+    np.testing.assert_allclose(grown.to_numpy(), expected, rtol=1e-9, atol=1e-18)
+
+
+def test_changed_prefix_recomputes(returns, updates):
+    get_covariance(returns.iloc[:300], "sample")
+    # 마지막 날짜 / 값은 그대로이고 중간 값만 바뀐 데이터 -> 이어 붙이지 않고 새로 계산
+    revised = returns.copy()
+    revised.iloc[150, 2] += 0.05
+    cov = get_covariance(revised, "sample")
+    assert updates == [300, 400]
+    np.testing.assert_allclose(cov.to_numpy(), revised.cov().to_numpy(), rtol=1e-10, atol=1e-18)
+    # 같은 데이터를 다시 요청하면 새 날짜 없음
+    get_covariance(revised, "sample")
+    assert updates == [300, 400, 0]
+
+
+def test_entries_update_under_their_own_lock(returns, updates):
+    get_covariance(returns, "sample")
+    entry = next(iter(covariance._cache.values()))
+    done = threading.Event()
+    # 한 조합을 계산 중이어도 (항목 잠금을 잡고 있어도) 다른 조합은 기다리지 않음
+    with entry["lock"]:
+        worker = threading.Thread(target=lambda: (get_covariance(returns, "ewma"), done.set()))
+        worker.start()
+        assert done.wait(5)
+    worker.join()
+
+
+def test_pairwise_estimate_reports_through_perf(gappy_returns, capsys, monkeypatch):
+    monkeypatch.setenv(perf.ENV_FLAG, "0")
+    monkeypatch.delenv(perf.ENV_LOG, raising=False)
+    perf.enable(True, stream=False)
+    try:
+        since = perf.mark()
+        pairwise_estimate(gappy_returns, "ewma")
+    finally:
+        perf.enable(False)
+    assert capsys.readouterr().out == ""
+    record = perf.records(since)[-1]
+    assert record["stage"] == "covariance.pairwise_estimate" and record["method"] == "ewma"
+    assert record["complete_rows"] == int(gappy_returns.notna().all(axis=1).sum())
@@ -0,0 +1,149 @@
+import pandas as pd
+import pytest
+
+import data_loader
+from benchmark import synthetic_ohlcv
+from data_loader import download_stock_data, plan_missing_ranges
+from price_store import load_ticker, read_index, save_prices
+
+
+class FakeSource:
+    """합성 데이터에서 [start, end) 구간을 잘라 주는 가짜 소스 (요청 기록)"""
+
+    def __init__(self, data):
+        self.data = data
+        self.calls = []
+
+    def __call__(self, tickers, start_date, end_date):
+        self.calls.append((tuple(tickers), start_date, end_date))
+        rows = self.data["Ticker"].isin(tickers) & (self.data.index >= start_date) & (self.data.index < end_date)
+        return self.data[rows]
+
+
+@pytest.fixture
+def market():
+    """2021-01-01부터 300 영업일 (시장 지수 + 종목 3개)"""
+    return synthetic_ohlcv(3, num_days=300, start="2021-01-01")
+
+
+def _download(store, source, tickers, start, end, **params):
+    return download_stock_data(tickers, start, end, store_dir=store, incremental=True, source=source,
+                               backoff=0.0, **params)
+
+
+def test_plan_new_and_trailing_ranges(tmp_path, market):
+    save_prices(market[market.index < "2021-06-01"], tmp_path)
+    plan = plan_missing_ranges(["^GSPC", "NEW"], "2021-01-01", "2021-09-01", tmp_path)
+    # 저장된 마지막 날 다음날부터 / 새 종목은 전체 기간
+    last = market[market.index < "2021-06-01"].index.max() + pd.Timedelta(days=1)
+    assert plan == {(str(last.date()), "2021-09-01"): ["^GSPC"], ("2021-01-01", "2021-09-01"): ["NEW"]}
+
+
+def test_plan_fill_gaps_respects_max_gap_days(tmp_path, market):
+    gap = (market.index >= "2021-03-01") & (market.index < "2021-03-10")
+    save_prices(market[~gap], tmp_path)
+    start, end = str(market.index.min().date()), str(market.index.max().date())
+    plan = plan_missing_ranges(["SYN00000"], start, end, tmp_path, fill_gaps=True)
+    assert ("2021-02-27", "2021-03-10") in plan
+    assert ("2021-02-27", "2021-03-10") not in plan_missing_ranges(["SYN00000"], start, end, tmp_path,
+                                                                   fill_gaps=True, max_gap_days=14)
+
+
+def test_incremental_download_fetches_only_new_range(tmp_path, market):
+    source = FakeSource(market)
+    tickers = ["^GSPC", "SYN00000", "SYN00001"]
+    _download(tmp_path, source, tickers, "2021-01-01", "2021-06-01")
+    assert read_index(tmp_path)["tickers"]["SYN00000"]["covered_end"] == "2021-06-01"
+
+    source.calls.clear()
+    _download(tmp_path, source, tickers, "2021-01-01", "2021-09-01")
+    assert source.calls == [(tuple(tickers), "2021-06-01", "2021-09-01")]
+    loaded = load_ticker(tmp_path, "SYN00001", fields=["Close"])
+    expected = market[(market["Ticker"] == "SYN00001") & (market.index < "2021-09-01")]["Close"]
+    assert loaded["Close"].tolist() == expected.tolist()
+
+    # 받을 구간이 없으면 요청하지 않음
+    source.calls.clear()
+    _download(tmp_path, source, tickers, "2021-02-01", "2021-09-01")
+    assert source.calls == []
+
+
+def test_empty_range_marks_coverage(tmp_path, market):
+    # 상장 전 구간처럼 에러 없이 빈 데이터가 온 종목도 수집 완료로 기록 -> 다시 요청하지 않음
+    source = FakeSource(market)
+    _download(tmp_path, source, ["^GSPC"], "2021-03-01", "2021-06-01")
+    _download(tmp_path, source, ["^GSPC"], "2020-01-01", "2021-06-01")
+    assert read_index(tmp_path)["tickers"]["^GSPC"]["covered_start"] == "2020-01-01"
+
+    source.calls.clear()
+    _download(tmp_path, source, ["^GSPC"], "2020-06-01", "2021-06-01")
+    assert source.calls == []
+
+
+def test_index_written_once_per_flush(tmp_path, market, monkeypatch):
+    writes = []
+    write_index = data_loader.write_index
+    monkeypatch.setattr(data_loader, "write_index", lambda *args: writes.append(1) or write_index(*args))
+    monkeypatch.setattr(data_loader, "INDEX_FLUSH_CHUNKS", 2)
+    tickers = ["^GSPC", "SYN00000", "SYN00001", "SYN00002"]
+    report = _download(tmp_path, FakeSource(market), tickers, "2021-01-01", "2021-06-01", chunk_size=1)
+    # 청크 4개 -> 2개마다 한 번 + 마지막에 한 번
+    assert len(writes) == 3
+    assert sorted(report["rows"]) == sorted(tickers)
+    assert sorted(read_index(tmp_path)["tickers"]) == sorted(tickers)
+
+
+class FlakySource(FakeSource):
+    """bad 종목이 요청에 들어 있으면 error를 발생, 처음 fail_first번은 무조건 ConnectionError"""
+
+    def __init__(self, data, bad=(), error=ConnectionError, fail_first=0):
+        super().__init__(data)
+        self.bad, self.error, self.fail_first = set(bad), error, fail_first
+
+    def __call__(self, tickers, start_date, end_date):
+        if len(self.calls) < self.fail_first:
+            self.calls.append((tuple(tickers), start_date, end_date))
+            raise ConnectionError("temporary")
+        if self.bad & set(tickers):
+            self.calls.append((tuple(tickers), start_date, end_date))
+            raise self.error("bad ticker")
+        return super().__call__(tickers, start_date, end_date)
+
+
+def test_retries_network_errors(tmp_path, market):
+    source = FlakySource(market, fail_first=2)
+    report = _download(tmp_path, source, ["^GSPC", "SYN00000"], "2021-01-01", "2021-06-01")
+    assert len(source.calls) == 3
+    assert report["failed"] == {}
+    assert sorted(report["rows"]) == ["SYN00000", "^GSPC"]
+
+
+def test_failing_ticker_isolated_within_chunk(tmp_path, market):
+    source = FlakySource(market, bad=["SYN00001"])
+    tickers = ["^GSPC", "SYN00000", "SYN00001", "SYN00002"]
+    report = _download(tmp_path, source, tickers, "2021-01-01", "2021-06-01", chunk_size=2, max_retries=1)
+    assert list(report["failed"]) == ["SYN00001"]
+    assert sorted(report["rows"]) == ["SYN00000", "SYN00002", "^GSPC"]
+    # 실패한 종목은 수집 완료로 기록하지 않음 -> 다음 실행에서 다시 요청
+    assert "SYN00001" not in read_index(tmp_path)["tickers"]
+
+
+def test_other_errors_not_retried(tmp_path, market):
+    source = FlakySource(market, bad=["SYN00001"], error=KeyError)
+    tickers = ["SYN00000", "SYN00001"]
+    report = _download(tmp_path, source, tickers, "2021-01-01", "2021-06-01")
+    assert len(source.calls) == 1
+    assert sorted(report["failed"]) == tickers
+
+    # retry_on으로 다시 시도할 오류를 지정
+    source = FlakySource(market, bad=["SYN00001"], error=KeyError)
+    _download(tmp_path, source, tickers, "2021-01-01", "2021-06-01", max_retries=2, retry_on=(KeyError,))
+    # 묶음 3번 -> 종목별로 SYN00000 1번 + SYN00001 3번
+    assert len(source.calls) == 3 + 1 + 3
+
+
+def test_missing_ticker_reported(tmp_path, market):
+    # 소스가 에러 없이 일부 종목을 빼고 주면 (잘못된 코드 / 상장 폐지) 그 종목만 실패
+    report = _download(tmp_path, FakeSource(market), ["^GSPC", "NOPE"], "2021-01-01", "2021-06-01")
+    assert list(report["failed"]) == ["NOPE"]
+    assert "NOPE" not in read_index(tmp_path)["tickers"]
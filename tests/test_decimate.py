@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from decimate import decimate_frame, decimate_long, decimate_series, lttb_indices, minmax_indices
+
+
+@pytest.fixture
+def prices(returns):
+    return 100 * (1 + returns).cumprod()
+
+
+def _lttb_reference(y, num_points):
+    """시리즈 하나에 대한 원래 LTTB (Steinarsson) - 점 하나씩 반복"""
+    n = len(y)
+    every = (n - 2) / (num_points - 2)
+    picks, a = [0], 0
+    for i in range(num_points - 2):
+        start, end = int(np.floor(i * every)) + 1, int(np.floor((i + 1) * every)) + 1
+        next_start, next_end = end, min(int(np.floor((i + 2) * every)) + 1, n)
+        if i == num_points - 3:
+            next_start, next_end = n - 1, n
+        avg_x = np.arange(next_start, next_end).mean()
+        avg_y = y[next_start:next_end].mean()
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((a - avg_x) * (y[j] - y[a]) - (a - j) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        picks.append(best)
+        a = best
+    picks.append(n - 1)
+    return picks
+
+
+@pytest.mark.parametrize("num_points", [3, 17, 100])
+def test_lttb_matches_reference(prices, num_points):
+    picks = lttb_indices(prices.to_numpy(), num_points)
+    assert picks.shape == (num_points, prices.shape[1])
+    for j in range(prices.shape[1]):
+        assert picks[:, j].tolist() == _lttb_reference(prices.iloc[:, j].to_numpy(), num_points)
+        assert np.all(np.diff(picks[:, j]) > 0)
+
+
+@pytest.mark.parametrize("num_points", [10, 51, 200])
+def test_minmax_keeps_endpoints_and_extremes(gappy_returns, num_points):
+    prices = 100 * (1 + gappy_returns.fillna(0)).cumprod().where(gappy_returns.notna())
+    values = prices.to_numpy()
+    picks = minmax_indices(values, num_points)
+    assert len(picks) <= num_points
+    for j in range(values.shape[1]):
+        column = picks[:, j]
+        assert column[0] == 0 and column[-1] == len(values) - 1
+        assert np.all(np.diff(column) >= 0)
+        # 결측을 뺀 전체 최고점 / 최저점은 항상 남음
+        assert np.nanargmax(values[1:-1, j]) + 1 in column
+        assert np.nanargmin(values[1:-1, j]) + 1 in column
+
+
+def test_short_input_unchanged(prices):
+    short = prices.iloc[:50]
+    assert decimate_series(short["S0"], 100).equals(short["S0"])
+    assert decimate_frame(short, 100).equals(short)
+    np.testing.assert_array_equal(lttb_indices(short.to_numpy(), 100)[:, 0], np.arange(50))
+
+
+def test_decimate_series_and_frame(prices):
+    series = decimate_series(prices["S0"], 40)
+    assert len(series) == 40
+    assert series.index[0] == prices.index[0] and series.index[-1] == prices.index[-1]
+    np.testing.assert_array_equal(series, prices["S0"].loc[series.index])
+
+    frame = decimate_frame(prices[["S0", "S1"]], 60)
+    # 열끼리 같은 날짜 (열마다 고른 위치의 합집합) -> 점 수 상한 안
+    assert len(frame) <= 60 and frame.index.is_monotonic_increasing
+    assert prices["S0"].idxmax() in frame.index and prices["S1"].idxmin() in frame.index
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_decimate_long_per_ticker(gappy_returns, method):
+    long = decimate_long(gappy_returns, 30, method=method)
+    assert list(long.columns) == ["Date", "Ticker", "Value"]
+    assert long["Value"].notna().all()
+    for ticker, rows in long.groupby("Ticker"):
+        assert len(rows) <= 30
+        np.testing.assert_array_equal(rows["Value"], gappy_returns.loc[rows["Date"], ticker])
+
+
+def test_unknown_method(prices):
+    with pytest.raises(ValueError):
+        decimate_series(prices["S0"], 10, method="average")
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from indicator_state import IndicatorState
+from indicators import compute_indicators
+
+NAMES = ["MA20", "MA60", "Bollinger_Upper", "Bollinger_Lower", "RSI"]
+
+
+@pytest.fixture
+def closes():
+    """결측 봉이 섞인 종가 (상장 전 구간, 하루 결측, 창보다 긴 결측)"""
+    rng = np.random.default_rng(2)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 400)))
+    values[:15] = np.nan
+    values[90] = np.nan
+    values[150:155] = np.nan
+    values[230:300] = np.nan
+    values[rng.choice(np.arange(310, 400), 4, replace=False)] = np.nan
+    return values
+
+
+def _assert_matches(streamed, batch, t):
+    for name in NAMES:
+        np.testing.assert_allclose(streamed[name], batch[name][t, 0], rtol=1e-9, atol=1e-9,
+                                   err_msg=f"{name} @ {t}")
+
+
+def test_update_matches_batch_with_gaps(closes):
+    batch = compute_indicators(closes)
+    state = IndicatorState()
+    for t, close in enumerate(closes):
+        _assert_matches(state.update(close), batch, t)
+
+
+def test_from_history_matches_batch_with_gaps(closes):
+    batch = compute_indicators(closes)
+    for end in (100, 160, 240, 310, 360, len(closes)):
+        _assert_matches(IndicatorState.from_history(closes[:end]).values(), batch, end - 1)
+
+
+def test_state_round_trip_continues(closes):
+    batch = compute_indicators(closes)
+    state = IndicatorState.from_history(closes[:200])
+    restored = IndicatorState.from_dict(state.to_dict())
+    for t in range(200, len(closes)):
+        _assert_matches(restored.update(closes[t]), batch, t)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import compute_indicators, scan_universe
+from technical_analysis import add_technical_indicators
+
+NAMES = ["MA20", "MA60", "Bollinger_Upper", "Bollinger_Lower", "RSI"]
+
+
+@pytest.fixture
+def prices(returns):
+    """수익률 fixture로 만든 가격 (날짜 x 종목)"""
+    return 100 * (1 + returns).cumprod()
+
+
+def test_matches_add_technical_indicators(prices):
+    result = compute_indicators(prices)
+    for j, ticker in enumerate(prices.columns):
+        expected = add_technical_indicators(pd.DataFrame({"Close": prices[ticker]}))
+        for name in NAMES:
+            np.testing.assert_allclose(result[name][:, j], expected[name], rtol=1e-9, atol=1e-9,
+                                       err_msg=f"{ticker} {name}")
+
+
+def test_gaps_match_pandas_rolling(prices, gappy_returns):
+    # 창 안에 결측이 있으면 NaN (pandas rolling 기본 min_periods와 같음)
+    gappy = prices.where(gappy_returns.notna())
+    result = compute_indicators(gappy)
+    ma = gappy.rolling(20).mean()
+    std = gappy.rolling(20).std()
+    np.testing.assert_allclose(result["MA20"], ma, rtol=1e-9)
+    np.testing.assert_allclose(result["MA60"], gappy.rolling(60).mean(), rtol=1e-9)
+    np.testing.assert_allclose(result["Bollinger_Upper"], ma + 2 * std, rtol=1e-9)
+    np.testing.assert_allclose(result["Bollinger_Lower"], ma - 2 * std, rtol=1e-9)
+
+
+def test_float32_output(prices):
+    result = compute_indicators(prices, dtype=np.float32)
+    reference = compute_indicators(prices)
+    for name in NAMES:
+        assert result[name].dtype == np.float32
+        np.testing.assert_allclose(result[name], reference[name], rtol=1e-5)
+
+
+def test_scan_universe_is_last_row(prices):
+    table = scan_universe(prices)
+    result = compute_indicators(prices)
+    for name in NAMES:
+        np.testing.assert_allclose(table[name], result[name][-1], rtol=1e-9)
+    np.testing.assert_array_equal(table["Close"], prices.iloc[-1])
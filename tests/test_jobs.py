@@ -0,0 +1,92 @@
+import threading
+from concurrent.futures import wait
+
+import pytest
+
+import jobs
+
+
+@pytest.fixture(autouse=True)
+def gate(monkeypatch):
+    """작업 함수를 붙잡아 두는 이벤트 (테스트가 끝나면 풀어서 작업 스레드를 정리)"""
+    monkeypatch.setattr(jobs, "_jobs", {})
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def _blocked(job, gate, value=1):
+    # 취소 요청을 확인하면서 gate가 열릴 때까지 대기
+    while not gate.wait(0.01):
+        job.report(0.5, "partial")
+    return value
+
+
+def _wait(job):
+    wait([job.future], timeout=5)
+    return job
+
+
+def test_same_key_shares_job(gate):
+    first = jobs.submit(_blocked, gate, key="k", session_id="a")
+    second = jobs.submit(_blocked, gate, key="k", session_id="b")
+    other = jobs.submit(_blocked, gate, key="other", session_id="b")
+    assert second is first and other is not first
+    assert first.sessions == {"a", "b"}
+
+    gate.set()
+    assert _wait(first).status == "done" and first.result == 1 and first.progress == 1.0
+    # 끝난 작업의 키로 다시 요청하면 새 작업
+    assert jobs.submit(_blocked, gate, key="k", session_id="a") is not first
+
+
+def test_cancel_shared_job_waits_for_last_session(gate):
+    job = jobs.submit(_blocked, gate, key="k", session_id="a")
+    jobs.submit(_blocked, gate, key="k", session_id="b")
+    assert jobs.cancel(job.id, "a")
+    assert not job._cancel.is_set() and job.sessions == {"b"}
+
+    assert jobs.cancel(job.id, "b")
+    assert _wait(job).status == "cancelled"
+    assert job.result is None
+    assert not jobs.cancel(job.id, "b")
+
+
+def test_cancel_queued_job_never_runs(gate):
+    running = [jobs.submit(_blocked, gate, session_id="a", max_per_session=10) for _ in range(jobs.MAX_WORKERS)]
+    ran = []
+    queued = jobs.submit(lambda job: ran.append(1), session_id="a", max_per_session=10)
+    assert queued.status == "queued"
+    jobs.cancel(queued.id, "a")
+    gate.set()
+    for job in running:
+        _wait(job)
+    assert queued.status == "cancelled" and ran == []
+
+
+def test_per_session_cap(gate):
+    for _ in range(jobs.MAX_JOBS_PER_SESSION):
+        jobs.submit(_blocked, gate, session_id="a")
+    with pytest.raises(RuntimeError):
+        jobs.submit(_blocked, gate, session_id="a")
+    # 다른 세션은 제한과 무관
+    jobs.submit(_blocked, gate, session_id="b")
+    gate.set()
+    for job in jobs.session_jobs("a"):
+        _wait(job)
+    # 끝난 작업은 제한에 세지 않음
+    jobs.submit(_blocked, gate, session_id="a")
+    assert len(jobs.session_jobs("a")) == jobs.MAX_JOBS_PER_SESSION + 1
+
+
+def test_failure_and_cleanup(monkeypatch):
+    def broken(job):
+        raise ValueError("boom")
+
+    job = _wait(jobs.submit(broken, session_id="a"))
+    assert job.status == "failed" and job.error == "ValueError: boom"
+    assert jobs.get(job.id) is job
+
+    monkeypatch.setattr(jobs, "JOB_TTL", -1)
+    jobs.submit(lambda job: None)
+    assert jobs.get(job.id) is None
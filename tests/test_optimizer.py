@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from optimizer import efficient_frontier, max_sharpe, min_variance, optimize_portfolio, portfolio_performance
+
+RISK_FREE = 0.02
+
+
+@pytest.fixture
+def inputs(returns):
+    """종목 3개의 일별 평균 / 공분산 (드리프트를 달리해서 max sharpe가 꼭짓점이 아니게)"""
+    data = returns[["S0", "S1", "S2"]] + [0.0004, 0.0008, 0.0002]
+    return data.mean().to_numpy(), data.cov().to_numpy()
+
+
+def _grid(step=0.0025):
+    """단체(합계 1, 비중 >= 0) 위의 격자점 전체 (점 수 x 3)"""
+    a, b = np.meshgrid(np.arange(0, 1 + step / 2, step), np.arange(0, 1 + step / 2, step))
+    a, b = a.ravel(), b.ravel()
+    keep = a + b <= 1 + 1e-12
+    return np.column_stack([a[keep], b[keep], np.clip(1 - a[keep] - b[keep], 0, None)])
+
+
+def _brute(mu, cov, cap=None):
+    grid = _grid()
+    if cap is not None:
+        grid = grid[(grid <= cap + 1e-12).all(axis=1)]
+    ret = grid @ mu * 252
+    vol = np.sqrt(np.einsum("ij,jk,ik->i", grid, cov * 252, grid))
+    return grid, ret, vol
+
+
+@pytest.mark.parametrize("cap", [None, 0.45])
+def test_min_variance_beats_grid(inputs, cap):
+    mu, cov = inputs
+    w = min_variance(mu, cov, max_weights=None if cap is None else [cap] * 3)
+    _, _, vol = _brute(mu, cov, cap)
+    assert w.sum() == pytest.approx(1.0) and w.min() >= -1e-12 and w.max() <= (cap or 1) + 1e-9
+    opt_vol = portfolio_performance(w, mu, cov)[1]
+    assert opt_vol <= vol.min() + 1e-12
+    assert opt_vol >= vol.min() - 1e-3
+
+
+@pytest.mark.parametrize("cap", [None, 0.45])
+def test_max_sharpe_beats_grid(inputs, cap):
+    mu, cov = inputs
+    w = max_sharpe(mu, cov, RISK_FREE, max_weights=None if cap is None else [cap] * 3)
+    _, ret, vol = _brute(mu, cov, cap)
+    best = ((ret - RISK_FREE) / vol).max()
+    assert w.sum() == pytest.approx(1.0) and w.min() >= -1e-12 and w.max() <= (cap or 1) + 1e-9
+    sharpe = portfolio_performance(w, mu, cov, RISK_FREE)[2]
+    assert sharpe >= best - 1e-9
+    assert sharpe <= best + 1e-2
+
+
+def test_frontier_not_dominated_by_grid(inputs):
+    # 격자점 중 수익률이 같거나 높으면서 변동성이 더 낮은 점이 없어야 함
+    mu, cov = inputs
+    returns, vols, weights = efficient_frontier(mu, cov, num_points=15)
+    _, ret, vol = _brute(mu, cov)
+    np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+    assert np.all(np.diff(returns) > 0)
+    for r, v in zip(returns, vols):
+        assert vol[ret >= r - 1e-12].min() >= v - 1e-9
+
+
+def test_optimize_portfolio_zero_weight_for_dropped_ticker(gappy_returns):
+    data = gappy_returns.copy()
+    data.iloc[:-1, 2] = np.nan  # 관측일 1일 -> 분산이 없어 공분산에서 제외
+    result = optimize_portfolio(data, num_points=5)
+    weights = result["max_sharpe"]["weights"]
+    assert list(weights.index) == list(data.columns)
+    assert weights[data.columns[2]] == 0.0
+    assert weights.sum() == pytest.approx(1.0)
+    assert result["frontier_weights"].shape == (5, data.shape[1])
+
+
+def test_positional_caps_follow_dropped_ticker(gappy_returns):
+    # 입력 순서의 상한 배열 / numpy 정수 인덱스는 공분산에서 빠진 종목을 건너뛰고 맞춰짐
+    data = gappy_returns.copy()
+    data.iloc[:-1, 2] = np.nan
+    free = optimize_portfolio(data, num_points=3)["max_sharpe"]["weights"]
+    assert free.iloc[3] > 0.05
+    caps = np.ones(data.shape[1])
+    caps[3] = 0.05
+    by_array = optimize_portfolio(data, num_points=3, max_weights=caps)["max_sharpe"]["weights"]
+    by_index = optimize_portfolio(data, num_points=3, max_weights={np.int64(3): 0.05})["max_sharpe"]["weights"]
+    assert by_array.iloc[3] == pytest.approx(0.05)
+    np.testing.assert_allclose(by_array, by_index, atol=1e-9)
+
+
+def test_frontier_needs_two_points(inputs):
+    mu, cov = inputs
+    with pytest.raises(ValueError):
+        efficient_frontier(mu, cov, num_points=1)
+    returns, _, weights = efficient_frontier(mu, cov, num_points=2)
+    assert len(returns) == 2 and returns[0] < returns[1]
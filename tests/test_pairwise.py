@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from pairwise import overlap_counts, pairwise_corr, pairwise_cov
+
+
+@pytest.mark.parametrize("min_periods", [20, 150])
+@pytest.mark.parametrize("chunk_size", [3, 512])
+def test_matches_pandas_with_gaps(gappy_returns, min_periods, chunk_size):
+    cov = pairwise_cov(gappy_returns, min_periods=min_periods, chunk_size=chunk_size)
+    corr = pairwise_corr(gappy_returns, min_periods=min_periods, chunk_size=chunk_size)
+    np.testing.assert_allclose(cov, gappy_returns.cov(min_periods=min_periods), rtol=1e-9, atol=1e-15)
+    np.testing.assert_allclose(corr, gappy_returns.corr(min_periods=min_periods), rtol=1e-9, atol=1e-12)
+
+
+def test_matches_pandas_without_gaps(returns):
+    np.testing.assert_allclose(pairwise_cov(returns), returns.cov(), rtol=1e-12, atol=1e-18)
+    np.testing.assert_allclose(pairwise_corr(returns), returns.corr(), rtol=1e-12, atol=1e-15)
+
+
+def test_overlap_counts(gappy_returns):
+    mask = gappy_returns.notna().to_numpy(dtype=int)
+    np.testing.assert_array_equal(overlap_counts(gappy_returns), mask.T @ mask)
+
+
+def test_psd_keeps_short_tickers_uncorrelated(gappy_returns):
+    # S0은 관측일이 150일보다 적음 -> 분산은 자기 관측일로, 다른 종목과의 공분산은 0
+    cov = pairwise_cov(gappy_returns, min_periods=150, psd=True)
+    assert list(cov.columns) == list(gappy_returns.columns)
+    assert cov.loc["S0", "S0"] == pytest.approx(gappy_returns["S0"].var(), rel=1e-9)
+    assert (cov.loc["S0"].drop("S0") == 0).all()
+    assert np.linalg.eigvalsh(cov.to_numpy()).min() > -1e-15
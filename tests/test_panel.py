@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import panel
+from benchmark import synthetic_ohlcv
+from price_store import load_panel, save_prices
+
+
+@pytest.fixture
+def store(tmp_path):
+    """합성 저장소 (늦게 상장한 종목 하나 포함) + 패널 캐시 폴더"""
+    prices = synthetic_ohlcv(3, num_days=200)
+    listed = prices.index.unique()[50]
+    prices = prices[(prices["Ticker"] != "SYN00002") | (prices.index >= listed)]
+    save_prices(prices, tmp_path / "store")
+    panel.clear_cache()
+    yield str(tmp_path / "store"), str(tmp_path / "cache"), prices
+    panel.clear_cache()
+
+
+def test_panel_matches_pandas(store):
+    store_dir, cache_dir, _ = store
+    result = panel.get_panel(store_dir, cache_dir=cache_dir)
+    prices = load_panel(store_dir).ffill().dropna()
+    pd.testing.assert_frame_equal(result["prices"], prices, check_names=False, check_freq=False)
+    pd.testing.assert_frame_equal(result["returns"], prices.pct_change().iloc[1:], check_names=False,
+                                  check_freq=False, rtol=1e-12)
+    np.testing.assert_allclose(result["log_returns"], np.log(prices / prices.shift()).iloc[1:], rtol=1e-12)
+    assert not result["returns"].to_numpy().flags.writeable
+
+
+def test_memory_and_disk_cache(store, monkeypatch):
+    store_dir, cache_dir, _ = store
+    first = panel.get_panel(store_dir, cache_dir=cache_dir)
+    assert panel.get_panel(store_dir, cache_dir=cache_dir) is first
+
+    # 프로세스 캐시를 비우면 가격을 다시 읽지 않고 디스크 캐시에서 같은 값
+    panel.clear_cache()
+    monkeypatch.setattr(panel, "_read_wide_prices", lambda *args: pytest.fail("다시 계산함"))
+    reloaded = panel.get_panel(store_dir, cache_dir=cache_dir)
+    assert reloaded is not first
+    pd.testing.assert_frame_equal(reloaded["returns"], first["returns"])
+    assert len(os.listdir(cache_dir)) == 1
+
+
+def test_data_change_invalidates_and_prunes(store):
+    store_dir, cache_dir, prices = store
+    before = panel.get_panel(store_dir, cache_dir=cache_dir)
+    changed = prices[prices["Ticker"] == "SYN00000"].copy()
+    changed.iloc[-1, changed.columns.get_loc("Close")] *= 1.1
+    save_prices(changed, store_dir, merge=True)
+
+    after = panel.get_panel(store_dir, cache_dir=cache_dir)
+    assert after["version"] != before["version"]
+    assert after["prices"]["SYN00000"].iloc[-1] == pytest.approx(before["prices"]["SYN00000"].iloc[-1] * 1.1)
+    # 같은 자리의 예전 버전 폴더는 삭제
+    assert len(os.listdir(cache_dir)) == 1
+
+
+def test_memory_cache_is_bounded(store, monkeypatch):
+    store_dir, cache_dir, _ = store
+    monkeypatch.setattr(panel, "MAX_MEMORY_ENTRIES", 2)
+    for tickers in (["^GSPC"], ["SYN00000"], ["SYN00001"]):
+        panel.get_panel(store_dir, tickers=tickers, cache_dir=None)
+    assert len(panel._MEMORY_CACHE) == 2
+
+
+def test_aligned_returns_keep_full_history(store):
+    store_dir, _, prices = store
+    aligned = panel.get_aligned_returns(store_dir)
+    assert len(aligned) == 199
+    assert aligned["SYN00002"].notna().sum() == 149
+    assert aligned["^GSPC"].notna().all()
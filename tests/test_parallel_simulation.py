@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from parallel_simulation import run_parallel_monte_carlo, simulate_batch, summary_frame
+from portfolio_optimization import simulate_portfolios
+
+
+@pytest.fixture
+def inputs(returns):
+    data = returns[["S0", "S1", "S2", "S3"]] + [0.0004, 0.0008, 0.0002, 0.0]
+    return data.mean().to_numpy(), data.cov().to_numpy()
+
+
+def _assert_same(a, b):
+    assert a["count"] == b["count"]
+    for part in ("top", "min_vol", "pareto"):
+        np.testing.assert_array_equal(a[part]["stats"], b[part]["stats"])
+        np.testing.assert_array_equal(a[part]["weights"], b[part]["weights"])
+
+
+def test_same_seed_same_summary_for_any_worker_count(inputs):
+    mu, cov = inputs
+    serial = run_parallel_monte_carlo(mu, cov, 5000, num_workers=1, batch_size=1200, seed=3, chunk_size=500)
+    parallel = run_parallel_monte_carlo(mu, cov, 5000, num_workers=3, batch_size=1200, seed=3, chunk_size=500)
+    _assert_same(serial, parallel)
+    assert serial["count"] == 5000
+
+
+def test_summary_matches_full_simulation(inputs):
+    # 청크별로 요약만 남겨도 전체 결과를 한 번에 정렬한 것과 같음
+    mu, cov = inputs
+    seed = np.random.SeedSequence(5)
+    summary = simulate_batch(mu, cov, 3000, seed, top_k=5, chunk_size=700)
+    results, weights = simulate_portfolios(mu, cov, 3000, seed=np.random.default_rng(seed), chunk_size=700)
+    stats = results.T
+    top = np.argsort(-stats[:, 2], kind="stable")[:5]
+    np.testing.assert_array_equal(summary["top"]["stats"], stats[top])
+    np.testing.assert_array_equal(summary["top"]["weights"], weights[top])
+    np.testing.assert_array_equal(summary["min_vol"]["stats"][0], stats[np.argmin(stats[:, 1])])
+
+    # 파레토 집합: 자기보다 변동성이 낮거나 같으면서 수익률이 높은 점이 없음
+    pareto = summary["pareto"]["stats"]
+    for ret, vol, _ in pareto:
+        assert not ((stats[:, 1] <= vol) & (stats[:, 0] > ret)).any()
+
+
+def test_summary_frame_columns(inputs):
+    mu, cov = inputs
+    summary = run_parallel_monte_carlo(mu, cov, 100, num_workers=1, seed=0)
+    frame = summary_frame(summary, "top", ["S0", "S1", "S2", "S3"])
+    assert list(frame.columns) == ["Return", "Volatility", "Sharpe", "S0", "S1", "S2", "S3"]
+    np.testing.assert_allclose(frame[["S0", "S1", "S2", "S3"]].sum(axis=1), 1.0)
@@ -0,0 +1,99 @@
+import json
+import time
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import perf
+
+
+@pytest.fixture
+def enabled(monkeypatch, tmp_path):
+    """측정을 켜고 (JSON Lines 기록 포함) 끝나면 원래대로"""
+    monkeypatch.setenv(perf.ENV_FLAG, "0")
+    monkeypatch.delenv(perf.ENV_LOG, raising=False)
+    perf.enable(True, log_path=str(tmp_path / "perf.jsonl"), stream=False)
+    since = perf.mark()
+    yield since
+    perf.enable(False)
+
+
+@perf.timed("test.work", data="values", record=("scale",))
+def _work(values, scale=1.0):
+    time.sleep(0.01)
+    return values * scale
+
+
+@perf.timed("test.make")
+def _make(rows):
+    return np.zeros((rows, 3))
+
+
+def test_disabled_records_nothing(monkeypatch):
+    monkeypatch.setattr(perf, "_enabled", False)
+    since = perf.mark()
+    assert perf.stage("test.off") is perf._NO_STAGE
+    _work(np.ones((4, 2)))
+    assert perf.records(since) == []
+
+
+def test_nested_stages_and_errors(enabled):
+    with perf.stage("test.outer", assets=3) as outer:
+        _work(np.ones((5, 2)), scale=2.0)
+        outer.set(rows=10)
+    with pytest.raises(ValueError):
+        with perf.stage("test.fail"):
+            raise ValueError
+    work, outer, fail = perf.records(enabled)
+    assert (work["stage"], work["parent"], work["depth"]) == ("test.work", "test.outer", 1)
+    assert (work["rows"], work["assets"], work["scale"]) == (5, 2, 2.0)
+    assert work["wall_s"] >= 0.01 and outer["wall_s"] >= work["wall_s"]
+    assert (outer["parent"], outer["depth"], outer["rows"], outer["assets"]) == (None, 0, 10, 3)
+    assert fail["error"] == "ValueError" and work["error"] is None
+
+
+def test_shape_from_result_and_log_file(enabled, tmp_path):
+    _make(7)
+    record = perf.records(enabled)[-1]
+    assert (record["rows"], record["assets"]) == (7, 3)
+    logged = [json.loads(line) for line in (tmp_path / "perf.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert logged[-1]["seq"] == record["seq"]
+
+
+def test_peak_memory_propagates_to_parent(enabled):
+    tracemalloc.start()
+    try:
+        with perf.stage("test.parent"):
+            with perf.stage("test.child"):
+                block = np.ones(2 * 1024 * 1024)  # 16MB
+                del block
+    finally:
+        tracemalloc.stop()
+    child, parent = perf.records(enabled)
+    assert child["peak_mb"] >= 15
+    assert parent["peak_mb"] >= child["peak_mb"]
+
+
+def test_summary_aggregates_by_stage(enabled):
+    for _ in range(3):
+        _work(np.ones(2))
+    _make(2)
+    table = perf.summary(enabled)
+    assert table["stage"].tolist() == ["test.work", "test.make"]
+    assert table["calls"].tolist() == [3, 1]
+    assert table["wall_s"].iloc[0] >= 0.03
+
+
+def test_capture_profiles_and_restores_state(monkeypatch, tmp_path):
+    monkeypatch.setenv(perf.ENV_FLAG, "0")
+    perf.enable(False)
+    assert perf.start_capture("unit")
+    assert not perf.start_capture("again")
+    _work(np.ones(3))
+    report = perf.stop_capture(profile_dir=str(tmp_path))
+    assert "_work" in report["profile"]
+    assert [r["stage"] for r in report["stages"]] == ["test.work"]
+    assert report["profile_path"].startswith(str(tmp_path)) and report["memory"]
+    assert not perf.is_enabled() and not tracemalloc.is_tracing()
+    assert perf.stop_capture() is None
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+import pipeline
+from benchmark import synthetic_ohlcv
+from panel import clear_cache
+from price_store import save_prices
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """합성 가격 저장소 (시장 지수 + 종목 4개, 300일) - 상대 경로 캐시도 tmp_path 안에 생기도록 이동"""
+    monkeypatch.chdir(tmp_path)
+    clear_cache()
+    df = synthetic_ohlcv(4, num_days=300)
+    save_prices(df, "store")
+    return df
+
+
+@pytest.fixture
+def analyzed(monkeypatch):
+    """analyze_ticker를 호출한 종목 기록"""
+    calls = []
+    original = pipeline.analyze_ticker
+
+    def analyze(store_dir, ticker, *args):
+        calls.append(ticker)
+        return original(store_dir, ticker, *args)
+
+    monkeypatch.setattr(pipeline, "analyze_ticker", analyze)
+    return calls
+
+
+def _run():
+    return pipeline.run_pipeline("store", output_dir="reports", workers=1, num_points=5)
+
+
+def test_rerun_recomputes_only_changed_tickers(store, analyzed):
+    summary, failed = _run()
+    assert not failed
+    assert sorted(analyzed) == sorted(summary["Ticker"]) and len(analyzed) == 4
+    assert os.path.exists("reports/optimization.json")
+
+    analyzed.clear()
+    _run()
+    assert analyzed == []
+
+    # 한 종목의 마지막 종가만 바꾸면 그 종목만 다시 계산
+    changed = store[store["Ticker"] == "SYN00002"].copy()
+    changed.iloc[-1, changed.columns.get_loc("Close")] *= 1.01
+    save_prices(changed, "store", merge=True)
+    clear_cache()
+    summary, _ = _run()
+    assert analyzed == ["SYN00002"]
+    assert len(summary) == 4
+
+
+def test_market_change_refreshes_betas_only(store, analyzed):
+    before, _ = _run()
+    analyzed.clear()
+    market = store[store["Ticker"] == pipeline.MARKET_TICKER].copy()
+    market.iloc[-1, market.columns.get_loc("Close")] *= 1.01
+    save_prices(market, "store", merge=True)
+    clear_cache()
+    summary, _ = _run()
+    assert analyzed == []
+    assert summary["Beta"].notna().all()
+    assert (summary["Beta"] != before["Beta"]).all()
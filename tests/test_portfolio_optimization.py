@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from portfolio_optimization import run_monte_carlo_simulation, simulate_portfolios
+
+RISK_FREE = 0.035
+
+
+@pytest.fixture
+def inputs(returns):
+    data = returns[["S0", "S1", "S2", "S3"]]
+    return data.mean().to_numpy(), data.cov().to_numpy()
+
+
+def test_matches_per_portfolio_loop(inputs):
+    mu, cov = inputs
+    results, weights = simulate_portfolios(mu, cov, 500, risk_free_rate=RISK_FREE, seed=1)
+    assert results.shape == (3, 500) and weights.shape == (500, 4)
+    assert weights.flags.c_contiguous
+    np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+    assert (weights >= 0).all()
+    for k in range(0, 500, 50):
+        w = weights[k]
+        ret = w @ mu * 252
+        vol = np.sqrt(w @ cov @ w * 252)
+        np.testing.assert_allclose(results[:, k], [ret, vol, (ret - RISK_FREE) / vol], rtol=1e-12)
+
+
+def test_seed_and_chunking_do_not_change_results(inputs):
+    mu, cov = inputs
+    results, weights = simulate_portfolios(mu, cov, 1000, seed=7)
+    for chunk_size in (1, 333, 5000):
+        chunked = simulate_portfolios(mu, cov, 1000, seed=7, chunk_size=chunk_size)
+        np.testing.assert_allclose(chunked[0], results, rtol=1e-12)
+        np.testing.assert_array_equal(chunked[1], weights)
+    assert not np.array_equal(simulate_portfolios(mu, cov, 1000, seed=8)[1], weights)
+
+
+def test_float32(inputs):
+    mu, cov = inputs
+    results, weights = simulate_portfolios(mu, cov, 1000, seed=3, dtype=np.float32)
+    reference = simulate_portfolios(mu, cov, 1000, seed=3)
+    assert results.dtype == weights.dtype == np.float32
+    np.testing.assert_allclose(results, reference[0], rtol=1e-5)
+
+
+def test_run_uses_given_returns(returns):
+    data = returns[["S0", "S1", "S2"]]
+    prices = 100 * (1 + data).cumprod()
+    results, weights = run_monte_carlo_simulation(prices, 200, daily_returns=data, seed=0)
+    expected = simulate_portfolios(data.mean(), data.cov(), 200, seed=0)
+    np.testing.assert_allclose(results, expected[0], rtol=1e-10)
+    np.testing.assert_array_equal(weights, expected[1])
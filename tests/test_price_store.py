@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark import synthetic_ohlcv
+from price_store import FIELDS, find_internal_gaps, load_panel, load_ticker, read_index, save_prices
+
+
+@pytest.fixture
+def prices():
+    """시장 지수 + 종목 2개의 합성 OHLCV (Long Format)"""
+    return synthetic_ohlcv(2, num_days=120)
+
+
+def test_round_trip(tmp_path, prices):
+    save_prices(prices, tmp_path)
+    for ticker, expected in prices.groupby("Ticker"):
+        loaded = load_ticker(tmp_path, ticker)
+        pd.testing.assert_frame_equal(loaded[FIELDS], expected[FIELDS], check_freq=False, check_index_type=False)
+
+    wide = load_panel(tmp_path)
+    expected = prices.pivot(columns="Ticker", values="Close")
+    pd.testing.assert_frame_equal(wide, expected, check_names=False, check_freq=False, check_index_type=False)
+
+
+def test_load_panel_keeps_union_of_dates(tmp_path, prices):
+    # 늦게 상장한 종목: 앞부분은 NaN으로 채우고 기간을 자르지 않음
+    listed = prices.index.unique()[60]
+    save_prices(prices[(prices["Ticker"] != "SYN00001") | (prices.index >= listed)], tmp_path)
+    wide = load_panel(tmp_path)
+    assert len(wide) == 120
+    assert wide["SYN00001"].isna().sum() == 60
+    assert wide["SYN00001"][listed:].notna().all()
+
+
+def test_load_ticker_fields_and_range(tmp_path, prices):
+    save_prices(prices, tmp_path)
+    dates = prices.index.unique()
+    loaded = load_ticker(tmp_path, "SYN00000", fields=["Close"], start=dates[10], end=dates[19])
+    assert list(loaded.columns) == ["Close", "Ticker"]
+    assert loaded.index.equals(pd.DatetimeIndex(dates[10:20], name="Date"))
+
+
+def test_merge_prefers_new_rows_and_keeps_old(tmp_path, prices):
+    dates = prices.index.unique()
+    first = prices[prices.index < dates[80]]
+    second = prices[prices.index >= dates[60]].copy()
+    second["Close"] *= 2
+    save_prices(first, tmp_path)
+    save_prices(second, tmp_path, merge=True)
+
+    close = load_ticker(tmp_path, "SYN00000", fields=["Close"])["Close"]
+    original = prices[prices["Ticker"] == "SYN00000"]["Close"]
+    assert len(close) == 120
+    np.testing.assert_array_equal(close[:60], original[:60])
+    np.testing.assert_array_equal(close[60:], original[60:] * 2)
+
+
+def test_hash_changes_only_with_data(tmp_path, prices):
+    save_prices(prices, tmp_path)
+    before = {t: e["hash"] for t, e in read_index(tmp_path)["tickers"].items()}
+    save_prices(prices[prices["Ticker"] == "SYN00000"], tmp_path, merge=True)
+    assert {t: e["hash"] for t, e in read_index(tmp_path)["tickers"].items()} == before
+
+    changed = prices[prices["Ticker"] == "SYN00000"].copy()
+    changed.iloc[-1, changed.columns.get_loc("Close")] += 1
+    save_prices(changed, tmp_path, merge=True)
+    after = {t: e["hash"] for t, e in read_index(tmp_path)["tickers"].items()}
+    assert [t for t in before if before[t] != after[t]] == ["SYN00000"]
+
+
+def test_find_internal_gaps(tmp_path, prices):
+    dates = prices.index.unique()
+    save_prices(prices[(prices.index < dates[40]) | (prices.index >= dates[60])], tmp_path)
+    assert find_internal_gaps(tmp_path, "SYN00000") == [(dates[39] + pd.Timedelta(days=1), dates[60])]
+    assert find_internal_gaps(tmp_path, "SYN00000", max_gap_days=40) == []
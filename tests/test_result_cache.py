@@ -0,0 +1,112 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import result_cache
+from result_cache import cache_stats, cached, clear_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+def _delta(before):
+    after = cache_stats()
+    return {k: after[k] - before[k] for k in ("hits", "disk_hits", "misses", "evictions")}
+
+
+def test_hit_miss_and_disk_hit(tmp_path, returns):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return returns.cov()
+
+    before = cache_stats()
+    first = cached("cov", compute, tickers=returns.columns, version="v1", cache_dir=tmp_path)
+    assert cached("cov", compute, tickers=returns.columns, version="v1", cache_dir=tmp_path) is first
+    # 프로세스 캐시를 비워도 디스크에서 읽음 / 데이터 버전이 바뀌면 새로 계산
+    clear_cache()
+    assert cached("cov", compute, tickers=returns.columns, version="v1", cache_dir=tmp_path).equals(first)
+    cached("cov", compute, tickers=returns.columns, version="v2", cache_dir=tmp_path)
+    assert len(calls) == 2
+    assert _delta(before) == {"hits": 1, "disk_hits": 1, "misses": 2, "evictions": 0}
+
+
+def test_memory_only_entries_are_not_pickled(monkeypatch, returns):
+    monkeypatch.setattr(result_cache.pickle, "dumps", lambda *a, **k: pytest.fail("직렬화함"))
+    value = {"cov": returns.cov(), "weights": np.ones(1000)}
+    cached("memory", lambda: value, disk=False)
+    expected = value["cov"].memory_usage(deep=True).sum() + value["weights"].nbytes
+    assert expected <= cache_stats()["memory_bytes"] < expected + 4096
+
+
+def test_lru_eviction_by_size():
+    before = cache_stats()
+    for i in range(4):
+        cached(f"a{i}", lambda: np.zeros(1000), disk=False, memory_limit=25_000)
+    # 8KB씩 4개 -> 상한 25KB 안에 3개만 남고 가장 오래된 a0이 제거됨
+    assert cache_stats()["entries"] == 3
+    assert _delta(before)["evictions"] == 1
+    cached("a0", lambda: np.ones(1), disk=False, memory_limit=25_000)
+    assert _delta(before)["misses"] == 5
+
+
+def test_single_flight_under_concurrency():
+    calls = []
+    gate = threading.Event()
+
+    def compute():
+        calls.append(1)
+        gate.wait(5)
+        return np.arange(3)
+
+    threads = [threading.Thread(target=cached, args=("slow", compute), kwargs={"disk": False})
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    # 기다리던 스레드가 모두 나가면 키별 잠금도 정리
+    assert result_cache._key_locks == {}
+
+
+def test_key_lock_kept_while_threads_wait(monkeypatch):
+    # 계산한 스레드가 나가도 기다리는 스레드가 있으면 키별 잠금을 지우지 않음
+    # (지우면 새로 온 스레드가 다른 잠금을 만들어 기다리던 스레드와 동시에 계산)
+    monkeypatch.setattr(result_cache, "_memory_put", lambda *args: None)  # 메모리에 남지 않는 큰 결과
+    releases = [threading.Event(), threading.Event()]
+    calls = []
+
+    def compute():
+        calls.append(1)
+        releases[len(calls) - 1].wait(5)
+        return 1
+
+    def waiting():
+        with result_cache._lock:
+            return sum(entry[1] for entry in result_cache._key_locks.values())
+
+    owner = threading.Thread(target=cached, args=("big", compute), kwargs={"disk": False})
+    owner.start()
+    while not calls:
+        time.sleep(0.01)
+    waiter = threading.Thread(target=cached, args=("big", compute), kwargs={"disk": False})
+    waiter.start()
+    while waiting() < 2:
+        time.sleep(0.01)
+
+    releases[0].set()
+    owner.join()
+    assert waiting() == 1 and len(result_cache._key_locks) == 1
+    releases[1].set()
+    waiter.join()
+    assert result_cache._key_locks == {}
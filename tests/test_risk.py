@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+import risk
+from risk import (historical_drawdowns, historical_var_cvar, parametric_var_cvar, risk_table,
+                  simulate_paths)
+
+
+@pytest.fixture
+def candidates(returns):
+    """동일 비중 + 랜덤 후보 (후보 수 x 종목 수)"""
+    w = np.random.default_rng(1).random((25, returns.shape[1]))
+    w[0] = 1.0
+    return w / w.sum(axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("confidence", [0.95, 0.99])
+def test_historical_matches_empirical_quantile(gappy_returns, candidates, confidence):
+    var, cvar = historical_var_cvar(candidates, gappy_returns, confidence)
+    port = gappy_returns.dropna().to_numpy() @ candidates.T
+    for k in range(len(candidates)):
+        # VaR = 하위 (1 - 신뢰수준) 경험 분위수 (경험 분포 함수의 역함수), CVaR = 그 이하 꼬리 평균
+        q = np.quantile(port[:, k], 1 - confidence, method="inverted_cdf")
+        assert var[k] == pytest.approx(-q, rel=1e-12)
+        assert cvar[k] == pytest.approx(-port[port[:, k] <= q, k].mean(), rel=1e-12)
+        assert cvar[k] >= var[k]
+
+
+def test_historical_horizon_and_chunking(returns, candidates, monkeypatch):
+    var, cvar = historical_var_cvar(candidates, returns, horizon=5)
+    monkeypatch.setattr(risk, "MAX_ELEMENTS", 3 * len(returns))
+    chunked = historical_var_cvar(candidates, returns, horizon=5)
+    np.testing.assert_allclose(chunked, (var, cvar), rtol=1e-12)
+
+    # 겹치는 5일 누적 수익률을 직접 계산한 것과 같음
+    port = (1 + returns.to_numpy() @ candidates[0])
+    five_day = np.array([port[i:i + 5].prod() - 1 for i in range(len(port) - 4)])
+    assert var[0] == pytest.approx(-np.quantile(five_day, 0.05, method="inverted_cdf"), rel=1e-9)
+
+
+def test_parametric_matches_normal_distribution(returns, candidates):
+    mu, cov = returns.mean().to_numpy(), returns.cov().to_numpy()
+    var, cvar = parametric_var_cvar(candidates, mu, cov, 0.99, horizon=10)
+    for k, w in enumerate(candidates):
+        dist = stats.norm(w @ mu * 10, np.sqrt(w @ cov @ w * 10))
+        assert var[k] == pytest.approx(-dist.ppf(0.01), rel=1e-9)
+        assert cvar[k] == pytest.approx(-dist.expect(ub=dist.ppf(0.01), conditional=True), rel=1e-6)
+
+
+def test_drawdowns_match_loop(returns, candidates):
+    drawdowns = historical_drawdowns(candidates, returns)
+    for k in (0, 7):
+        wealth, peak, worst = 1.0, 1.0, 0.0
+        for r in returns.to_numpy() @ candidates[k]:
+            wealth *= 1 + r
+            peak = max(peak, wealth)
+            worst = max(worst, 1 - wealth / peak)
+        assert drawdowns[k] == pytest.approx(worst, rel=1e-12)
+
+
+def test_simulated_paths_independent_of_chunk_size(returns):
+    mu, cov = returns.mean().to_numpy(), returns.cov().to_numpy()
+    whole = np.concatenate(list(simulate_paths(mu, cov, 30, horizon=20, seed=4)))
+    chunked = np.concatenate(list(simulate_paths(mu, cov, 30, horizon=20, chunk_size=7, seed=4)))
+    np.testing.assert_array_equal(whole, chunked)
+    assert whole.shape == (30, 20, len(mu))
+
+
+def test_risk_table_simulated_var_near_parametric(returns):
+    # 정규분포 경로로 만든 1일 VaR는 정규분포 VaR에 가까움
+    table = risk_table(np.full(returns.shape[1], 1 / returns.shape[1]), returns, num_paths=20000,
+                       path_horizon=1, seed=0)
+    assert table["Sim VaR"].iloc[0] == pytest.approx(table["Param VaR"].iloc[0], rel=0.05)
+    assert list(table.columns[:5]) == ["Hist VaR", "Hist CVaR", "Param VaR", "Param CVaR", "Max Drawdown"]
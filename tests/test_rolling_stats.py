@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from rolling_stats import pair_series, rolling_beta, rolling_correlation
+
+
+@pytest.mark.parametrize("fixture", ["returns", "gappy_returns"])
+def test_rolling_beta_matches_pandas(request, fixture):
+    data = request.getfixturevalue(fixture)
+    beta, corr = rolling_beta(data, "^GSPC", window=60)
+    for ticker in beta.columns:
+        # 두 종목이 모두 있는 날만 쓰고, 창 안에 결측이 있으면 NaN
+        pair = data[["^GSPC", ticker]].where(data[["^GSPC", ticker]].notna().all(axis=1))
+        rolling = pair.rolling(60)
+        expected_beta = rolling.cov()[ticker].xs("^GSPC", level=1) / rolling.var()["^GSPC"]
+        expected_corr = pair["^GSPC"].rolling(60).corr(pair[ticker])
+        np.testing.assert_allclose(beta[ticker], expected_beta, rtol=1e-8, atol=1e-12, err_msg=ticker)
+        np.testing.assert_allclose(corr[ticker], expected_corr, rtol=1e-8, atol=1e-12, err_msg=ticker)
+
+
+def test_rolling_beta_memmap_outputs(tmp_path, returns):
+    reference = rolling_beta(returns, "^GSPC", window=60)
+    beta, corr = rolling_beta(returns, "^GSPC", window=60, out_path=tmp_path / "beta.npy",
+                              corr_out_path=tmp_path / "corr.npy", dtype=np.float32)
+    assert beta.dtypes.eq(np.float32).all() and corr.dtypes.eq(np.float32).all()
+    np.testing.assert_allclose(np.load(tmp_path / "beta.npy"), reference[0], rtol=1e-5)
+    np.testing.assert_allclose(np.load(tmp_path / "corr.npy"), reference[1], rtol=1e-5)
+
+
+@pytest.mark.parametrize("block_size", [None, 1, 7])
+def test_rolling_correlation_matches_pandas(gappy_returns, block_size):
+    data = gappy_returns[["^GSPC", "S1", "S2", "S3"]]
+    result = rolling_correlation(data, window=40, dtype=np.float64, block_size=block_size)
+    # 결측이 있는 날은 모든 쌍에서 제외
+    complete = data.where(data.notna().all(axis=1))
+    for a in data.columns:
+        for b in data.columns:
+            if a < b:
+                expected = complete[a].rolling(40).corr(complete[b])
+                np.testing.assert_allclose(pair_series(result, a, b), expected, rtol=1e-8, atol=1e-12,
+                                           err_msg=f"{a} / {b}")
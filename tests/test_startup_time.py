@@ -0,0 +1,22 @@
+import pytest
+
+from startup_time import TARGETS, app_imports, measure
+
+
+def test_app_imports_skip_stdlib_and_lazy_imports(tmp_path):
+    app = tmp_path / "app.py"
+    app.write_text("import os, sys\nimport numpy as np\nfrom panel import get_panel\nimport xml.dom\n"
+                   "from covariance import get_covariance\n\ndef plot():\n    import matplotlib\n",
+                   encoding="utf-8")
+    assert app_imports(app) == ["numpy", "panel", "covariance"]
+
+
+def test_dashboard_target_matches_app():
+    assert TARGETS["dashboard"] == app_imports()
+    assert {"covariance", "correlation", "decimate", "pairwise", "perf"} <= set(TARGETS["dashboard"])
+
+
+@pytest.mark.parametrize("name", sorted(TARGETS))
+def test_startup_does_not_load_heavy_modules(name):
+    # 그림 / 통계 라이브러리는 실제로 쓸 때만 불러옴 (시간 목표는 기계마다 달라서 여기서는 보지 않음)
+    assert measure(TARGETS[name], repeat=1)["heavy_loaded"] == []
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from statistical_analysis import beta_table, calculate_beta, calculate_beta_batch
+
+
+@pytest.mark.parametrize("fixture", ["returns", "gappy_returns"])
+def test_batch_matches_linregress(request, fixture):
+    data = request.getfixturevalue(fixture)
+    markets = ["^GSPC", "S7"]
+    result = calculate_beta_batch(data, markets, stock_tickers=["S0", "S1", "S3"])
+    for i, market in enumerate(markets):
+        for j, ticker in enumerate(result["tickers"]):
+            pair = data[[market, ticker]].dropna()
+            fit = stats.linregress(pair[market], pair[ticker])
+            np.testing.assert_allclose(
+                [result[k][i, j] for k in ("beta", "alpha", "r_squared", "beta_stderr", "alpha_stderr", "p_value")],
+                [fit.slope, fit.intercept, fit.rvalue ** 2, fit.stderr, fit.intercept_stderr, fit.pvalue],
+                rtol=1e-8, atol=1e-14, err_msg=f"{market} / {ticker}")
+            assert result["n_obs"][i, j] == len(pair)
+
+
+def test_single_pair_matches_batch(gappy_returns):
+    beta, alpha, r_squared = calculate_beta(gappy_returns, "^GSPC", "S3")
+    result = calculate_beta_batch(gappy_returns, "^GSPC", ["S3"])
+    assert beta == pytest.approx(result["beta"][0, 0], rel=1e-10)
+    assert alpha == pytest.approx(result["alpha"][0, 0], rel=1e-8)
+    assert r_squared == pytest.approx(result["r_squared"][0, 0], rel=1e-10)
+
+
+def test_short_overlap_is_nan(gappy_returns):
+    result = calculate_beta_batch(gappy_returns, "^GSPC", min_periods=200)
+    short = result["n_obs"][0] < 200
+    assert short.any()
+    assert np.isnan(result["beta"][0, short]).all()
+    assert not np.isnan(result["beta"][0, ~short]).any()
+
+
+def test_beta_table_layout(returns):
+    # 벤치마크 자신은 종목에서 빠짐 -> 2 x 7
+    result = calculate_beta_batch(returns, ["^GSPC", "S0"])
+    assert "S0" not in result["tickers"]
+    table = beta_table(result)
+    assert len(table) == 2 * 7
+    assert {"beta", "alpha", "n_obs"} <= set(table.columns)